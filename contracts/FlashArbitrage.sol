@@ -55,10 +55,12 @@ contract FlashArbitrage is FlashLoanSimpleReceiverBase, Ownable, ReentrancyGuard
         uint256 amountOwed = amount + premium;
         require(IERC20(asset).balanceOf(address(this)) >= amountOwed, "FlashArbitrage: Insufficient funds");
         IERC20(asset).approve(address(POOL), amountOwed);
-        if (profit > 0) {
-            IERC20(asset).transfer(executor, profit);
+        // O prêmio fica no contrato para o repagamento; só o lucro líquido vai para o executor
+        uint256 netProfit = profit > premium ? profit - premium : 0;
+        if (netProfit > 0) {
+            IERC20(asset).transfer(executor, netProfit);
         }
-        emit ArbitrageExecuted(arbParams.tokenA, arbParams.tokenB, arbParams.dexBuy, arbParams.dexSell, amount, profit, executor);
+        emit ArbitrageExecuted(arbParams.tokenA, arbParams.tokenB, arbParams.dexBuy, arbParams.dexSell, amount, netProfit, executor);
         return true;
     }
 
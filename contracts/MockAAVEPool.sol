@@ -6,10 +6,16 @@ import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "./IFlashLoanSimpleReceiver.sol";
 
 contract MockAAVEPool is IPool {
+    // Prêmio em bps, como no pool real (padrão 0); o empréstimo sai do próprio saldo do mock
+    uint128 private _flashLoanPremiumTotal;
+    uint128 private _flashLoanPremiumToProtocol;
+
     function flashLoanSimple(address receiverAddress, address asset, uint256 amount, bytes calldata params, uint16 referralCode) external {
+        // PercentageMath.percentMul: arredonda meio para cima
+        uint256 premium = (amount * _flashLoanPremiumTotal + 5000) / 10000;
         IERC20(asset).transfer(receiverAddress, amount);
-        IFlashLoanSimpleReceiver(receiverAddress).executeOperation(asset, amount, 0, msg.sender, params);
-        IERC20(asset).transferFrom(receiverAddress, address(this), amount);
+        IFlashLoanSimpleReceiver(receiverAddress).executeOperation(asset, amount, premium, msg.sender, params);
+        IERC20(asset).transferFrom(receiverAddress, address(this), amount + premium);
     }
 
     function supply(address asset, uint256 amount, address onBehalfOf, uint16 referralCode) external override {}
@@ -47,12 +53,15 @@ contract MockAAVEPool is IPool {
     function getUserEMode(address user) external view override returns (uint256) { return 0; }
     function resetIsolationModeTotalDebt(address asset) external override {}
     function MAX_STABLE_RATE_BORROW_SIZE_PERCENT() external view override returns (uint256) { return 0; }
-    function FLASHLOAN_PREMIUM_TOTAL() external view override returns (uint128) { return 0; }
+    function FLASHLOAN_PREMIUM_TOTAL() external view override returns (uint128) { return _flashLoanPremiumTotal; }
     function BRIDGE_PROTOCOL_FEE() external view override returns (uint256) { return 0; }
-    function FLASHLOAN_PREMIUM_TO_PROTOCOL() external view override returns (uint128) { return 0; }
+    function FLASHLOAN_PREMIUM_TO_PROTOCOL() external view override returns (uint128) { return _flashLoanPremiumToProtocol; }
     function MAX_NUMBER_RESERVES() external view override returns (uint16) { return 0; }
     function mintToTreasury(address[] calldata assets) external override {}
     function rescueTokens(address token, address to, uint256 amount) external override {}
     function updateBridgeProtocolFee(uint256 bridgeProtocolFee) external override {}
-    function updateFlashloanPremiums(uint128 flashLoanPremiumTotal, uint128 flashLoanPremiumToProtocol) external override {}
+    function updateFlashloanPremiums(uint128 flashLoanPremiumTotal, uint128 flashLoanPremiumToProtocol) external override {
+        _flashLoanPremiumTotal = flashLoanPremiumTotal;
+        _flashLoanPremiumToProtocol = flashLoanPremiumToProtocol;
+    }
 }
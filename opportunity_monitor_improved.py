@@ -12,10 +12,39 @@ import sys
 from datetime import datetime
 from typing import Dict, Optional, Tuple
 from web3 import Web3
-import requests
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
+from prometheus_client import REGISTRY
 import threading
 
+from src.cache.token_metadata import TokenMetadataCache
+from src.chain.block_watcher import Head
+from src.chain.flash_loan import FlashLoanCosts
+from src.chain.gas_oracle import GAS_PRICE_ORACLE_ADDRESS, GasOracle
+from src.discovery.factory_scanner import FactorySpec, PoolDiscovery
+from src.discovery.pool_registry import SOLIDLY_DEFAULT_FEES, PoolRegistry
+from src.execution.executor import EXECUTE_TX_SIZE, ArbitrageExecutor
+from src.execution.simulator import CandidateSimulator
+from src.monitoring.metrics import (
+    CYCLE_DURATION, DETECTION_TO_SEND, OPPORTUNITIES, QUOTE_LATENCY, SNAPSHOT_LATENCY,
+    MonitorCollector, child, count_error, render
+)
+from src.notifications.telegram_notifier import TELEGRAM_API_URL, TelegramNotifier
+from src.pricing.async_engine import AsyncPriceEngine
+from src.pricing.pool_reader import (
+    SOLIDLY, UNISWAP_V3, MulticallPoolReader, PoolSpec, plan_snapshot, reserves_price, run_plan, v3_price
+)
+from src.pricing.pool_state import PoolStateEngine
+from src.pricing.price_table import PriceTable
+from src.pricing.sharded import RpcShardReader, ShardedScanner, ShardPool
+from src.rpc.batch import JsonRpcBatch
+from src.rpc.codec import ERC20, SOLIDLY_POOL, V3_POOL, CodecContract, ContractCache, checksum_address
+from src.rpc.multicall import MULTICALL3_ADDRESS, Multicall
+from src.rpc.provider_pool import FailoverHTTPProvider, ProviderPool
+from src.rpc.rate_limit import COMPUTE_UNITS, TokenBucket
+from src.storage.history import APPROVED, NOT_SIMULATED, REJECTED, HistoryWriter
+from src.strategy.detector import Detector
+from src.strategy.sizing import SizingPool, TradeSizer
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,24 +56,99 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def env_mapping(name: str, default: str = "") -> Dict[str, str]:
+    # "Uniswap V3=0xabc,Aerodrome=0xdef" -> {"Uniswap V3": "0xabc", "Aerodrome": "0xdef"}
+    items = (item.split("=", 1) for item in os.environ.get(name, default).split(",") if "=" in item)
+    return {key.strip(): value.strip() for key, value in items}
+
 # Configuração
 class Config:
     TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+    TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", TELEGRAM_API_URL)
+    TELEGRAM_QUEUE_SIZE = int(os.environ.get("TELEGRAM_QUEUE_SIZE", 100))
+    TELEGRAM_COALESCE_SECONDS = float(os.environ.get("TELEGRAM_COALESCE_SECONDS", 10))
     ALCHEMY_API_KEY = os.environ.get("ALCHEMY_API_KEY", "akWmmJe92KBl0WdKklCYXx1UW5msrmv0")
     PRIVATE_KEY = os.environ.get("PRIVATE_KEY")
+    CHAIN_ID = int(os.environ.get("CHAIN_ID", 8453))  # Base mainnet
+    DATA_DIR = os.environ.get("DATA_DIR", "data")
+    # Histórico colunar de snapshots e oportunidades em DATA_DIR/history
+    HISTORY = os.environ.get("HISTORY", "true").lower() == "true"
+    USE_MULTICALL = os.environ.get("USE_MULTICALL", "true").lower() == "true"
+    MULTICALL_ADDRESS = os.environ.get("MULTICALL_ADDRESS", MULTICALL3_ADDRESS)
+    
+    RPC_URL = os.environ.get("RPC_URL", f"https://base-mainnet.g.alchemy.com/v2/{ALCHEMY_API_KEY}")
+    # Endpoints extras para failover/hedge, separados por vírgula (RPC_URL vem primeiro)
+    RPC_URLS = [url for url in dict.fromkeys([RPC_URL, *os.environ.get("RPC_URLS", "").replace(" ", "").split(",")]) if url]
+    RPC_TIMEOUT = float(os.environ.get("RPC_TIMEOUT", 10))
+    RPC_HEDGE = os.environ.get("RPC_HEDGE", "true").lower() == "true"
+    RPC_HEDGE_DELAY = float(os.environ.get("RPC_HEDGE_DELAY", 0.5))  # até haver amostras para o p95
+    RPC_BATCH_SIZE = int(os.environ.get("RPC_BATCH_SIZE", 100))  # eth_calls por batch JSON-RPC sem Multicall3
     
-    # Rate limiting
-    API_CALL_DELAY = 2  # segundos entre chamadas
-    CYCLE_DELAY = 300   # 5 minutos entre ciclos
+    # Rate limiting: um token bucket em compute units para RPC e Telegram
+    RPC_CU_PER_SECOND = float(os.environ.get("RPC_CU_PER_SECOND", 330))  # limite do plano da Alchemy
+    RPC_CU_BURST = float(os.environ.get("RPC_CU_BURST", 660))
+    CYCLE_DELAY = float(os.environ.get("CYCLE_DELAY", 300))      # intervalo entre inícios de ciclo; 0 = ciclos seguidos
     MAX_RETRIES = 3
     
+    # Motor de preços assíncrono
+    ASYNC_ENGINE = os.environ.get("ASYNC_ENGINE", "true").lower() == "true"
+    SNAPSHOT_TIMEOUT = float(os.environ.get("SNAPSHOT_TIMEOUT", 60))
+    
+    # Varredura por bloco: reprecifica a cada novo bloco em vez do timer CYCLE_DELAY
+    BLOCK_DRIVEN = os.environ.get("BLOCK_DRIVEN", "false").lower() == "true"
+    WS_URL = os.environ.get("WS_URL", f"wss://base-mainnet.g.alchemy.com/v2/{ALCHEMY_API_KEY}")
+    BLOCK_POLL_INTERVAL = float(os.environ.get("BLOCK_POLL_INTERVAL", 1))
+    
+    # Estado incremental dos pools a partir de logs Swap/Sync
+    EVENT_DRIVEN = os.environ.get("EVENT_DRIVEN", "false").lower() == "true"
+    
+    # Decodificação e score em N processos, pools particionados por par (0 = processo principal)
+    SHARDS = int(os.environ.get("SHARDS", 0))
+    
+    # Descoberta de pools nas factories (registro em data/pools.sqlite)
+    POOL_DISCOVERY = os.environ.get("POOL_DISCOVERY", "true").lower() == "true"
+    DISCOVERY_SCAN_LOGS = os.environ.get("DISCOVERY_SCAN_LOGS", "false").lower() == "true"
+    DISCOVERY_START_BLOCK = int(os.environ.get("DISCOVERY_START_BLOCK", 0))
+    
+    # Ciclos multi-hop no grafo de tokens (2 = só as idas e voltas entre duas DEXs)
+    MAX_CYCLE_LENGTH = int(os.environ.get("MAX_CYCLE_LENGTH", 4))
+    
     # Thresholds
     MIN_PROFIT_THRESHOLD = 0.005  # 0.5%
+    TOP_K_OPPORTUNITIES = int(os.environ.get("TOP_K_OPPORTUNITIES", 10))  # alertas por ciclo
     MAX_GAS_PRICE = 50  # gwei
+    
+    # Simulação via calculateProfit do FlashArbitrage antes do alerta (ligada com o endereço do contrato)
+    FLASH_ARBITRAGE_ADDRESS = os.environ.get("FLASH_ARBITRAGE_ADDRESS", "")
+    DEX_ROUTERS = env_mapping("DEX_ROUTERS")  # nome da DEX -> router IUnifiedDEX suportado pelo contrato
+    SIMULATION_SIZES = env_mapping("SIMULATION_SIZES", "WETH=1,USDC=3000")  # tamanho base por token emprestado
+    SIMULATION_WORKERS = int(os.environ.get("SIMULATION_WORKERS", 4))
+    FLASH_LOAN_PREMIUM_BPS = int(os.environ.get("FLASH_LOAN_PREMIUM_BPS", 5))  # até a primeira leitura do pool
+    # Prêmio e liquidez das reservas lidos da Aave por bloco (vazio = POOL() do FlashArbitrage)
+    AAVE_POOL = os.environ.get("AAVE_POOL", "")
+    FLASH_LOAN_MAX_UTILIZATION = float(os.environ.get("FLASH_LOAN_MAX_UTILIZATION", 0.9))
+    # Tamanho ótimo pelo quoter sobre o estado dos pools (escada SIMULATION_SIZES só como fallback)
+    OPTIMAL_SIZING = os.environ.get("OPTIMAL_SIZING", "true").lower() == "true"
+    
+    # Envio de executeArbitrage para o melhor candidato simulado (exige PRIVATE_KEY autorizada no contrato)
+    EXECUTE = os.environ.get("EXECUTE", "false").lower() == "true"
+    PRIORITY_FEE_GWEI = float(os.environ.get("PRIORITY_FEE_GWEI", 0.01))
+    
+    # Oráculo de gás: feeHistory incremental + taxa de dados da L1 (vazio desliga a parte L1)
+    GAS_ORACLE_WINDOW = int(os.environ.get("GAS_ORACLE_WINDOW", 20))
+    L1_FEE_ORACLE = os.environ.get("L1_FEE_ORACLE", GAS_PRICE_ORACLE_ADDRESS)
+    ARBITRAGE_GAS_UNITS = int(os.environ.get("ARBITRAGE_GAS_UNITS", 350_000))  # executeArbitrage com 2 swaps
+
+# Bucket único: preços, descoberta e notificações dividem o mesmo orçamento
+RPC_LIMITER = TokenBucket(Config.RPC_CU_PER_SECOND, Config.RPC_CU_BURST, COMPUTE_UNITS)
 
-# Inicializar Web3
-w3 = Web3(Web3.HTTPProvider(f"https://base-mainnet.g.alchemy.com/v2/{Config.ALCHEMY_API_KEY}"))
+# Inicializar Web3: sessões keep-alive para todos os endpoints, com failover e hedge
+PROVIDER_POOL = ProviderPool(
+    Config.RPC_URLS, timeout=Config.RPC_TIMEOUT, hedge=Config.RPC_HEDGE, hedge_delay=Config.RPC_HEDGE_DELAY,
+    limiter=RPC_LIMITER
+)
+w3 = Web3(FailoverHTTPProvider(PROVIDER_POOL))
 
 # Configurações de contratos
 DEXS = {
@@ -53,100 +157,226 @@ DEXS = {
     "Aerodrome": "0xcdac0d6c6c59727a65f871236188350531885c43",
 }
 
-TOKENS = {
-    "WETH": "0x4200000000000000000000000000000000000006",
-    "USDC": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+DEX_KINDS = {
+    "Uniswap V3": UNISWAP_V3,
+    "SushiSwap V3": UNISWAP_V3,
+    "Aerodrome": SOLIDLY,
 }
 
-# ABIs
-ERC20_ABI = [{"constant":True,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"}]
-
-UNISWAP_V3_POOL_ABI = [
-    {"name":"slot0","outputs":[{"internalType":"uint160","name":"sqrtPriceX96","type":"uint160"},{"internalType":"int24","name":"tick","type":"int24"}],"stateMutability":"view","type":"function"},
-    {"name":"token0","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
-    {"name":"token1","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"}
-]
+# Pools fixos, usados só se a descoberta estiver desligada ou não achar nada
+POOLS = [PoolSpec(dex_name, address, DEX_KINDS[dex_name]) for dex_name, address in DEXS.items()]
 
-AERODROME_POOL_ABI = [
-    {"name":"getReserves","outputs":[{"internalType":"uint112","name":"_reserve0","type":"uint112"},{"internalType":"uint112","name":"_reserve1","type":"uint112"}],"stateMutability":"view","type":"function"},
-    {"name":"token0","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"}
+FACTORIES = [
+    FactorySpec("Uniswap V3", UNISWAP_V3, "0x33128a8fC17869897dcE68Ed026d694621f6FDfD", Config.DISCOVERY_START_BLOCK),
+    FactorySpec("SushiSwap V3", UNISWAP_V3, "0xc35DADB65012eC5796536bD9864eD8773aBc74C4", Config.DISCOVERY_START_BLOCK),
+    FactorySpec("Aerodrome", SOLIDLY, "0x420DD381b31aEf6683db6B902084cB0FFECe40Da", Config.DISCOVERY_START_BLOCK,
+                router="0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43"),
 ]
 
-class RateLimiter:
-    def __init__(self, delay: float):
-        self.delay = delay
-        self.last_call = 0
-    
-    def wait(self):
-        elapsed = time.time() - self.last_call
-        if elapsed < self.delay:
-            time.sleep(self.delay - elapsed)
-        self.last_call = time.time()
-
-class TelegramNotifier:
-    def __init__(self):
-        self.token = Config.TELEGRAM_BOT_TOKEN
-        self.chat_id = Config.TELEGRAM_CHAT_ID
-        self.rate_limiter = RateLimiter(1.0)  # 1 segundo entre mensagens
-    
-    def send_message(self, message: str) -> bool:
-        if not self.token or not self.chat_id:
-            logger.warning("Telegram não configurado")
-            return False
-        
-        self.rate_limiter.wait()
-        
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        payload = {
-            "chat_id": self.chat_id,
-            "text": message,
-            "parse_mode": "Markdown"
-        }
-        
-        try:
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            logger.error(f"Erro ao enviar mensagem Telegram: {e}")
-            return False
+TOKENS = {
+    "WETH": "0x4200000000000000000000000000000000000006",
+    "USDC": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+}
 
 class PriceMonitor:
     def __init__(self):
-        self.rate_limiter = RateLimiter(Config.API_CALL_DELAY)
-        self.telegram = TelegramNotifier()
+        # Fila em segundo plano: alertas não atrasam a varredura
+        self.telegram = TelegramNotifier(
+            Config.TELEGRAM_BOT_TOKEN, Config.TELEGRAM_CHAT_ID, RPC_LIMITER, Config.TELEGRAM_API_URL,
+            Config.TELEGRAM_QUEUE_SIZE, Config.TELEGRAM_COALESCE_SECONDS
+        )
+        self.metadata_cache = TokenMetadataCache(os.path.join(Config.DATA_DIR, "token_metadata.json"))
+        # Gravação em thread própria: o ciclo só enfileira
+        self.history = HistoryWriter(os.path.join(Config.DATA_DIR, "history")) if Config.HISTORY else None
+        # Sem rate_limiter próprio: o provider já debita cada requisição do RPC_LIMITER
+        self.multicall = Multicall(w3, Config.MULTICALL_ADDRESS)
+        # Contratos com checksum e codecs prontos, reaproveitados entre ciclos
+        self.contracts = ContractCache(w3)
+        self.rpc_batch = JsonRpcBatch(w3.provider.make_raw_batch, Config.RPC_BATCH_SIZE)
+        self.pool_reader = None
+        self.engine = None
+        self.pools = list(POOLS)
+        self.pool_registry = None
+        self.discovery = None
+        if Config.POOL_DISCOVERY:
+            self.pool_registry = PoolRegistry(os.path.join(Config.DATA_DIR, "pools.sqlite"), Config.CHAIN_ID)
+            self.discovery = PoolDiscovery(w3, self.pool_registry, FACTORIES)
+        self.pool_state = PoolStateEngine(self.pools) if Config.EVENT_DRIVEN else None
+        self.scanner = None
+        # Mesma detecção usada no replay do histórico (scripts/backtest.py)
+        self.detector = Detector(
+            Config.MIN_PROFIT_THRESHOLD, Config.TOP_K_OPPORTUNITIES, max_cycle_length=Config.MAX_CYCLE_LENGTH
+        )
+        if Config.ASYNC_ENGINE:
+            self.engine = AsyncPriceEngine(
+                Config.RPC_URL, self.metadata_cache, Config.CHAIN_ID,
+                multicall_address=Config.MULTICALL_ADDRESS if Config.USE_MULTICALL else None,
+                ws_url=Config.WS_URL or None, block_poll_interval=Config.BLOCK_POLL_INTERVAL,
+                provider_pool=PROVIDER_POOL
+            )
+        else:
+            # Sem Multicall3, as eth_call da rodada vão juntas num batch JSON-RPC
+            self.pool_reader = MulticallPoolReader(
+                self.multicall if Config.USE_MULTICALL else self.rpc_batch, self.metadata_cache, Config.CHAIN_ID
+            )
+        self.gas_oracle = GasOracle(
+            w3, Config.GAS_ORACLE_WINDOW, call_many=self.call_many, l1_oracle=Config.L1_FEE_ORACLE or None
+        )
+        self.price_table: Optional[PriceTable] = None
+        self.simulator = None
+        self.flash_loans = None
+        self.sizer = None
+        if Config.FLASH_ARBITRAGE_ADDRESS:
+            self.simulation_sizes = {
+                TOKENS[symbol].lower(): float(size) for symbol, size in Config.SIMULATION_SIZES.items() if symbol in TOKENS
+            }
+            # Só os tokens com tamanho de simulação são emprestados
+            self.flash_loans = FlashLoanCosts(
+                self.call_many, self.simulation_sizes, pool=Config.AAVE_POOL or None,
+                receiver=Config.FLASH_ARBITRAGE_ADDRESS, default_premium_bps=Config.FLASH_LOAN_PREMIUM_BPS,
+                max_utilization=Config.FLASH_LOAN_MAX_UTILIZATION
+            )
+            # Pools preenchidos em configure_sizer, depois da descoberta e dos metadados
+            self.sizer = TradeSizer(self.call_many) if Config.OPTIMAL_SIZING else None
+            self.simulator = CandidateSimulator(
+                self.call_many, Config.FLASH_ARBITRAGE_ADDRESS, Config.DEX_ROUTERS, Config.MIN_PROFIT_THRESHOLD,
+                self.simulation_amount, premium_bps=Config.FLASH_LOAN_PREMIUM_BPS, workers=Config.SIMULATION_WORKERS,
+                gas_cost=self.gas_cost_in, flash_loans=self.flash_loans, sizer=self.sizer
+            )
+        self.executor = None
+        if self.simulator is not None and Config.EXECUTE and Config.PRIVATE_KEY:
+            self.executor = ArbitrageExecutor(
+                w3, Config.FLASH_ARBITRAGE_ADDRESS, Config.PRIVATE_KEY, Config.CHAIN_ID,
+                priority_fee=Web3.to_wei(Config.PRIORITY_FEE_GWEI, "gwei"),
+                max_fee_cap=Web3.to_wei(Config.MAX_GAS_PRICE, "gwei"),
+                min_profit_bps=int(Config.MIN_PROFIT_THRESHOLD * 10_000), gas_oracle=self.gas_oracle
+            )
+        self.last_head: Optional[Head] = None
         self.stats = {
             "cycles": 0,
             "opportunities_found": 0,
+            "multi_hop_found": 0,
             "errors": 0,
+            "last_block": None,
+            "blocks_skipped": 0,
             "last_update": datetime.now()
         }
     
     def get_token_decimals(self, token_address: str) -> Optional[int]:
+        return self.metadata_cache.get_or_fetch(
+            Config.CHAIN_ID, token_address, "decimals",
+            lambda: self._fetch_token_decimals(token_address)
+        )
+    
+    def simulation_amount(self, token_address: str) -> Optional[int]:
+        size = self.simulation_sizes.get(token_address.lower())
+        decimals = self.get_token_decimals(token_address)
+        if size is None or decimals is None:
+            return None
+        return int(size * 10 ** decimals)
+    
+    def gas_cost_in(self, token_address: str) -> Optional[int]:
+        # Custo previsto de executeArbitrage convertido para o token emprestado, sem RPC
+        cost = self.gas_oracle.tx_cost(Config.ARBITRAGE_GAS_UNITS, EXECUTE_TX_SIZE)
+        weth = TOKENS["WETH"].lower()
+        if cost is None or token_address.lower() == weth:
+            return cost
+        price = self.price_table.mid_price(weth, token_address) if self.price_table is not None else None
+        decimals = self.get_token_decimals(token_address)
+        if price is None or decimals is None:
+            return None
+        return int(cost / 10 ** 18 * price * 10 ** decimals)
+    
+    def update_gas(self, block_identifier="latest") -> None:
         try:
-            self.rate_limiter.wait()
-            token_contract = w3.eth.contract(
-                address=Web3.to_checksum_address(token_address), 
-                abi=ERC20_ABI
-            )
-            return token_contract.functions.decimals().call()
+            self.gas_oracle.update(block_identifier if isinstance(block_identifier, int) else None)
+            self.stats["gas"] = self.gas_oracle.stats()
+        except Exception as e:
+            count_error("gas_oracle")
+            logger.error(f"Erro ao atualizar oráculo de gás: {e}")
+        if self.executor is not None:
+            try:
+                self.executor.refresh_fees()
+            except Exception as e:
+                logger.error(f"Erro ao atualizar fees do executor: {e}")
+    
+    def _fetch_token_decimals(self, token_address: str) -> Optional[int]:
+        try:
+            (decimals,) = self.contracts.get(token_address, ERC20).call("decimals")
+            return decimals
         except Exception as e:
             logger.error(f"Erro ao obter decimais do token {token_address}: {e}")
             return None
     
-    def get_uniswap_v3_price(self, pool_address: str, token_in: str, token_out: str) -> Optional[float]:
+    def get_pool_token(self, pool_contract: CodecContract, field: str) -> str:
+        # token0/token1 de um pool nunca mudam: uma chamada RPC por pool na vida do bot
+        def fetch() -> str:
+            return checksum_address(pool_contract.call(field)[0])
+        return self.metadata_cache.get_or_fetch(Config.CHAIN_ID, pool_contract.address, field, fetch)
+    
+    def warm_metadata_cache(self) -> None:
+        loaded = self.metadata_cache.load()
+        logger.info(f"Cache de metadados: {loaded} entradas carregadas de {self.metadata_cache.path}")
+        
+        for token_address in TOKENS.values():
+            self.get_token_decimals(token_address)
+        
+        for pool in self.pools:
+            codecs = SOLIDLY_POOL if pool.kind == SOLIDLY else V3_POOL
+            try:
+                pool_contract = self.contracts.get(pool.address, codecs)
+                for field in ("token0", "token1"):
+                    self.get_token_decimals(self.get_pool_token(pool_contract, field))
+            except Exception as e:
+                logger.error(f"Erro ao aquecer cache de metadados para {pool.dex}: {e}")
+        
+        self.metadata_cache.save()
+    
+    def discover_pools(self) -> None:
+        if self.discovery is None:
+            return
+        
         try:
-            self.rate_limiter.wait()
-            pool_contract = w3.eth.contract(
-                address=Web3.to_checksum_address(pool_address),
-                abi=UNISWAP_V3_POOL_ABI
-            )
+            if Config.DISCOVERY_SCAN_LOGS:
+                self.discovery.scan_logs()
+            self.discovery.discover_pairs(self.call_many, TOKENS.values())
+        except Exception as e:
+            self.stats["errors"] += 1
+            count_error("discovery")
+            logger.error(f"Erro na descoberta de pools, usando registro existente: {e}")
+        
+        # Só pares entre os tokens monitorados; pools estáveis do Aerodrome ficam de fora
+        # porque o preço por razão de reservas não vale para a curva estável
+        tokens = list(TOKENS.values())
+        records = [
+            record
+            for i, token_a in enumerate(tokens) for token_b in tokens[i + 1:]
+            for record in self.pool_registry.pools_for_pair(token_a, token_b)
+            if not record.stable
+        ]
+        if not records:
+            logger.warning("Nenhum pool no registro para os tokens monitorados, usando pools fixos")
+            return
+        
+        for record in records:
+            # token0/token1 já vêm da factory: nenhuma chamada extra no primeiro snapshot
+            self.metadata_cache.set(Config.CHAIN_ID, record.address, "token0", record.token0)
+            self.metadata_cache.set(Config.CHAIN_ID, record.address, "token1", record.token1)
+        self.pools = [record.spec() for record in records]
+        self.detector.fees = {record.label: record.fee_rate for record in records}
+        if self.pool_state is not None:
+            self.pool_state = PoolStateEngine(self.pools)
+        self.stats["pools"] = len(self.pools)
+        logger.info(f"{len(self.pools)} pools monitorados ({len(self.pool_registry)} no registro)")
+    
+    def read_uniswap_v3_pool(self, pool_address: str, block_identifier="latest") -> Optional[Tuple[str, str, float]]:
+        try:
+            pool_contract = self.contracts.get(pool_address, V3_POOL)
             
-            slot0 = pool_contract.functions.slot0().call()
-            sqrt_price_x96 = slot0[0]
+            sqrt_price_x96, _ = pool_contract.call("slot0", block_identifier=block_identifier)
             
-            token0_address = pool_contract.functions.token0().call()
-            token1_address = pool_contract.functions.token1().call()
+            token0_address = self.get_pool_token(pool_contract, "token0")
+            token1_address = self.get_pool_token(pool_contract, "token1")
             
             token0_decimals = self.get_token_decimals(token0_address)
             token1_decimals = self.get_token_decimals(token1_address)
@@ -154,121 +384,382 @@ class PriceMonitor:
             if token0_decimals is None or token1_decimals is None:
                 return None
             
-            price = (sqrt_price_x96 / 2**96)**2
-            
-            if token_in.lower() == token0_address.lower():
-                price = price / (10**(token1_decimals - token0_decimals))
-            else:
-                price = 1 / price
-                price = price / (10**(token0_decimals - token1_decimals))
-            
-            return price
+            return token0_address, token1_address, v3_price(sqrt_price_x96, token0_decimals, token1_decimals)
             
         except Exception as e:
             logger.error(f"Erro ao obter preço Uniswap V3: {e}")
             return None
     
-    def get_aerodrome_price(self, pool_address: str, token_in: str, token_out: str) -> Optional[float]:
+    def read_aerodrome_pool(self, pool_address: str, block_identifier="latest") -> Optional[Tuple[str, str, float]]:
         try:
-            self.rate_limiter.wait()
-            pool_contract = w3.eth.contract(
-                address=Web3.to_checksum_address(pool_address),
-                abi=AERODROME_POOL_ABI
-            )
+            pool_contract = self.contracts.get(pool_address, SOLIDLY_POOL)
             
-            reserves = pool_contract.functions.getReserves().call()
-            reserve0, reserve1 = reserves[0], reserves[1]
+            reserve0, reserve1 = pool_contract.call("getReserves", block_identifier=block_identifier)
             
-            token0_address = pool_contract.functions.token0().call()
+            token0_address = self.get_pool_token(pool_contract, "token0")
+            token1_address = self.get_pool_token(pool_contract, "token1")
             
             token0_decimals = self.get_token_decimals(token0_address)
-            token1_decimals = self.get_token_decimals(token_out)
+            token1_decimals = self.get_token_decimals(token1_address)
             
             if token0_decimals is None or token1_decimals is None:
                 return None
             
-            if token_in.lower() == token0_address.lower():
-                price = (reserve1 / 10**token1_decimals) / (reserve0 / 10**token0_decimals)
-            else:
-                price = (reserve0 / 10**token0_decimals) / (reserve1 / 10**token1_decimals)
-            
-            return price
+            price = reserves_price(reserve0, reserve1, token0_decimals, token1_decimals)
+            return None if price is None else (token0_address, token1_address, price)
             
         except Exception as e:
             logger.error(f"Erro ao obter preço Aerodrome: {e}")
             return None
     
-    def get_price(self, dex_name: str, pool_address: str, token_in: str, token_out: str) -> Optional[float]:
-        if dex_name in ["Uniswap V3", "SushiSwap V3"]:
-            return self.get_uniswap_v3_price(pool_address, token_in, token_out)
-        elif dex_name == "Aerodrome":
-            return self.get_aerodrome_price(pool_address, token_in, token_out)
+    def read_pool(self, dex_name: str, pool_address: str, block_identifier="latest",
+                  kind: Optional[str] = None) -> Optional[Tuple[str, str, float]]:
+        kind = kind or DEX_KINDS.get(dex_name)
+        if kind == UNISWAP_V3:
+            return self.read_uniswap_v3_pool(pool_address, block_identifier)
+        elif kind == SOLIDLY:
+            return self.read_aerodrome_pool(pool_address, block_identifier)
         return None
     
-    def check_arbitrage_opportunity(self) -> None:
-        for dex1_name, dex1_address in DEXS.items():
-            for dex2_name, dex2_address in DEXS.items():
-                if dex1_name == dex2_name:
-                    continue
+    @staticmethod
+    def _orient_price(pool: Optional[Tuple[str, str, float]], token_in: str) -> Optional[float]:
+        if pool is None or pool[2] <= 0:
+            return None
+        token0_address, _, price = pool
+        return price if token_in.lower() == token0_address.lower() else 1 / price
+    
+    def get_uniswap_v3_price(self, pool_address: str, token_in: str, token_out: str) -> Optional[float]:
+        return self._orient_price(self.read_uniswap_v3_pool(pool_address), token_in)
+    
+    def get_aerodrome_price(self, pool_address: str, token_in: str, token_out: str) -> Optional[float]:
+        return self._orient_price(self.read_aerodrome_pool(pool_address), token_in)
+    
+    def get_price(self, dex_name: str, pool_address: str, token_in: str, token_out: str) -> Optional[float]:
+        return self._orient_price(self.read_pool(dex_name, pool_address), token_in)
+    
+    def call_many(self, calls, block_identifier="latest"):
+        if self.engine is not None:
+            return self.engine.run_sync(self.engine.call_many(calls, block_identifier), Config.SNAPSHOT_TIMEOUT)
+        if Config.USE_MULTICALL:
+            return self.multicall.call_many(calls, block_identifier)
+        return self.rpc_batch.call_many(calls, block_identifier)
+    
+    def snapshot_from_events(self, block_identifier="latest") -> PriceTable:
+        if not self.pool_state.bootstrapped:
+            head = w3.eth.get_block(block_identifier)
+            # Snapshot em lote no mesmo bloco para garantir token0/token1/decimals no cache
+            run_plan(
+                plan_snapshot(self.pools, self.metadata_cache, Config.CHAIN_ID, head["number"]),
+                lambda calls: self.call_many(calls, head["number"])
+            )
+            self.pool_state.bootstrap(self.call_many, head["number"], head["hash"])
+        else:
+            self.pool_state.sync(w3, block_identifier)
+        
+        self.stats["pool_logs_applied"] = self.pool_state.logs_applied
+        self.stats["reorgs"] = self.pool_state.reorgs
+        return self.pool_state.price_table(self.metadata_cache, Config.CHAIN_ID)
+    
+    def configure_sizer(self) -> None:
+        if self.sizer is None:
+            return
+        
+        # Mesmos rótulos da PriceTable; fee dos Solidly pela fee conhecida do detector
+        pools = []
+        for pool in self.pools:
+            token0 = self.metadata_cache.get(Config.CHAIN_ID, pool.address, "token0")
+            token1 = self.metadata_cache.get(Config.CHAIN_ID, pool.address, "token1")
+            if token0 is None or token1 is None:
+                continue
+            fee_rate = self.detector.fees.get(pool.dex, SOLIDLY_DEFAULT_FEES[False])
+            pools.append(SizingPool(pool.dex, pool.address, pool.kind, token0, token1, round(fee_rate * 10_000)))
+        self.sizer.set_pools(pools)
+        logger.info(f"Dimensionamento ótimo para {len(pools)} pools")
+    
+    def start_shards(self) -> None:
+        if Config.SHARDS < 1:
+            return
+        
+        # Tokens e decimais vão prontos para os workers: eles só leem o estado dos pools
+        pools = []
+        for pool in self.pools:
+            token0 = self.metadata_cache.get(Config.CHAIN_ID, pool.address, "token0")
+            token1 = self.metadata_cache.get(Config.CHAIN_ID, pool.address, "token1")
+            decimals = [self.get_token_decimals(token) for token in (token0, token1) if token is not None]
+            if len(decimals) < 2 or None in decimals:
+                logger.warning(f"Pool {pool.dex} {pool.address} sem metadados, fora da varredura em shards")
+                continue
+            pools.append(ShardPool(pool, token0, token1, *decimals))
+        if not pools:
+            return
+        
+        # Cada worker tem a própria sessão RPC e uma fatia do orçamento de compute units
+        reader = RpcShardReader(
+            Config.RPC_URLS, Config.MULTICALL_ADDRESS if Config.USE_MULTICALL else None, Config.RPC_TIMEOUT,
+            Config.RPC_CU_PER_SECOND / Config.SHARDS, Config.RPC_CU_BURST / Config.SHARDS, Config.RPC_BATCH_SIZE,
+            event_driven=Config.EVENT_DRIVEN
+        )
+        scanner = ShardedScanner(pools, Config.SHARDS, reader, self.detector, Config.SNAPSHOT_TIMEOUT)
+        try:
+            scanner.start()
+        except Exception as e:
+            count_error("shards")
+            logger.error(f"Erro ao iniciar a varredura em shards, seguindo no processo principal: {e}")
+            scanner.close()
+            return
+        self.scanner = scanner
+        logger.info(f"Varredura em {scanner.shards} shards: {scanner.stats['pools_per_shard']} pools por shard")
+    
+    def scan_shards(self, block_identifier="latest") -> Tuple[PriceTable, list]:
+        # Todos os shards leem o mesmo bloco, não cada um o seu "latest"
+        block = block_identifier if isinstance(block_identifier, int) else w3.eth.block_number
+        started = time.perf_counter()
+        opportunities = self.scanner.scan(block)
+        table = self.scanner.table(block)
+        child(SNAPSHOT_LATENCY, "shards").observe(time.perf_counter() - started)
+        self.stats["shards"] = dict(self.scanner.stats)
+        return table, opportunities
+    
+    def snapshot_prices(self, block_identifier="latest") -> PriceTable:
+        if self.pool_state is not None:
+            started = time.perf_counter()
+            try:
+                table = self.snapshot_from_events(block_identifier)
+                child(SNAPSHOT_LATENCY, "events").observe(time.perf_counter() - started)
+                return table
+            except Exception as e:
+                self.stats["errors"] += 1
+                count_error("pool_events")
+                logger.error(f"Erro ao atualizar estado dos pools por eventos, usando snapshot completo: {e}")
+        
+        # Cada (DEX, pool) é lido uma única vez por ciclo, em lote via Multicall3 ou batch JSON-RPC.
+        # Com um número de bloco, todas as leituras ficam fixadas nesse bloco.
+        started = time.perf_counter()
+        try:
+            if self.engine is not None:
+                table = self.engine.snapshot_sync(self.pools, block_identifier, timeout=Config.SNAPSHOT_TIMEOUT)
+                child(SNAPSHOT_LATENCY, "async").observe(time.perf_counter() - started)
+                return table
+            if self.pool_reader is not None:
+                table = self.pool_reader.snapshot(self.pools, block_identifier)
+                child(SNAPSHOT_LATENCY, "multicall" if Config.USE_MULTICALL else "batch").observe(
+                    time.perf_counter() - started
+                )
+                return table
+        except Exception as e:
+            self.stats["errors"] += 1
+            count_error("snapshot")
+            logger.error(f"Erro no snapshot em lote, usando leituras individuais: {e}")
+        
+        # Só aqui cada DEX tem a própria latência; em lote todos saem na mesma requisição
+        started = time.perf_counter()
+        table = PriceTable(block_identifier if isinstance(block_identifier, int) else None)
+        for pool in self.pools:
+            quote_started = time.perf_counter()
+            price = self.read_pool(pool.dex, pool.address, block_identifier, pool.kind)
+            child(QUOTE_LATENCY, pool.dex).observe(time.perf_counter() - quote_started)
+            if price is not None:
+                table.add_pool(pool.dex, *price)
+        child(SNAPSHOT_LATENCY, "individual").observe(time.perf_counter() - started)
+        return table
+    
+    def check_arbitrage_opportunity(self, block_identifier="latest") -> None:
+        if self.simulator is not None:
+            # Gás, prêmio e liquidez da Aave atualizados uma vez por head, antes do snapshot
+            # e fora do caminho detecção -> envio
+            self.update_gas(block_identifier)
+            self.flash_loans.update(block_identifier)
+        
+        opportunities = None
+        if self.scanner is not None:
+            try:
+                # Snapshot e score já saem dos workers; aqui só chegam os candidatos
+                table, opportunities = self.scan_shards(block_identifier)
+            except Exception as e:
+                self.stats["errors"] += 1
+                count_error("shards")
+                logger.error(f"Erro na varredura em shards, usando snapshot no processo principal: {e}")
+        if opportunities is None:
+            table = self.snapshot_prices(block_identifier)
+        detected_at = time.perf_counter()
+        self.price_table = table
+        if self.history is not None:
+            self.history.record_snapshot(table)
+        symbols = {address.lower(): symbol for symbol, address in TOKENS.items()}
+        
+        # Spreads de todos os pools de cada par em uma matriz NumPy, threshold sobre o spread líquido de fees
+        if opportunities is None:
+            opportunities = self.detector.spreads(table)
+        candidates = [(opportunity, None) for opportunity in opportunities]
+        if self.simulator is not None and opportunities:
+            # Só alerta o que o contrato confirma no mesmo bloco do snapshot
+            block = table.block if table.block is not None else block_identifier
+            results = self.simulator.simulate(opportunities, block)
+            candidates = [(result.opportunity, result) for result in results]
+            self.stats["simulated"] = self.simulator.simulated
+            self.stats["simulation_rejected"] = self.simulator.rejected
+            self.stats["simulation_screened"] = self.simulator.screened
+            self.stats["simulation_sized"] = self.simulator.sized
+            self.stats["flash_loan"] = self.flash_loans.stats()
+            if self.history is not None:
+                approved = {id(result.opportunity): result.profit_rate for result in results}
+                self.history.record_opportunities(table.block, (
+                    (opportunity, APPROVED, approved[id(opportunity)]) if id(opportunity) in approved
+                    else (opportunity, REJECTED, None)
+                    for opportunity in opportunities
+                ))
+            if self.executor is not None and results:
+                # Só o melhor por ciclo: os outros costumam disputar os mesmos pools
+                tx_hash = self.executor.execute(results[0].params, detected_at)
+                if tx_hash is not None:
+                    DETECTION_TO_SEND.observe(self.executor.stats["last_latency_ms"] / 1000)
+                    logger.info(f"executeArbitrage enviado: {tx_hash} ({self.executor.stats['last_latency_ms']} ms)")
+                self.stats["execution"] = dict(self.executor.stats)
+        elif self.history is not None and opportunities:
+            self.history.record_opportunities(
+                table.block, ((opportunity, NOT_SIMULATED, None) for opportunity in opportunities)
+            )
+
+        for opportunity, simulation in candidates:
+            token1_symbol = symbols.get(opportunity.token_in)
+            token2_symbol = symbols.get(opportunity.token_out)
+            if token1_symbol is None or token2_symbol is None:
+                continue
+            
+            try:
+                self.stats["opportunities_found"] += 1
+                child(OPPORTUNITIES, f"{token1_symbol}/{token2_symbol}", "spread").inc()
+                
+                simulated = ""
+                if simulation is not None:
+                    decimals = self.get_token_decimals(opportunity.token_out) or 0
+                    simulated = (
+                        f"🧪 *Simulado:* {simulation.net_profit / 10 ** decimals:.6f} {token2_symbol} "
+                        f"({simulation.profit_rate * 100:.2f}%) com {simulation.params.amount_in / 10 ** decimals:g} {token2_symbol}\n"
+                    )
+                message = (
+                    f"🚨 *Oportunidade de Arbitragem!*\n\n"
+                    f"💰 *Lucro Estimado:* {opportunity.profit * 100:.2f}%\n"
+                    f"{simulated}"
+                    f"🔄 *Par:* {token1_symbol}/{token2_symbol}\n"
+                    f"📈 *Comprar em:* {opportunity.dex_buy} por {opportunity.price_buy:.6f}\n"
+                    f"📉 *Vender em:* {opportunity.dex_sell} por {opportunity.price_sell:.6f}\n"
+                    f"⏰ *Timestamp:* {datetime.now().strftime('%H:%M:%S')}"
+                )
+                
+                logger.info(f"Oportunidade encontrada: {opportunity.profit*100:.2f}% - {token1_symbol}/{token2_symbol}")
+                # Alertas do mesmo par dentro da janela saem numa mensagem só
+                self.telegram.send_message(
+                    message, ("pair",) + tuple(sorted((opportunity.token_in, opportunity.token_out))), detected_at
+                )
+            
+            except Exception as e:
+                self.stats["errors"] += 1
+                count_error("opportunity")
+                logger.error(f"Erro ao processar {token1_symbol}/{token2_symbol} em {opportunity.dex_buy}/{opportunity.dex_sell}: {e}")
+        
+        self.check_multi_hop_cycles(table, symbols, detected_at)
+    
+    def check_multi_hop_cycles(self, table: PriceTable, symbols: Dict[str, str],
+                               detected_at: Optional[float] = None) -> None:
+        for cycle in self.detector.cycles(table):
+            path = " → ".join(symbols.get(token, token[:10]) for token in cycle.tokens + cycle.tokens[:1])
+            try:
+                self.stats["multi_hop_found"] += 1
+                if self.history is not None:
+                    self.history.record_cycle(table.block, cycle)
+                child(OPPORTUNITIES, "/".join(sorted(symbols.get(token, token[:10]) for token in cycle.tokens)), "multi_hop").inc()
                 
-                for token1_symbol, token1_address in TOKENS.items():
-                    for token2_symbol, token2_address in TOKENS.items():
-                        if token1_symbol == token2_symbol:
-                            continue
-                        
-                        try:
-                            price1 = self.get_price(dex1_name, dex1_address, token1_address, token2_address)
-                            price2 = self.get_price(dex2_name, dex2_address, token1_address, token2_address)
-                            
-                            if price1 and price2 and price1 > 0 and price2 > 0:
-                                profit = (price2 / price1) - 1
-                                
-                                if profit > Config.MIN_PROFIT_THRESHOLD:
-                                    self.stats["opportunities_found"] += 1
-                                    
-                                    message = (
-                                        f"🚨 *Oportunidade de Arbitragem!*\n\n"
-                                        f"💰 *Lucro Estimado:* {profit * 100:.2f}%\n"
-                                        f"🔄 *Par:* {token1_symbol}/{token2_symbol}\n"
-                                        f"📈 *Comprar em:* {dex1_name} por {price1:.6f}\n"
-                                        f"📉 *Vender em:* {dex2_name} por {price2:.6f}\n"
-                                        f"⏰ *Timestamp:* {datetime.now().strftime('%H:%M:%S')}"
-                                    )
-                                    
-                                    logger.info(f"Oportunidade encontrada: {profit*100:.2f}% - {token1_symbol}/{token2_symbol}")
-                                    self.telegram.send_message(message)
-                        
-                        except Exception as e:
-                            self.stats["errors"] += 1
-                            logger.error(f"Erro ao processar {token1_symbol}/{token2_symbol} em {dex1_name}/{dex2_name}: {e}")
-    
-    def run_monitoring_cycle(self) -> None:
+                message = (
+                    f"🚨 *Ciclo Multi-hop!*\n\n"
+                    f"💰 *Lucro Estimado:* {cycle.profit * 100:.2f}%\n"
+                    f"🔄 *Rota:* {path}\n"
+                    f"🏦 *DEXs:* {' → '.join(cycle.pools)}\n"
+                    f"⏰ *Timestamp:* {datetime.now().strftime('%H:%M:%S')}"
+                )
+                
+                logger.info(f"Ciclo multi-hop encontrado: {cycle.profit*100:.2f}% - {path}")
+                self.telegram.send_message(message, ("cycle",) + tuple(sorted(cycle.tokens)), detected_at)
+            
+            except Exception as e:
+                self.stats["errors"] += 1
+                count_error("multi_hop")
+                logger.error(f"Erro ao processar ciclo {path}: {e}")
+    
+    def run_monitoring_cycle(self, block_identifier="latest") -> None:
         logger.info("Iniciando ciclo de monitoramento...")
         self.stats["cycles"] += 1
         self.stats["last_update"] = datetime.now()
         
+        started = time.perf_counter()
         try:
-            self.check_arbitrage_opportunity()
+            self.check_arbitrage_opportunity(block_identifier)
+            self.metadata_cache.save()
             logger.info(f"Ciclo {self.stats['cycles']} concluído")
         except Exception as e:
             logger.error(f"Erro no ciclo de monitoramento: {e}")
             self.stats["errors"] += 1
+            count_error("cycle")
+        CYCLE_DURATION.observe(time.perf_counter() - started)
+    
+    def wait_for_new_block(self) -> int:
+        if self.engine is not None:
+            head = self.engine.next_head_sync(self.last_head)
+        else:
+            # Sem motor assíncrono: polling síncrono de eth_blockNumber
+            while True:
+                head = Head(w3.eth.block_number)
+                if self.last_head is None or head.number > self.last_head.number:
+                    break
+                time.sleep(Config.BLOCK_POLL_INTERVAL)
+        
+        if self.last_head is not None and head.number > self.last_head.number + 1:
+            self.stats["blocks_skipped"] += head.number - self.last_head.number - 1
+        self.last_head = head
+        self.stats["last_block"] = head.number
+        return head.number
+    
+    def run_block_cycle(self) -> None:
+        block_number = self.wait_for_new_block()
+        self.run_monitoring_cycle(block_number)
     
     def start(self) -> None:
         logger.info("🚀 Iniciando Flash Arbitrage Bot...")
+        self.discover_pools()
+        self.warm_metadata_cache()
+        self.configure_sizer()
+        self.start_shards()
+        if self.executor is not None:
+            try:
+                self.executor.warm()
+            except Exception as e:
+                logger.error(f"Erro ao preparar o executor: {e}")
         self.telegram.send_message("🤖 *Flash Arbitrage Bot iniciado!*\n\n✅ Monitoramento ativo")
         
         while True:
             try:
+                if Config.BLOCK_DRIVEN:
+                    self.run_block_cycle()
+                    continue
+                
+                started = time.monotonic()
                 self.run_monitoring_cycle()
-                logger.info(f"Aguardando {Config.CYCLE_DELAY} segundos para próximo ciclo...")
-                time.sleep(Config.CYCLE_DELAY)
+                delay = max(0.0, Config.CYCLE_DELAY - (time.monotonic() - started))
+                if delay > 0:
+                    logger.info(f"Aguardando {delay:.1f} segundos para próximo ciclo...")
+                    time.sleep(delay)
             except KeyboardInterrupt:
                 logger.info("Bot interrompido pelo usuário")
                 self.telegram.send_message("🛑 *Bot parado pelo usuário*")
+                self.telegram.close()
+                if self.history is not None:
+                    self.history.close()
+                if self.scanner is not None:
+                    self.scanner.close()
                 break
             except Exception as e:
                 logger.error(f"Erro crítico: {e}")
+                count_error("critical")
                 self.telegram.send_message(f"❌ *Erro crítico:* {str(e)}")
                 time.sleep(60)  # Aguardar 1 minuto antes de tentar novamente
 
@@ -289,9 +780,21 @@ def health_check():
 @app.route('/stats')
 def get_stats():
     if monitor:
-        return jsonify(monitor.stats)
+        return jsonify({
+            **monitor.stats,
+            "metadata_cache": monitor.metadata_cache.stats(),
+            "rpc_endpoints": PROVIDER_POOL.stats(),
+            "rpc_bucket": RPC_LIMITER.stats(),
+            "telegram": {**monitor.telegram.stats, "pending": monitor.telegram.pending()},
+            "history": monitor.history.stats if monitor.history else None,
+        })
     return jsonify({"error": "Monitor not initialized"}), 503
 
+@app.route('/metrics')
+def metrics():
+    body, content_type = render()
+    return Response(body, content_type=content_type)
+
 def run_flask():
     app.run(host='0.0.0.0', port=8080, debug=False)
 
@@ -302,6 +805,7 @@ if __name__ == "__main__":
     
     # Criar diretório de logs
     os.makedirs('logs', exist_ok=True)
+    os.makedirs(Config.DATA_DIR, exist_ok=True)
     
     # Iniciar API de health check em thread separada
     flask_thread = threading.Thread(target=run_flask, daemon=True)
@@ -309,4 +813,8 @@ if __name__ == "__main__":
     
     # Iniciar monitor
     monitor = PriceMonitor()
+    REGISTRY.register(MonitorCollector(
+        {"token_metadata": monitor.metadata_cache, "gas_estimate": monitor.executor.gas if monitor.executor else None},
+        PROVIDER_POOL, RPC_LIMITER, monitor.telegram, monitor.gas_oracle, lambda: monitor.stats
+    ))
     monitor.start()
@@ -0,0 +1,84 @@
+"""
+Backtest: replay do histórico gravado pela detecção do monitor
+
+Lê os snapshots de data/history (gravados com HISTORY=true), roda o mesmo
+Detector do monitor em cada um, sem RPC e sem esperar o relógio, e mostra
+oportunidades, PnL teórico depois de fees, prêmio e gás, e a vazão em
+blocos por segundo. Cada dia roda num processo.
+
+Uso:
+    python3 scripts/backtest.py --days 14 --min-profit 0.003 --workers 8
+    python3 scripts/backtest.py --start 2026-10-01 --end 2026-10-08 --sizes 0x4200...0006=2,0x8335...2913=5000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.backtest.replay import WETH, BacktestConfig, run_backtest  # noqa: E402
+from src.discovery.pool_registry import PoolRegistry  # noqa: E402
+
+
+def parse_date(value: str) -> float:
+    return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def parse_sizes(value: str):
+    sizes = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        token, size = item.split("=")
+        sizes["WETH" if token.upper() == "WETH" else token.lower()] = float(size)
+    return sizes
+
+
+def load_fees(path: str, chain_id: int):
+    # Fees por rótulo de pool, como no monitor; sem registro o spread fica bruto
+    if not os.path.exists(path):
+        return {}
+    registry = PoolRegistry(path, chain_id)
+    try:
+        return {record.label: record.fee_rate for record in registry.pools()}
+    finally:
+        registry.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=os.path.join("data", "history"))
+    parser.add_argument("--registry", default=os.path.join("data", "pools.sqlite"))
+    parser.add_argument("--chain-id", type=int, default=8453)
+    parser.add_argument("--start", type=parse_date)
+    parser.add_argument("--end", type=parse_date)
+    parser.add_argument("--days", type=float, help="últimos N dias (ignora --start/--end)")
+    parser.add_argument("--min-profit", type=float, default=0.005)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--max-cycle-length", type=int, default=4)
+    parser.add_argument("--no-cycles", action="store_true")
+    parser.add_argument("--sizes", default="WETH=1", help="token emprestado=tamanho, ex.: WETH=1,0x8335...=3000")
+    parser.add_argument("--premium-bps", type=int, default=5)
+    parser.add_argument("--gas-units", type=int, default=350_000)
+    parser.add_argument("--gas-gwei", type=float, default=0.01)
+    parser.add_argument("--weth", default=WETH, help="token em que gás e PnL são medidos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    start, end = args.start, args.end
+    if args.days:
+        end = time.time()
+        start = end - args.days * 86400
+
+    config = BacktestConfig(
+        args.min_profit, args.top_k, load_fees(args.registry, args.chain_id), args.max_cycle_length,
+        {args.weth.lower() if token == "WETH" else token: size for token, size in parse_sizes(args.sizes).items()},
+        args.premium_bps, args.gas_units, args.gas_gwei, args.weth, not args.no_cycles
+    )
+    result, wall = run_backtest(args.root, config, start, end, args.workers)
+    report = result.to_dict()
+    report["wall_seconds"] = round(wall, 3)
+    report["blocks_per_second"] = round(result.snapshots / wall, 1) if wall > 0 else None
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,78 @@
+"""
+Benchmark: eth_call uma por requisição x batch JSON-RPC
+
+Sobe um stub JSON-RPC local com latência fixa por requisição HTTP e mede o
+tempo para ler N chamadas pelo caminho atual (uma eth_call por POST) e pelo
+JsonRpcBatch (um POST por bloco de --batch-size chamadas).
+
+Uso:
+    python3 scripts/bench_batch.py --calls 30 300 --latency 0.05
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from web3 import Web3  # noqa: E402
+
+from src.pricing.pool_reader import SLOT0  # noqa: E402
+from src.rpc.batch import JsonRpcBatch  # noqa: E402
+from src.rpc.multicall import Call, decode_result  # noqa: E402
+from src.rpc.provider_pool import FailoverHTTPProvider, ProviderPool  # noqa: E402
+from stub_rpc_server import StubRPC, serve  # noqa: E402
+
+
+def one_per_request(w3: Web3, calls):
+    results = []
+    for call in calls:
+        try:
+            raw = w3.eth.call({"to": Web3.to_checksum_address(call.target), "data": call.calldata})
+            results.append(decode_result(call, True, bytes(raw)))
+        except Exception:
+            results.append(None)
+    return results
+
+
+def main(sizes, latency: float, batch_size: int, item_error_rate: float, port: int) -> None:
+    stub = StubRPC(latency, 0.0, 0.0, 0.0, 0.0, 0.0, 8453, item_error_rate, batch_size)
+    server = serve("127.0.0.1", port, stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    provider = FailoverHTTPProvider(ProviderPool([f"http://127.0.0.1:{port}"], hedge=False))
+    w3 = Web3(provider)
+    batch = JsonRpcBatch(provider.make_raw_batch, batch_size)
+
+    print(f"{'calls':>6} {'1 por POST':>12} {'batch':>12} {'POSTs':>7} {'speedup':>8} {'ok':>10}")
+    for size in sizes:
+        # O stub devolve uma palavra zerada: decodifica como sqrtPriceX96
+        calls = [Call(f"0x{i + 1:040x}", SLOT0, ("uint160",)) for i in range(size)]
+
+        started = time.perf_counter()
+        single = one_per_request(w3, calls)
+        single_time = time.perf_counter() - started
+
+        sent = batch.batches_sent
+        started = time.perf_counter()
+        batched = batch.call_many(calls)
+        batch_time = time.perf_counter() - started
+
+        ok = f"{sum(r is not None for r in batched)}/{sum(r is not None for r in single)}"
+        print(f"{size:>6} {single_time * 1e3:>9.1f} ms {batch_time * 1e3:>9.1f} ms "
+              f"{batch.batches_sent - sent:>7} {single_time / batch_time:>7.1f}x {ok:>10}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, nargs="+", default=[30, 300])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--item-error-rate", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8621)
+    args = parser.parse_args()
+    main(args.calls, args.latency, args.batch_size, args.item_error_rate, args.port)
@@ -0,0 +1,134 @@
+"""
+Benchmark dos codecs ABI: web3/eth_abi genéricos x FunctionCodec
+
+Sem rede: o eth_call é trocado por um retorno ABI já codificado, então o
+tempo medido é só o overhead Python de cada caminho.
+
+- chamada completa: w3.eth.contract(...).functions.slot0().call() montado a
+  cada leitura (como o monitor fazia) x ContractCache + CodecContract
+- decodificação de slot0, getReserves, token0 e uint256[] (getAmountsOut):
+  eth_abi.decode x decoder() por offset fixo
+- envelope do aggregate3 com N resultados
+
+Antes de medir, confere que os dois caminhos devolvem os mesmos valores.
+
+Uso:
+    python3 scripts/bench_codec.py --calls 20000 --batch 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.rpc.codec import V3_POOL, V3_POOL_ABI, ContractCache, bundled_codecs, decoder  # noqa: E402
+from src.rpc.multicall import Call, decode_aggregate3  # noqa: E402
+
+
+class CannedEth:
+    """Só o eth.call: devolve o retorno codificado do seletor pedido"""
+
+    def __init__(self, returns):
+        self.returns = returns
+
+    def call(self, transaction, block_identifier="latest", **kwargs):
+        data = transaction["data"]
+        selector = bytes(data[:4]) if isinstance(data, (bytes, bytearray)) else bytes.fromhex(data[2:10])
+        return self.returns[selector]
+
+
+def timed(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def sample_returns(rng: random.Random):
+    token = Web3.to_checksum_address(f"0x{rng.getrandbits(160):040x}")
+    return {
+        "slot0": (["uint160", "int24"], [rng.getrandbits(150), -rng.randint(0, 800_000)]),
+        "getReserves": (["uint256", "uint256"], [rng.getrandbits(100), rng.getrandbits(90)]),
+        "token0": (["address"], [token]),
+        "getAmountsOut": (["uint256[]"], [[rng.getrandbits(120) for _ in range(3)]]),
+    }
+
+
+def main(calls: int, batch: int, repeat: int, seed: int) -> None:
+    rng = random.Random(seed)
+    samples = sample_returns(rng)
+    encoded = {name: encode(types, values) for name, (types, values) in samples.items()}
+
+    # Sanidade: mesmos valores nos dois caminhos
+    for name, (types, _) in samples.items():
+        assert decoder(tuple(types))(encoded[name]) == decode(types, encoded[name]), name
+    amounts_out = bundled_codecs("aerodrome").get("getAmountsOut")
+    if amounts_out is not None:
+        assert amounts_out.decode(encoded["getAmountsOut"]) == decode(["uint256[]"], encoded["getAmountsOut"])
+
+    # Chamada completa, com o eth_call trocado por um retorno fixo
+    w3 = Web3()
+    w3.eth.call = CannedEth({V3_POOL["slot0"].selector: encoded["slot0"]}).call
+    addresses = [f"0x{rng.getrandbits(160):040x}" for _ in range(64)]
+    reads = [addresses[i % len(addresses)] for i in range(calls)]
+    contracts = ContractCache(w3)
+
+    def web3_calls():
+        for address in reads:
+            w3.eth.contract(address=Web3.to_checksum_address(address), abi=V3_POOL_ABI).functions.slot0().call()
+
+    def codec_calls():
+        for address in reads:
+            contracts.get(address, V3_POOL).call("slot0")
+
+    assert tuple(w3.eth.contract(address=Web3.to_checksum_address(reads[0]), abi=V3_POOL_ABI)
+                 .functions.slot0().call()) == contracts.get(reads[0], V3_POOL).call("slot0")
+
+    results = [("slot0 via contrato", calls, timed(web3_calls, repeat), timed(codec_calls, repeat))]
+    for name, (types, _) in samples.items():
+        data = encoded[name]
+        fast = decoder(tuple(types))
+        results.append((
+            f"decode {name}", calls,
+            timed(lambda: [decode(types, data) for _ in range(calls)], repeat),
+            timed(lambda: [fast(data) for _ in range(calls)], repeat),
+        ))
+
+    # Envelope do aggregate3 com um lote de slot0
+    batch_calls = [Call(addresses[i % len(addresses)], V3_POOL["slot0"].calldata, ("uint160", "int24"))
+                   for i in range(batch)]
+    raw = encode(["(bool,bytes)[]"], [[(True, encoded["slot0"])] * batch])
+
+    def eth_abi_aggregate():
+        (returned,) = decode(["(bool,bytes)[]"], raw)
+        return [decode(["uint160", "int24"], data) for _, data in returned]
+
+    assert eth_abi_aggregate() == decode_aggregate3(batch_calls, raw)
+    rounds = max(1, calls // batch)
+    results.append((
+        f"aggregate3 x{batch}", rounds * batch,
+        timed(lambda: [eth_abi_aggregate() for _ in range(rounds)], repeat),
+        timed(lambda: [decode_aggregate3(batch_calls, raw) for _ in range(rounds)], repeat),
+    ))
+
+    print(f"{'caso':<22} {'web3/eth_abi':>14} {'codec':>12} {'speedup':>8}")
+    for name, count, slow, fast in results:
+        print(f"{name:<22} {slow / count * 1e6:>11.2f} us {fast / count * 1e6:>9.2f} us {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.calls, args.batch, args.repeat, args.seed)
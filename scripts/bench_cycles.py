@@ -0,0 +1,80 @@
+"""
+Benchmark da detecção de ciclos num grafo sintético de tokens
+
+Gera tokens com alguns hubs (como WETH/USDC) e pools entre eles, mede a
+varredura completa e a busca incremental depois de mudar o preço de uma
+fração dos pools, como aconteceria a cada bloco.
+
+Uso:
+    python3 scripts/bench_cycles.py --tokens 500 --pools 5000 --updates 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.strategy.cycles import TokenGraph  # noqa: E402
+
+DEX_NAMES = ["Uniswap V3", "SushiSwap V3", "Aerodrome"]
+
+
+def synthetic_pools(tokens: int, pools: int, hubs: int, rng: random.Random):
+    addresses = [f"0x{i:040x}" for i in range(tokens)]
+    # Preço de referência em "USD" por token; o preço do pool é a razão com um ruído pequeno
+    reference = [rng.lognormvariate(0, 3) for _ in range(tokens)]
+    result = []
+    for i in range(pools):
+        a = rng.randrange(hubs) if rng.random() < 0.6 else rng.randrange(tokens)
+        b = rng.randrange(tokens)
+        if a == b:
+            continue
+        price = reference[a] / reference[b] * rng.uniform(0.995, 1.005)
+        result.append((f"{rng.choice(DEX_NAMES)}:{i}", addresses[a], addresses[b], price))
+    return result
+
+
+def main(tokens: int, pools: int, hubs: int, updates: int, rounds: int, min_profit: float, seed: int) -> None:
+    rng = random.Random(seed)
+    pool_list = synthetic_pools(tokens, pools, hubs, rng)
+
+    graph = TokenGraph(max_length=4)
+    started = time.perf_counter()
+    for pool, token0, token1, price in pool_list:
+        graph.update_pool(pool, token0, token1, price, fee_bps=30)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cycles = graph.find_cycles(min_profit, full=True)
+    full = time.perf_counter() - started
+    print(f"grafo: {graph.token_count} tokens, {len(pool_list)} pools, {len(graph)} arestas")
+    print(f"construção: {build * 1e3:.1f} ms | varredura completa: {full * 1e3:.1f} ms, {len(cycles)} ciclos")
+
+    timings, found = [], 0
+    for _ in range(rounds):
+        for pool, token0, token1, price in rng.sample(pool_list, min(updates, len(pool_list))):
+            graph.update_pool(pool, token0, token1, price * rng.uniform(0.997, 1.003), fee_bps=30)
+        started = time.perf_counter()
+        found += len(graph.find_cycles(min_profit))
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(f"incremental ({updates} pools alterados/bloco, {rounds} blocos): "
+          f"mediana {timings[len(timings) // 2] * 1e3:.1f} ms, pior {timings[-1] * 1e3:.1f} ms, "
+          f"{found / rounds:.1f} ciclos/bloco")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--pools", type=int, default=5000)
+    parser.add_argument("--hubs", type=int, default=5)
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--min-profit", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.tokens, args.pools, args.hubs, args.updates, args.rounds, args.min_profit, args.seed)
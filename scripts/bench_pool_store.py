@@ -0,0 +1,156 @@
+"""
+Benchmark de memória e iteração: PoolStore (colunas) x dicts de tuplas
+
+O formato antigo é o do PoolStateEngine antes da PoolStore: endereço
+checksum -> PoolSpec, endereço -> PoolState (NamedTuple de ints Python) e
+token0/token1/decimais num dict de metadados. Para N pools sintéticos mede:
+
+- memória retida (tracemalloc) para guardar pools, tokens e estado
+- preços de todos os pools (loop Python x colunas vetorizadas)
+- PriceTable completa
+- leitura campo a campo (tupla x PoolView)
+- atualização de estado, como na aplicação de um log
+
+Uso:
+    python3 scripts/bench_pool_store.py --pools 10000 50000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.pricing.pool_reader import SOLIDLY, UNISWAP_V3, PoolSpec, reserves_price, v3_price  # noqa: E402
+from src.pricing.pool_state import PoolState  # noqa: E402
+from src.pricing.pool_store import PoolStore  # noqa: E402
+from src.pricing.price_table import PriceTable  # noqa: E402
+
+
+def synthetic(count: int, seed: int):
+    rng = random.Random(seed)
+    tokens = [f"0x{rng.getrandbits(160):040x}" for _ in range(max(2, count // 10))]
+    rows = []
+    for i in range(count):
+        kind = UNISWAP_V3 if i % 2 else SOLIDLY
+        token0, token1 = rng.sample(tokens, 2)
+        state = PoolState(
+            rng.getrandbits(100), rng.randint(-50_000, 50_000), rng.getrandbits(90), rng.getrandbits(80),
+            rng.getrandbits(80), 1
+        )
+        rows.append((f"0x{rng.getrandbits(160):040x}", f"DEX {i % 5}", kind, token0, token1, 18, 6 + i % 13, state))
+    return rows
+
+
+def build_dicts(rows):
+    pools, states, metadata = {}, {}, {}
+    for address, dex, kind, token0, token1, decimals0, decimals1, state in rows:
+        address = Web3.to_checksum_address(address)
+        pools[address] = PoolSpec(dex, address, kind)
+        states[address] = state
+        metadata[(address, "token0")] = Web3.to_checksum_address(token0)
+        metadata[(address, "token1")] = Web3.to_checksum_address(token1)
+        metadata[(token0, "decimals")] = decimals0
+        metadata[(token1, "decimals")] = decimals1
+    return pools, states, metadata
+
+
+def build_store(rows):
+    store = PoolStore()
+    for address, dex, kind, token0, token1, decimals0, decimals1, state in rows:
+        index = store.add(PoolSpec(dex, address, kind))
+        store.set_tokens(index, token0, token1, decimals0, decimals1)
+        store.set_v3(index, state.sqrt_price_x96, state.tick, state.liquidity, state.block)
+        store.set_reserves(index, state.reserve0, state.reserve1, state.block)
+    return store
+
+
+def retained(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    result = build(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def dict_prices(pools, states, metadata):
+    prices = []
+    for address, state in states.items():
+        pool = pools[address]
+        token0, token1 = metadata[(address, "token0")], metadata[(address, "token1")]
+        decimals0 = metadata[(token0.lower(), "decimals")]
+        decimals1 = metadata[(token1.lower(), "decimals")]
+        if pool.kind == UNISWAP_V3:
+            prices.append(v3_price(state.sqrt_price_x96, decimals0, decimals1))
+        else:
+            prices.append(reserves_price(state.reserve0, state.reserve1, decimals0, decimals1))
+    return prices
+
+
+def dict_table(pools, states, metadata):
+    table = PriceTable(1)
+    for (address, pool), price in zip(pools.items(), dict_prices(pools, states, metadata)):
+        table.add_pool(pool.dex, metadata[(address, "token0")], metadata[(address, "token1")], price)
+    return table
+
+
+def timed(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(sizes, repeat: int, seed: int) -> None:
+    for count in sizes:
+        rows = synthetic(count, seed)
+        (pools, states, metadata), dict_bytes = retained(build_dicts, rows)
+        store, store_bytes = retained(build_store, rows)
+        addresses = list(states)
+        indexes = list(range(len(store)))
+        updates = [(random.Random(seed + i).getrandbits(100), i % 1000) for i in range(count)]
+
+        def dict_fields():
+            return sum(state.liquidity + state.tick for state in states.values())
+
+        def store_fields():
+            return sum(pool.liquidity + pool.tick for pool in store)
+
+        def dict_updates():
+            for address, (sqrt_price, tick) in zip(addresses, updates):
+                states[address] = states[address]._replace(sqrt_price_x96=sqrt_price, tick=tick, block=2)
+
+        def store_updates():
+            for index, (sqrt_price, tick) in zip(indexes, updates):
+                store.set_v3(index, sqrt_price, tick, 0, 2)
+
+        results = [
+            ("preços", timed(lambda: dict_prices(pools, states, metadata), repeat), timed(store.prices, repeat)),
+            ("PriceTable", timed(lambda: dict_table(pools, states, metadata), repeat),
+             timed(lambda: store.price_table(1), repeat)),
+            ("campos por pool", timed(dict_fields, repeat), timed(store_fields, repeat)),
+            ("atualizações", timed(dict_updates, repeat), timed(store_updates, repeat)),
+        ]
+        print(f"{count} pools: memória {dict_bytes / 2**20:.1f} MiB (dicts) x {store_bytes / 2**20:.1f} MiB (store), "
+              f"{dict_bytes / store_bytes:.1f}x menor; colunas {store.nbytes / 2**20:.1f} MiB")
+        for name, dict_time, store_time in results:
+            print(f"  {name:<16} {dict_time * 1e3:>9.2f} ms x {store_time * 1e3:>9.2f} ms  "
+                  f"({dict_time / store_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pools", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.pools, args.repeat, args.seed)
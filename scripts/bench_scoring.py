@@ -0,0 +1,64 @@
+"""
+Benchmark do score de spreads: loop Python atual x matriz NumPy
+
+Gera N pools do mesmo par com preços em torno de um valor de referência e
+compara find_arbitrage_opportunities (loops aninhados) com
+score_opportunities (matriz N×N vetorizada).
+
+Uso:
+    python3 scripts/bench_scoring.py --sizes 10 100 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.pricing.price_table import PriceTable, find_arbitrage_opportunities  # noqa: E402
+from src.strategy.scoring import score_opportunities  # noqa: E402
+
+WETH = "0x4200000000000000000000000000000000000006"
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+
+
+def synthetic_table(pools: int, rng: random.Random):
+    table = PriceTable(1)
+    fees = {}
+    for i in range(pools):
+        label = f"pool-{i}"
+        table.add_pool(label, WETH, USDC, 3000 * rng.uniform(0.99, 1.01))
+        fees[label] = rng.choice((0.0001, 0.0005, 0.003, 0.01))
+    return table, fees
+
+
+def timed(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(sizes, min_profit: float, top_k: int, repeat: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"{'pools':>6} {'loop':>12} {'numpy':>12} {'speedup':>8}")
+    for size in sizes:
+        table, fees = synthetic_table(size, rng)
+        loop = timed(lambda: find_arbitrage_opportunities(table, min_profit), repeat)
+        vectorized = timed(lambda: score_opportunities(table, min_profit, top_k, fees), repeat)
+        print(f"{size:>6} {loop * 1e3:>9.3f} ms {vectorized * 1e3:>9.3f} ms {loop / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--min-profit", type=float, default=0.005)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.sizes, args.min_profit, args.top_k, args.repeat, args.seed)
@@ -0,0 +1,143 @@
+"""
+Benchmark da varredura em shards: um processo x N processos
+
+Gera milhares de pools sintéticos (V3 e Solidly, vários pools por par) com
+o retorno ABI de slot0/getReserves já codificado. Cada bloco decodifica
+esse retorno, calcula os preços e pontua os spreads, como o leitor RPC dos
+workers, só que sem rede. Compara a varredura no próprio processo com o
+ShardedScanner em cada número de shards.
+
+Além do tempo de parede, mostra o teto de speedup medido pela CPU: soma da
+CPU dos shards / CPU do shard mais lento. Com núcleos livres, o speedup
+real se aproxima desse teto; numa máquina de um núcleo ele fica perto de 1.
+
+Uso:
+    python3 scripts/bench_sharded.py --pools 4000 --shards 1 2 4 8 --blocks 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from eth_abi import encode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.pricing.pool_reader import SOLIDLY, UNISWAP_V3, PoolSpec, price_from_state, state_call  # noqa: E402
+from src.pricing.price_table import PriceTable  # noqa: E402
+from src.pricing.sharded import ShardedScanner, ShardPool  # noqa: E402
+from src.rpc.multicall import decode_result  # noqa: E402
+from src.strategy.detector import Detector  # noqa: E402
+
+VARIANTS = 8
+
+
+class SyntheticShardReader:
+    """Mesmo contrato do RpcShardReader; os retornos ABI saem de uma tabela pré-codificada"""
+
+    def __init__(self, seed: int = 7):
+        self.seed = seed
+        self._returns = None
+
+    def _encode(self, pools):
+        returns = {}
+        for pool in pools:
+            # Semente por pool: os preços não dependem de como os pools foram particionados
+            rng = random.Random(f"{self.seed}-{pool.spec.address}")
+            # Preço-base do par derivado do endereço do token: igual em todos os shards
+            base = 1 + int(pool.token1[-6:], 16) % 5000
+            variants = []
+            for _ in range(VARIANTS):
+                price = base * rng.uniform(0.995, 1.005)
+                if pool.spec.kind == UNISWAP_V3:
+                    variants.append(encode(["uint160", "int24"], [int(price ** 0.5 * 2**96), 0]))
+                else:
+                    reserve0 = rng.randint(10**20, 10**22)
+                    variants.append(encode(["uint256", "uint256"], [reserve0, int(reserve0 * price)]))
+            returns[pool.spec.address] = variants
+        return returns
+
+    def read(self, pools, block_identifier):
+        if self._returns is None:
+            self._returns = self._encode(pools)
+        prices = []
+        for pool in pools:
+            call = state_call(pool.spec)
+            data = self._returns[pool.spec.address][block_identifier % VARIANTS]
+            state = decode_result(call, True, data)
+            prices.append(None if state is None else price_from_state(pool.spec, state, 18, 18))
+        return prices
+
+
+def synthetic_pools(count: int, per_pair: int):
+    pools = []
+    for i in range(count):
+        pair = i // per_pair
+        kind = UNISWAP_V3 if i % 2 else SOLIDLY
+        spec = PoolSpec(f"DEX {i % per_pair}", f"0x{i + 1:040x}", kind)
+        pools.append(ShardPool(spec, f"0x{10**6:040x}", f"0x{10**6 + pair + 1:040x}", 18, 18))
+    return pools
+
+
+def scan_in_process(pools, detector: Detector, blocks: range):
+    reader = SyntheticShardReader()
+    reader.read(pools, 0)
+    started = time.perf_counter()
+    found = 0
+    for block in blocks:
+        table = PriceTable(block)
+        for pool, price in zip(pools, reader.read(pools, block)):
+            if price is not None:
+                table.add_pool(pool.spec.dex, pool.token0, pool.token1, price)
+        found += len(detector.spreads(table))
+    return time.perf_counter() - started, found
+
+
+def scan_sharded(pools, detector: Detector, shards: int, blocks: range, warmup: int):
+    scanner = ShardedScanner(pools, shards, SyntheticShardReader(), detector)
+    scanner.start()
+    try:
+        for block in range(-warmup, 0):
+            scanner.scan(block)
+        total_cpu = slowest_cpu = 0.0
+        found = 0
+        started = time.perf_counter()
+        for block in blocks:
+            found += len(scanner.scan(block))
+            scanner.table(block)
+            total_cpu += sum(scanner.stats["cpu_seconds"])
+            slowest_cpu += max(scanner.stats["cpu_seconds"])
+        elapsed = time.perf_counter() - started
+        return elapsed, found, total_cpu / slowest_cpu if slowest_cpu else 0.0, scanner.stats
+    finally:
+        scanner.close()
+
+
+def main(pool_count: int, per_pair: int, shard_counts, block_count: int, warmup: int, min_profit: float) -> None:
+    pools = synthetic_pools(pool_count, per_pair)
+    detector = Detector(min_profit, None)
+    blocks = range(block_count)
+    print(f"{len(pools)} pools, {len(pools) // per_pair} pares, {block_count} blocos, {os.cpu_count()} CPUs")
+
+    baseline, found = scan_in_process(pools, detector, blocks)
+    print(f"{'processos':>9} {'blocos/s':>9} {'pools/s':>10} {'speedup':>8} {'teto CPU':>9} {'candidatos':>10}")
+    print(f"{'1 (local)':>9} {block_count / baseline:>9.1f} {pool_count * block_count / baseline:>10.0f} "
+          f"{1.0:>7.2f}x {'':>9} {found:>10}")
+    for shards in shard_counts:
+        elapsed, found, ceiling, stats = scan_sharded(pools, detector, shards, blocks, warmup)
+        print(f"{shards:>9} {block_count / elapsed:>9.1f} {pool_count * block_count / elapsed:>10.0f} "
+              f"{baseline / elapsed:>7.2f}x {ceiling:>8.2f}x {found:>10}   pools por shard: {stats['pools_per_shard']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pools", type=int, default=4000)
+    parser.add_argument("--pools-per-pair", type=int, default=4)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--blocks", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--min-profit", type=float, default=0.005)
+    args = parser.parse_args()
+    main(args.pools, args.pools_per_pair, args.shards, args.blocks, args.warmup, args.min_profit)
@@ -0,0 +1,82 @@
+"""
+Benchmark do solver de tamanho ótimo em pools sintéticos
+
+Uso:
+    python3 scripts/bench_sizing.py --pairs 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.pricing.quoter import V3PoolState, get_sqrt_ratio_at_tick, solidly_volatile_amount_out  # noqa: E402
+from src.strategy.sizing import optimal_constant_product, optimal_numeric  # noqa: E402
+
+
+def synthetic_constant_product_pairs(count: int, rng: random.Random):
+    pairs = []
+    for _ in range(count):
+        reserve_a = rng.randint(10, 10_000) * 10**18
+        price = rng.uniform(1_000, 4_000)
+        spread = rng.uniform(-0.02, 0.02)
+        reserve_b_buy = int(reserve_a / 10**18 * price * (1 + spread)) * 10**6
+        reserve_a_sell = rng.randint(10, 10_000) * 10**18
+        reserve_b_sell = int(reserve_a_sell / 10**18 * price) * 10**6
+        pairs.append((reserve_a, reserve_b_buy, reserve_b_sell, reserve_a_sell))
+    return pairs
+
+
+def synthetic_v3_pool(rng: random.Random) -> V3PoolState:
+    tick = rng.randint(-1000, 1000)
+    liquidity_net = {}
+    liquidity = 0
+    for width in (60, 600, 6000):
+        amount = rng.randint(1, 100) * 10**20
+        lower, upper = (tick - width) // 60 * 60, (tick + width) // 60 * 60 + 60
+        liquidity_net[lower] = liquidity_net.get(lower, 0) + amount
+        liquidity_net[upper] = liquidity_net.get(upper, 0) - amount
+        liquidity += amount
+    return V3PoolState(get_sqrt_ratio_at_tick(tick), tick, liquidity, 3000, 60, liquidity_net)
+
+
+def bench(name: str, solve, cases) -> None:
+    found = 0
+    started = time.perf_counter()
+    for case in cases:
+        if solve(case) is not None:
+            found += 1
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {len(cases):>6} pares  {elapsed * 1e3:9.1f} ms  "
+          f"{elapsed / len(cases) * 1e6:9.1f} µs/par  {found} lucrativos")
+
+
+def main(count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    cp_pairs = synthetic_constant_product_pairs(count, rng)
+
+    bench("produto constante (fechada)", lambda r: optimal_constant_product(*r), cp_pairs)
+    bench("produto constante (numérica)", lambda r: optimal_numeric(
+        lambda x: solidly_volatile_amount_out(x, r[0], r[1]),
+        lambda y: solidly_volatile_amount_out(y, r[2], r[3]),
+    ), cp_pairs)
+
+    v3_cases = []
+    for r in cp_pairs[:max(1, count // 10)]:
+        pool = synthetic_v3_pool(rng)
+        v3_cases.append((pool, r))
+    bench("V3 -> produto constante", lambda case: optimal_numeric(
+        lambda x: case[0].quote_exact_input(x, True),
+        lambda y: solidly_volatile_amount_out(y, case[1][1], case[1][0]),
+    ), v3_cases)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.pairs, args.seed)
@@ -0,0 +1,74 @@
+"""
+Benchmark: alertas do Telegram enviados em linha x fila em segundo plano
+
+Sobe o Telegram simulado (scripts/mock_telegram_server.py) e dispara uma
+rajada de alertas espalhados por alguns pares, como um ciclo de varredura
+com muitas oportunidades. Mede quanto tempo o "scanner" fica preso em
+send_message em cada modo e quantas mensagens chegam ao chat.
+
+Uso:
+    python3 scripts/bench_telegram.py --alerts 50 --pairs 5 --latency 0.3
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_telegram_server import MockTelegram, serve  # noqa: E402
+from src.notifications.telegram_notifier import CHAT_MESSAGE_INTERVAL, TelegramNotifier  # noqa: E402
+
+
+def inline(url: str, alerts) -> float:
+    # Caminho antigo: POST bloqueante com 1 s de espaçamento antes de cada mensagem
+    started = time.perf_counter()
+    for pair, text in alerts:
+        time.sleep(CHAT_MESSAGE_INTERVAL)
+        requests.post(f"{url}/botTOKEN/sendMessage", json={"chat_id": 1, "text": text}, timeout=10)
+    return time.perf_counter() - started
+
+
+def queued(url: str, alerts, window: float):
+    notifier = TelegramNotifier("TOKEN", "1", api_url=url, coalesce_window=window)
+    started = time.perf_counter()
+    for pair, text in alerts:
+        notifier.send_message(text, key=pair)
+    blocked = time.perf_counter() - started
+    notifier.close(timeout=60)
+    return blocked, time.perf_counter() - started, notifier.stats
+
+
+def main(count: int, pairs: int, latency: float, window: float, port: int, skip_inline: bool) -> None:
+    mock = MockTelegram(latency)
+    server = serve("127.0.0.1", port, mock)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{port}"
+    alerts = [(f"par-{i % pairs}", f"alerta {i} do par {i % pairs}") for i in range(count)]
+
+    if not skip_inline:
+        elapsed = inline(url, alerts)
+        print(f"em linha: scanner preso {elapsed:.2f}s, {len(mock.messages)} mensagens, {mock.rejected} 429")
+        mock.messages.clear()
+        mock.rejected = 0
+
+    blocked, total, stats = queued(url, alerts, window)
+    print(f"fila:     scanner preso {blocked * 1000:.2f}ms, {len(mock.messages)} mensagens em {total:.2f}s, "
+          f"{mock.rejected} 429, {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, default=50)
+    parser.add_argument("--pairs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--window", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8701)
+    parser.add_argument("--skip-inline", action="store_true")
+    args = parser.parse_args()
+    main(args.alerts, args.pairs, args.latency, args.window, args.port, args.skip_inline)
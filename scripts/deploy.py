@@ -1,8 +1,13 @@
 import os
+import sys
 from web3 import Web3
 from dotenv import load_dotenv
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from src.chain.gas_oracle import GasOracle  # noqa: E402
+
 load_dotenv()
 
 # --- Configuração ---
@@ -38,6 +43,9 @@ def deploy():
         AAVE_POOL_ADDRESSES_PROVIDER
     ).estimate_gas()
 
+    # Fees EIP-1559 previstas a partir do histórico recente (em vez de gasPrice legado)
+    quote = GasOracle(w3).update()
+
     # Construir a transação
     tx = FlashArbitrage.constructor(
         AAVE_POOL_ADDRESSES_PROVIDER
@@ -45,7 +53,8 @@ def deploy():
         "from": account.address,
         "nonce": w3.eth.get_transaction_count(account.address),
         "gas": gas_estimate,
-        "gasPrice": w3.eth.gas_price,
+        "maxFeePerGas": quote.max_fee,
+        "maxPriorityFeePerGas": quote.priority_fee,
     })
 
     # Assinar e enviar a transação
@@ -0,0 +1,149 @@
+"""
+Teste ponta a ponta do simulador + executor num nó local (Hardhat ou Anvil)
+
+Implanta os mocks (MockAAVEPool, MockPoolAddressesProvider, dois MockDEX,
+dois MockERC20) e o FlashArbitrage a partir dos artefatos do Hardhat, cria
+um spread entre os dois DEXs, simula o candidato com calculateProfit e envia
+executeArbitrage pelo ArbitrageExecutor, medindo a latência da detecção ao
+eth_sendRawTransaction.
+
+O FlashLoanCosts lê do MockAAVEPool o prêmio configurado (--premium-bps) e
+a liquidez do pool, e o screen() tem de reduzir um empréstimo maior que ela.
+
+Uso:
+    npx hardhat compile && npx hardhat node
+    python3 scripts/e2e_executor.py --rounds 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from web3 import Web3  # noqa: E402
+
+from src.chain.flash_loan import FlashLoanCosts  # noqa: E402
+from src.execution.executor import ArbitrageExecutor  # noqa: E402
+from src.execution.simulator import CandidateSimulator  # noqa: E402
+from src.pricing.price_table import Opportunity  # noqa: E402
+from src.rpc.multicall import decode_result  # noqa: E402
+
+ARTIFACTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "artifacts", "contracts")
+
+# Conta #0 padrão do Hardhat/Anvil (chave pública de teste, sem fundos reais)
+DEV_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+ARBITRAGE_EXECUTED_TOPIC = Web3.keccak(
+    text="ArbitrageExecuted(address,address,address,address,uint256,uint256,address)"
+)
+
+
+def load_artifact(name: str):
+    with open(os.path.join(ARTIFACTS, f"{name}.sol", f"{name}.json")) as f:
+        artifact = json.load(f)
+    return artifact["abi"], artifact["bytecode"]
+
+
+def deploy(w3: Web3, name: str, *args):
+    abi, bytecode = load_artifact(name)
+    tx_hash = w3.eth.contract(abi=abi, bytecode=bytecode).constructor(*args).transact()
+    address = w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+    return w3.eth.contract(address=address, abi=abi)
+
+
+def transact(w3: Web3, function) -> None:
+    w3.eth.wait_for_transaction_receipt(function.transact())
+
+
+def eth_call_many(w3: Web3):
+    # Sem Multicall3 no nó local: uma eth_call por simulação
+    def call_many(calls, block_identifier="latest"):
+        return [
+            decode_result(call, True, bytes(w3.eth.call({"to": call.target, "data": call.calldata}, block_identifier)))
+            for call in calls
+        ]
+    return call_many
+
+
+def main(rpc_url: str, private_key: str, rounds: int, premium_bps: int) -> None:
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    owner = w3.eth.account.from_key(private_key).address
+    w3.eth.default_account = owner
+    ether = 10 ** 18
+
+    aave_pool = deploy(w3, "MockAAVEPool")
+    provider = deploy(w3, "MockPoolAddressesProvider", aave_pool.address)
+    dex_buy = deploy(w3, "MockDEX")
+    dex_sell = deploy(w3, "MockDEX")
+    token_a = deploy(w3, "MockERC20", "Token A", "TKA")
+    token_b = deploy(w3, "MockERC20", "Token B", "TKB")
+    flash = deploy(w3, "FlashArbitrage", provider.address)
+
+    for dex in (dex_buy, dex_sell):
+        transact(w3, flash.functions.addSupportedDEX(dex.address))
+    # 1 A -> 1.1 B no dex_buy, 1 B -> 0.95 A no dex_sell: 4,5% por volta
+    transact(w3, dex_buy.functions.setPrice(token_a.address, token_b.address, 11 * ether // 10))
+    transact(w3, dex_sell.functions.setPrice(token_b.address, token_a.address, 95 * ether // 100))
+    transact(w3, token_a.functions.mint(aave_pool.address, 1000 * ether))
+    transact(w3, token_a.functions.mint(dex_sell.address, 10_000 * ether))
+    transact(w3, token_b.functions.mint(dex_buy.address, 10_000 * ether))
+
+    transact(w3, aave_pool.functions.updateFlashloanPremiums(premium_bps, 0))
+
+    # Pool resolvido por POOL() do FlashArbitrage; o mock empresta do próprio saldo (1000 A)
+    flash_loans = FlashLoanCosts(eth_call_many(w3), [token_a.address], receiver=flash.address, default_premium_bps=0)
+    flash_loans.update(w3.eth.block_number)
+    available = flash_loans.max_amount(token_a.address)
+    print(f"pool {flash_loans.pool}: prêmio {flash_loans.premium_bps} bps, liquidez {available / ether:g} A")
+    if flash_loans.premium_bps != premium_bps or available != 1000 * ether:
+        print(f"Leitura inesperada do MockAAVEPool: {flash_loans.stats()}")
+        return
+    if flash_loans.screen(token_a.address, 0.045, [10 * ether, 2000 * ether], 0.005) != [10 * ether, 1000 * ether]:
+        print("screen() não limitou o empréstimo à liquidez do pool")
+        return
+
+    routers = {"Buy DEX": dex_buy.address, "Sell DEX": dex_sell.address}
+    simulator = CandidateSimulator(
+        eth_call_many(w3), flash.address, routers, 0.005, lambda token: 10 * ether, ladder=(1.0,),
+        flash_loans=flash_loans
+    )
+    executor = ArbitrageExecutor(w3, flash.address, private_key, w3.eth.chain_id)
+    executor.warm()
+
+    # price = token_out por token_in: token_out (A) é o emprestado
+    opportunity = Opportunity(
+        token_b.address.lower(), token_a.address.lower(), "Buy DEX", "Sell DEX", 1 / 1.1, 0.95, 0.045, 0.045
+    )
+    latencies = []
+    for _ in range(rounds):
+        results = simulator.simulate([opportunity])
+        if not results:
+            print("Simulação não aprovou o candidato")
+            return
+        detected_at = time.perf_counter()
+        tx_hash = executor.execute(results[0].params, detected_at)
+        if tx_hash is None:
+            print(f"Execução falhou: {executor.stats}")
+            return
+        latencies.append(executor.stats["last_latency_ms"])
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        executed = any(log["topics"][0] == ARBITRAGE_EXECUTED_TOPIC for log in receipt["logs"])
+        print(f"{tx_hash} status={receipt['status']} ArbitrageExecuted={executed} "
+              f"lucro simulado={results[0].net_profit / ether:.4f} A (prêmio {results[0].flash_fee / ether:g} A) "
+              f"latência={latencies[-1]:.2f} ms")
+
+    print(f"gás em cache: {executor.gas.hits} hits / {executor.gas.misses} misses; "
+          f"latência média {sum(latencies) / len(latencies):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-url", default="http://127.0.0.1:8545")
+    parser.add_argument("--private-key", default=DEV_KEY)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--premium-bps", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rpc_url, args.private_key, args.rounds, args.premium_bps)
@@ -0,0 +1,84 @@
+"""
+Servidor websocket local que emite newHeads sintéticos
+
+Uso para testes locais do modo por bloco:
+    python3 scripts/mock_heads_server.py --port 8546 --interval 2
+    BLOCK_DRIVEN=true WS_URL=ws://localhost:8546 python3 opportunity_monitor_improved.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+
+import websockets
+
+
+class MockHeadsServer:
+    def __init__(self, interval: float, start_block: int):
+        self.interval = interval
+        self.block_number = start_block
+        self.subscribers = {}
+
+    def _header(self) -> dict:
+        return {
+            "number": hex(self.block_number),
+            "hash": "0x" + os.urandom(32).hex(),
+            "timestamp": hex(int(asyncio.get_running_loop().time())),
+        }
+
+    async def handler(self, websocket, path=None):
+        try:
+            async for message in websocket:
+                request = json.loads(message)
+                method = request.get("method")
+                if method == "eth_subscribe" and request.get("params") == ["newHeads"]:
+                    subscription = "0x" + os.urandom(16).hex()
+                    self.subscribers[websocket] = subscription
+                    result = subscription
+                elif method == "eth_blockNumber":
+                    result = hex(self.block_number)
+                else:
+                    await websocket.send(json.dumps({
+                        "jsonrpc": "2.0", "id": request.get("id"),
+                        "error": {"code": -32601, "message": f"method {method} not supported"}
+                    }))
+                    continue
+                await websocket.send(json.dumps({"jsonrpc": "2.0", "id": request.get("id"), "result": result}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.subscribers.pop(websocket, None)
+
+    async def produce_blocks(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            self.block_number += 1
+            header = self._header()
+            for websocket, subscription in list(self.subscribers.items()):
+                notification = {
+                    "jsonrpc": "2.0",
+                    "method": "eth_subscription",
+                    "params": {"subscription": subscription, "result": header},
+                }
+                try:
+                    await websocket.send(json.dumps(notification))
+                except Exception:
+                    self.subscribers.pop(websocket, None)
+
+
+async def main(host: str, port: int, interval: float, start_block: int):
+    server = MockHeadsServer(interval, start_block)
+    async with websockets.serve(server.handler, host, port):
+        print(f"newHeads sintéticos em ws://{host}:{port} a cada {interval}s")
+        await server.produce_blocks()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8546)
+    parser.add_argument("--interval", type=float, default=2.0)
+    parser.add_argument("--start-block", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.interval, args.start_block))
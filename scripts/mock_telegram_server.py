@@ -0,0 +1,97 @@
+"""
+Servidor local que imita o sendMessage do Bot API do Telegram
+
+Aceita POST /bot<token>/sendMessage com latência fixa, registra as mensagens
+recebidas e devolve 429 com parameters.retry_after quando um chat passa de
+--chat-limit mensagens por segundo (ou numa fração aleatória, --rate-limit-rate):
+
+    python3 scripts/mock_telegram_server.py --port 8701 --latency 0.3
+    TELEGRAM_API_URL=http://127.0.0.1:8701 TELEGRAM_BOT_TOKEN=x TELEGRAM_CHAT_ID=1 \\
+        python3 opportunity_monitor_improved.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List
+
+
+class MockTelegram:
+    def __init__(self, latency: float, chat_limit: float = 1.0, rate_limit_rate: float = 0.0, retry_after: int = 1):
+        self.latency = latency
+        self.chat_limit = chat_limit
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.messages: List[dict] = []
+        self.rejected = 0
+        self._recent: Dict[str, Deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def accept(self, payload: dict) -> bool:
+        """Janela de 1 s por chat: acima de chat_limit mensagens, 429"""
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent[str(payload.get("chat_id"))]
+            while recent and now - recent[0] >= 1.0:
+                recent.popleft()
+            if len(recent) >= self.chat_limit or random.random() < self.rate_limit_rate:
+                self.rejected += 1
+                return False
+            recent.append(now)
+            self.messages.append(payload)
+            return True
+
+
+def make_handler(mock: MockTelegram):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(mock.latency)
+            if not self.path.endswith("/sendMessage"):
+                self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            elif mock.accept(payload):
+                self._reply(200, {"ok": True, "result": {"message_id": len(mock.messages), "text": payload.get("text")}})
+            else:
+                self._reply(429, {"ok": False, "error_code": 429,
+                                  "description": f"Too Many Requests: retry after {mock.retry_after}",
+                                  "parameters": {"retry_after": mock.retry_after}})
+
+    return Handler
+
+
+def serve(host: str, port: int, mock: MockTelegram) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8701)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--chat-limit", type=float, default=1.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    mock = MockTelegram(args.latency, args.chat_limit, args.rate_limit_rate, args.retry_after)
+    print(f"Telegram simulado em http://{args.host}:{args.port} (latência {args.latency}s)")
+    serve(args.host, args.port, mock).serve_forever()
@@ -0,0 +1,154 @@
+"""
+Servidor JSON-RPC local com latência e falhas injetadas
+
+Responde eth_chainId, eth_blockNumber, web3_clientVersion, eth_call (uma
+palavra zerada) e o mínimo para enviar transações (nonce, estimateGas,
+bloco com baseFee, sendRawTransaction), também em batch, para testar o
+failover, o hedge, o transporte em batch e a latência do executor:
+
+    python3 scripts/stub_rpc_server.py --port 8601 --latency 0.05
+    python3 scripts/stub_rpc_server.py --port 8602 --latency 0.02 --slow-rate 0.1 --slow-latency 2
+    RPC_URLS=http://127.0.0.1:8601,http://127.0.0.1:8602 python3 opportunity_monitor_improved.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+
+class StubRPC:
+    def __init__(self, latency: float, jitter: float, slow_rate: float, slow_latency: float,
+                 error_rate: float, rate_limit_rate: float, chain_id: int, item_error_rate: float = 0.0,
+                 max_batch: int = 1000, retry_after: float = 1.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chain_id = chain_id
+        self.item_error_rate = item_error_rate
+        self.max_batch = max_batch
+        self.retry_after = retry_after
+        self.started = time.time()
+        self.requests = 0
+        self.sent = 0
+        self.methods = []
+        self._lock = threading.Lock()
+
+    def result(self, method: str, params: list):
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "eth_blockNumber":
+            return hex(int((time.time() - self.started) / 2) + 1)
+        if method == "web3_clientVersion":
+            return "stub-rpc/1.0"
+        if method == "eth_call":
+            return "0x" + "00" * 32
+        if method == "eth_getTransactionCount":
+            return hex(self.sent)
+        if method == "eth_estimateGas":
+            return hex(300_000)
+        if method == "eth_getBlockByNumber":
+            number = int((time.time() - self.started) / 2) + 1
+            return {"number": hex(number), "hash": "0x" + f"{number:064x}", "baseFeePerGas": hex(10 ** 7),
+                    "timestamp": hex(int(time.time())), "transactions": []}
+        if method == "eth_sendRawTransaction":
+            with self._lock:
+                self.sent += 1
+            return "0x" + hashlib.sha3_256(bytes.fromhex(params[0][2:])).hexdigest()
+        return None
+
+    def answer(self, request: dict):
+        if random.random() < self.item_error_rate:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": "execution reverted"}}
+        result = self.result(request.get("method"), request.get("params") or [])
+        if result is None:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": f"method {request.get('method')} not supported"}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+
+def make_handler(stub: StubRPC):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Sem Nagle: cabeçalho e corpo saem em segmentos separados
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with stub._lock:
+                stub.requests += 1
+                stub.methods.append(request.get("method") if isinstance(request, dict) else "batch")
+
+            delay = stub.slow_latency if random.random() < stub.slow_rate else stub.latency
+            time.sleep(max(0.0, delay + random.uniform(-stub.jitter, stub.jitter)))
+
+            if random.random() < stub.error_rate:
+                self._reply(503, {"error": "unavailable"})
+            elif random.random() < stub.rate_limit_rate:
+                self._reply(429, {"jsonrpc": "2.0", "id": None,
+                                  "error": {"code": 429, "message": "rate limit exceeded"}},
+                            {"Retry-After": str(stub.retry_after)})
+            elif isinstance(request, list) and len(request) > stub.max_batch:
+                self._reply(200, {"jsonrpc": "2.0", "id": None,
+                                  "error": {"code": -32600, "message": f"batch limit {stub.max_batch} exceeded"}})
+            elif isinstance(request, list):
+                # Respostas fora de ordem, como alguns provedores fazem
+                answers = [stub.answer(item) for item in request]
+                random.shuffle(answers)
+                self._reply(200, answers)
+            else:
+                self._reply(200, stub.answer(request))
+
+    return Handler
+
+
+def serve(host: str, port: int, stub: StubRPC) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(stub))
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8601)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--chain-id", type=int, default=8453)
+    parser.add_argument("--item-error-rate", type=float, default=0.0)
+    parser.add_argument("--max-batch", type=int, default=1000)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stub = StubRPC(args.latency, args.jitter, args.slow_rate, args.slow_latency,
+                   args.error_rate, args.rate_limit_rate, args.chain_id, args.item_error_rate, args.max_batch, args.retry_after)
+    print(f"JSON-RPC stub em http://{args.host}:{args.port} (latência {args.latency}s)")
+    serve(args.host, args.port, stub).serve_forever()
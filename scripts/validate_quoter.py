@@ -0,0 +1,196 @@
+"""
+Validação do quoter contra os próprios contratos
+
+mock: num nó local (Hardhat ou Anvil), implanta um MockDEX e compara
+mock_dex_amount_out com MockDEX.getAmountsOut para vários preços e tamanhos.
+
+onchain: num RPC com estado histórico (fork do Anvil/Hardhat ou nó de
+arquivo), fixa um bloco e compara, nas duas direções de cada pool e em
+tamanhos crescentes do token de entrada:
+- V3: V3PoolState.quote_exact_input x QuoterV2.quoteExactInputSingle
+- Aerodrome: SolidlyPoolState.quote_exact_input x Pool.getAmountOut
+
+Qualquer diferença faz o script sair com código 1. Com --record, o estado
+lido de cada pool e as saídas dos contratos vão para um JSON de fixture em
+test/python/fixtures/quoter/, que test/python/test_quoter.py compara com o
+quoter sem nó nem RPC.
+
+Uso:
+    npx hardhat compile && npx hardhat node
+    python3 scripts/validate_quoter.py mock
+
+    anvil --fork-url $BASE_RPC --fork-block-number 20000000
+    python3 scripts/validate_quoter.py onchain --block 20000000 \\
+        --v3 0xd0b53D9277642d899DF5C87A3966A349A798F224 --solidly 0xcdac0d6c6c59727a65f871236188350531885c43 \\
+        --record test/python/fixtures/quoter/base_20000000.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from scripts.e2e_executor import deploy, eth_call_many, transact  # noqa: E402
+from src.pricing.quoter import (  # noqa: E402
+    SolidlyPoolState, V3PoolState, load_v3_pool_state, mock_dex_amount_out
+)
+from src.rpc.codec import ERC20, V3_POOL, FunctionCodec, compile_abi  # noqa: E402
+from src.rpc.multicall import Call  # noqa: E402
+
+# QuoterV2 da Uniswap na Base
+UNISWAP_QUOTER_V2 = "0x3d4e44Eb1374240CE5F1B871ab261CD16335B76a"
+
+QUOTE_EXACT_INPUT_SINGLE = FunctionCodec(
+    "quoteExactInputSingle", ["(address,address,uint256,uint24,uint160)"], ["uint256", "uint160", "uint32", "uint256"]
+)
+AERODROME_POOL = compile_abi([
+    {"name": "metadata", "inputs": [], "type": "function", "outputs": [
+        {"type": "uint256"}, {"type": "uint256"}, {"type": "uint256"}, {"type": "uint256"},
+        {"type": "bool"}, {"type": "address"}, {"type": "address"},
+    ]},
+    {"name": "factory", "inputs": [], "outputs": [{"type": "address"}], "type": "function"},
+    {"name": "getAmountOut", "inputs": [{"type": "uint256"}, {"type": "address"}],
+     "outputs": [{"type": "uint256"}], "type": "function"},
+])
+GET_FEE = FunctionCodec("getFee", ["address", "bool"], ["uint256"])
+
+
+def one(call_many, target: str, codec: FunctionCodec, block, *args):
+    (result,) = call_many([Call(target, codec.encode(*args), codec.output_types)], block)
+    return result
+
+
+def report(label: str, expected: int, quoted: int) -> bool:
+    ok = expected == quoted
+    print(f"  {'ok ' if ok else 'ERRO'} {label}: contrato {expected} x quoter {quoted}")
+    return ok
+
+
+def validate_mock(w3: Web3) -> bool:
+    w3.eth.default_account = w3.eth.accounts[0]
+    dex = deploy(w3, "MockDEX")
+    # getAmountsOut só lê o preço: os tokens do path não precisam existir
+    token_in, token_out = Web3.to_checksum_address(f"0x{1:040x}"), Web3.to_checksum_address(f"0x{2:040x}")
+    ok = True
+    print(f"MockDEX {dex.address}")
+    for price in (1, 10**18, 11 * 10**17, 3_000 * 10**6, 123_456_789_123_456_789):
+        transact(w3, dex.functions.setPrice(token_in, token_out, price))
+        for amount_in in (1, 999, 10**18, 7 * 10**21 + 3):
+            expected = dex.functions.getAmountsOut(amount_in, [token_in, token_out]).call()[1]
+            ok &= report(f"preço {price} entrada {amount_in}", expected, mock_dex_amount_out(amount_in, price))
+    return ok
+
+
+def v3_fixture(pool: str, state: V3PoolState, quoter: str) -> dict:
+    return {
+        "address": pool, "kind": "uniswap_v3", "quoter": quoter,
+        "state": {
+            "sqrt_price_x96": state.sqrt_price_x96, "tick": state.tick, "liquidity": state.liquidity,
+            "fee": state.fee, "tick_spacing": state.tick_spacing, "word_range": list(state.word_range),
+            "bitmap": sorted(state.bitmap.items()), "liquidity_net": sorted(state.liquidity_net.items()),
+        },
+        "cases": [],
+    }
+
+
+def solidly_fixture(pool: str, state: SolidlyPoolState) -> dict:
+    return {
+        "address": pool, "kind": "solidly",
+        "state": {name: getattr(state, name) for name in SolidlyPoolState.__slots__},
+        "cases": [],
+    }
+
+
+def validate_v3(call_many, pool: str, quoter: str, block, sizes, words_each_side: int, fixtures: list) -> bool:
+    state = load_v3_pool_state(call_many, pool, block, words_each_side)
+    if state is None:
+        print(f"V3 {pool}: estado não lido")
+        return False
+    token0 = one(call_many, pool, V3_POOL["token0"], block)[0]
+    token1 = one(call_many, pool, V3_POOL["token1"], block)[0]
+    print(f"V3 {pool} bloco {block}: fee {state.fee}, tick {state.tick}, {len(state.liquidity_net)} ticks lidos")
+    fixture = v3_fixture(pool, state, quoter)
+    ok = True
+    for token_in, token_out, zero_for_one in ((token0, token1, True), (token1, token0, False)):
+        unit = 10 ** one(call_many, token_in, ERC20["decimals"], block)[0]
+        for size in sizes:
+            amount_in = int(size * unit)
+            result = one(call_many, quoter, QUOTE_EXACT_INPUT_SINGLE, block,
+                         (token_in, token_out, amount_in, state.fee, 0))
+            if result is None:
+                print(f"  quoteExactInputSingle reverteu para {amount_in}")
+                ok = False
+                continue
+            quoted = state.quote_exact_input(amount_in, zero_for_one)
+            label = f"{'0->1' if zero_for_one else '1->0'} {size:g}"
+            if quoted is None:
+                # Fora da janela do bitmap: não é divergência, mas também não vira fixture
+                print(f"  fora da janela lida {label}: aumente --words-each-side")
+                continue
+            ok &= report(label, result[0], quoted)
+            fixture["cases"].append({"amount_in": amount_in, "zero_for_one": zero_for_one, "amount_out": result[0]})
+    fixtures.append(fixture)
+    return ok
+
+
+def validate_solidly(call_many, pool: str, block, sizes, fixtures: list) -> bool:
+    unit0, unit1, reserve0, reserve1, stable, token0, token1 = one(call_many, pool, AERODROME_POOL["metadata"], block)
+    factory = one(call_many, pool, AERODROME_POOL["factory"], block)[0]
+    fee_bps = one(call_many, factory, GET_FEE, block, Web3.to_checksum_address(pool), stable)[0]
+    state = SolidlyPoolState(reserve0, reserve1, stable, fee_bps, len(str(unit0)) - 1, len(str(unit1)) - 1)
+    print(f"Aerodrome {pool} bloco {block}: {'estável' if stable else 'volátil'}, fee {fee_bps} bps")
+    fixture = solidly_fixture(pool, state)
+    ok = True
+    for token_in, unit, zero_for_one in ((token0, unit0, True), (token1, unit1, False)):
+        for size in sizes:
+            amount_in = int(size * unit)
+            expected = one(call_many, pool, AERODROME_POOL["getAmountOut"], block,
+                           amount_in, Web3.to_checksum_address(token_in))[0]
+            ok &= report(f"{'0->1' if zero_for_one else '1->0'} {size:g}", expected,
+                         state.quote_exact_input(amount_in, zero_for_one))
+            fixture["cases"].append({"amount_in": amount_in, "zero_for_one": zero_for_one, "amount_out": expected})
+    fixtures.append(fixture)
+    return ok
+
+
+def main(args) -> None:
+    w3 = Web3(Web3.HTTPProvider(args.rpc_url))
+    if args.mode == "mock":
+        ok = validate_mock(w3)
+    else:
+        call_many = eth_call_many(w3)
+        block = args.block if args.block is not None else w3.eth.block_number
+        ok = True
+        fixtures = []
+        for pool in args.v3:
+            ok &= validate_v3(call_many, Web3.to_checksum_address(pool), args.quoter, block, args.sizes,
+                              args.words_each_side, fixtures)
+        for pool in args.solidly:
+            ok &= validate_solidly(call_many, Web3.to_checksum_address(pool), block, args.sizes, fixtures)
+        if args.record:
+            # Gravado mesmo com divergência: a fixture guarda o que os contratos devolveram
+            os.makedirs(os.path.dirname(os.path.abspath(args.record)), exist_ok=True)
+            with open(args.record, "w") as f:
+                json.dump({"chain_id": w3.eth.chain_id, "block": block, "pools": fixtures}, f, indent=1)
+            print(f"Fixture gravada em {args.record}")
+    print("quoter confere com os contratos" if ok else "quoter diverge dos contratos")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["mock", "onchain"])
+    parser.add_argument("--rpc-url", default="http://127.0.0.1:8545")
+    parser.add_argument("--block", type=int, default=None, help="bloco fixo das leituras (padrão: o atual)")
+    parser.add_argument("--v3", nargs="*", default=[], help="pools V3 a comparar com o QuoterV2")
+    parser.add_argument("--quoter", default=UNISWAP_QUOTER_V2, help="QuoterV2 da DEX dos pools --v3")
+    parser.add_argument("--solidly", nargs="*", default=[], help="pools do Aerodrome a comparar com getAmountOut")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.001, 1, 100],
+                        help="tamanhos em unidades inteiras do token de entrada")
+    parser.add_argument("--words-each-side", type=int, default=4)
+    parser.add_argument("--record", default=None, help="JSON de fixture com o estado lido e as saídas dos contratos")
+    main(parser.parse_args())
@@ -0,0 +1,206 @@
+"""
+Replay do histórico gravado (data/history) pela mesma detecção do monitor
+
+Cada snapshot gravado volta a ser uma PriceTable e passa pelo Detector, sem
+RPC e sem relógio: a velocidade é a da CPU. Cada segmento diário roda num
+processo separado (ProcessPoolExecutor) e os resultados são somados no fim.
+
+PnL teórico: uma oportunidade conta como trade só no snapshot em que
+aparece (enquanto o mesmo par/DEXs continua acima do threshold, é o mesmo
+episódio; os dois sentidos do spread são um episódio só, e conta o sentido
+de maior PnL entre os tokens com tamanho). O tamanho é o do token
+emprestado (token_out, como no simulador); do spread líquido de fees saem o prêmio do flash loan e o gás,
+convertido pelo preço mediano do próprio snapshot. Slippage não entra: é um
+teto para o que a estratégia capturaria.
+"""
+
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from src.pricing.price_table import Opportunity, PriceTable
+from src.storage.history import PRICES, HistoryReader
+from src.strategy.detector import Detector
+
+WETH = "0x4200000000000000000000000000000000000006"
+
+
+class BacktestConfig(NamedTuple):
+    min_profit: float = 0.005
+    top_k: Optional[int] = 10
+    fees: Dict[str, float] = {}
+    max_cycle_length: int = 4
+    trade_sizes: Dict[str, float] = {WETH: 1.0}    # token emprestado -> tamanho (unidades do token)
+    premium_bps: int = 5
+    gas_units: int = 350_000
+    gas_price_gwei: float = 0.01
+    weth: str = WETH
+    cycles: bool = True
+
+
+class BacktestResult:
+    __slots__ = (
+        "snapshots", "first_block", "last_block", "opportunities", "episodes", "trades", "unsized", "cycles",
+        "pnl_eth", "pnl_by_pair", "trades_by_pair", "elapsed"
+    )
+
+    def __init__(self):
+        self.snapshots = 0
+        self.first_block: Optional[int] = None
+        self.last_block: Optional[int] = None
+        self.opportunities = 0     # detecções, snapshot a snapshot
+        self.episodes = 0          # oportunidades novas (entrada no threshold)
+        self.trades = 0            # episódios com PnL positivo depois de prêmio e gás
+        self.unsized = 0           # episódios sem tamanho ou sem preço para converter
+        self.cycles = 0
+        self.pnl_eth = 0.0
+        self.pnl_by_pair: Dict[str, float] = defaultdict(float)
+        self.trades_by_pair: Dict[str, int] = defaultdict(int)
+        self.elapsed = 0.0         # soma do tempo de CPU dos processos
+
+    def merge(self, other: "BacktestResult") -> "BacktestResult":
+        self.snapshots += other.snapshots
+        for block in (other.first_block, other.last_block):
+            if block is not None:
+                self.first_block = block if self.first_block is None else min(self.first_block, block)
+                self.last_block = block if self.last_block is None else max(self.last_block, block)
+        for field in ("opportunities", "episodes", "trades", "unsized", "cycles", "pnl_eth", "elapsed"):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        for pair, pnl in other.pnl_by_pair.items():
+            self.pnl_by_pair[pair] += pnl
+        for pair, trades in other.trades_by_pair.items():
+            self.trades_by_pair[pair] += trades
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "snapshots": self.snapshots,
+            "blocks": None if self.first_block is None else [self.first_block, self.last_block],
+            "opportunities": self.opportunities,
+            "episodes": self.episodes,
+            "trades": self.trades,
+            "unsized": self.unsized,
+            "cycles": self.cycles,
+            "pnl_eth": round(self.pnl_eth, 6),
+            "pnl_by_pair": {pair: round(pnl, 6) for pair, pnl in self.pnl_by_pair.items()},
+            "trades_by_pair": dict(self.trades_by_pair),
+            "cpu_seconds": round(self.elapsed, 3),
+        }
+
+
+def snapshots(reader: HistoryReader, segment: str, start: Optional[float] = None,
+              end: Optional[float] = None) -> Iterator[PriceTable]:
+    """PriceTables de um segmento, na ordem em que foram gravadas"""
+    tokens = [pair.split("/") for pair in reader.dictionary.pairs]
+    dexes = reader.dictionary.dexes
+    for columns in reader.scan(PRICES, start, end, [segment]):
+        timestamps, blocks = np.asarray(columns["timestamp"]), np.asarray(columns["block"])
+        pairs, dex_ids, prices = columns["pair"].tolist(), columns["dex"].tolist(), columns["price"].tolist()
+        # Um snapshot termina onde muda o bloco ou o timestamp
+        bounds = np.flatnonzero((np.diff(timestamps) != 0) | (np.diff(blocks) != 0)) + 1
+        starts = [0] + bounds.tolist()
+        ends = bounds.tolist() + [len(timestamps)]
+        for lo, hi in zip(starts, ends):
+            block = int(blocks[lo])
+            table = PriceTable(None if block < 0 else block)
+            for row in range(lo, hi):
+                token0, token1 = tokens[pairs[row]]
+                table.add_pool(dexes[dex_ids[row]], token0, token1, prices[row])
+            yield table
+
+
+def gas_in_token(table: PriceTable, config: BacktestConfig, token: str) -> Optional[float]:
+    gas_eth = config.gas_units * config.gas_price_gwei * 1e-9
+    if token == config.weth.lower():
+        return gas_eth
+    price = table.mid_price(config.weth, token)
+    return None if price is None else gas_eth * price
+
+
+def to_eth(table: PriceTable, config: BacktestConfig, token: str, amount: float) -> Optional[float]:
+    if token == config.weth.lower():
+        return amount
+    price = table.mid_price(token, config.weth)
+    return None if price is None else amount * price
+
+
+def replay_segment(root: str, segment: str, config: BacktestConfig, start: Optional[float] = None,
+                   end: Optional[float] = None) -> BacktestResult:
+    started = time.process_time()
+    reader = HistoryReader(root)
+    detector = Detector(config.min_profit, config.top_k, dict(config.fees), config.max_cycle_length)
+    sizes = {token.lower(): size for token, size in config.trade_sizes.items()}
+    premium = config.premium_bps / 10_000
+    result = BacktestResult()
+    active: Set[Tuple[str, str, str, str]] = set()
+
+    for table in snapshots(reader, segment, start, end):
+        result.snapshots += 1
+        if table.block is not None:
+            result.first_block = table.block if result.first_block is None else result.first_block
+            result.last_block = table.block
+
+        opportunities = detector.spreads(table)
+        result.opportunities += len(opportunities)
+        # O mesmo spread sai nos dois sentidos ((A, B) e (B, A) com as DEXs trocadas):
+        # o episódio é do par e do par de DEXs, sem ordem
+        episodes: Dict[Tuple[str, str, str, str], List[Opportunity]] = defaultdict(list)
+        for opportunity in opportunities:
+            tokens = sorted((opportunity.token_in, opportunity.token_out))
+            dexes = sorted((opportunity.dex_buy, opportunity.dex_sell))
+            episodes[(tokens[0], tokens[1], dexes[0], dexes[1])].append(opportunity)
+
+        for key, directions in episodes.items():
+            if key in active:
+                continue
+            result.episodes += 1
+            # Um trade por episódio: o sentido cujo token emprestado tem tamanho e o maior PnL em ETH
+            sized = False
+            best: Optional[float] = None
+            for opportunity in directions:
+                size = sizes.get(opportunity.token_out)
+                gas = gas_in_token(table, config, opportunity.token_out)
+                if size is None or gas is None:
+                    continue
+                sized = True
+                pnl = size * (opportunity.profit - premium) - gas
+                pnl_eth = to_eth(table, config, opportunity.token_out, pnl)
+                if pnl > 0 and pnl_eth is not None and (best is None or pnl_eth > best):
+                    best = pnl_eth
+            if not sized:
+                result.unsized += 1
+                continue
+            if best is None:
+                continue
+            pair = f"{key[0]}/{key[1]}"
+            result.trades += 1
+            result.pnl_eth += best
+            result.pnl_by_pair[pair] += best
+            result.trades_by_pair[pair] += 1
+        active = set(episodes)
+
+        if config.cycles:
+            result.cycles += len(detector.cycles(table))
+
+    result.elapsed = time.process_time() - started
+    return result
+
+
+def run_backtest(root: str, config: BacktestConfig, start: Optional[float] = None, end: Optional[float] = None,
+                 workers: int = 4) -> Tuple[BacktestResult, float]:
+    """Um processo por segmento diário; devolve o resultado somado e o tempo de parede"""
+    segments: List[str] = HistoryReader(root).segments(PRICES, start, end)
+    started = time.perf_counter()
+    total = BacktestResult()
+    if workers <= 1:
+        for segment in segments:
+            total.merge(replay_segment(root, segment, config, start, end))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(replay_segment, root, segment, config, start, end) for segment in segments]
+            for future in futures:
+                total.merge(future.result())
+    return total, time.perf_counter() - started
@@ -0,0 +1,106 @@
+"""
+Cache persistente de metadados imutáveis de tokens e pools
+
+Guarda decimals de tokens e token0/token1 de pools, indexados por
+(chain id, endereço). Esses valores nunca mudam on-chain, então cada um só
+precisa de uma chamada RPC durante toda a vida do bot. O cache fica em memória
+e é persistido em JSON no volume data/.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenMetadataCache:
+    VERSION = 1
+
+    def __init__(self, path: str = "data/token_metadata.json"):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, object]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(chain_id: int, address: str) -> str:
+        return f"{chain_id}:{address.lower()}"
+
+    def load(self) -> int:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            logger.error(f"Erro ao carregar cache de metadados {self.path}: {e}")
+            return 0
+
+        if data.get("version") != self.VERSION:
+            logger.warning(f"Versão do cache de metadados incompatível em {self.path}, ignorando")
+            return 0
+
+        with self._lock:
+            self._entries.update(data.get("entries", {}))
+            return len(self._entries)
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"version": self.VERSION, "entries": dict(self._entries)}
+            self._dirty = False
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Erro ao salvar cache de metadados {self.path}: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def get(self, chain_id: int, address: str, field: str):
+        entry = self._entries.get(self._key(chain_id, address))
+        return None if entry is None else entry.get(field)
+
+    def set(self, chain_id: int, address: str, field: str, value) -> None:
+        with self._lock:
+            self._entries.setdefault(self._key(chain_id, address), {})[field] = value
+            self._dirty = True
+
+    def lookup(self, chain_id: int, address: str, field: str):
+        # Como get(), mas contabiliza hits/misses
+        value = self.get(chain_id, address, field)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def get_or_fetch(self, chain_id: int, address: str, field: str, fetch: Callable[[], Optional[T]]) -> Optional[T]:
+        # Valores None não são cacheados para que a próxima chamada tente de novo
+        value = self.lookup(chain_id, address, field)
+        if value is not None:
+            return value
+
+        value = fetch()
+        if value is not None:
+            self.set(chain_id, address, field, value)
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
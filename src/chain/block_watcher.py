@@ -0,0 +1,107 @@
+"""
+Observador de novos blocos
+
+Assina newHeads via websocket (eth_subscribe) e, se o websocket não estiver
+configurado ou cair, faz polling de eth_blockNumber. Mantém apenas o head mais
+recente: se o consumidor demorar mais que um bloco, os heads intermediários
+são pulados em vez de enfileirados.
+"""
+
+import asyncio
+import json
+import logging
+from typing import NamedTuple, Optional
+
+import websockets
+from web3 import AsyncWeb3
+
+logger = logging.getLogger(__name__)
+
+
+class Head(NamedTuple):
+    number: int
+    hash: Optional[str] = None
+
+
+class BlockWatcher:
+    def __init__(self, w3: AsyncWeb3, ws_url: Optional[str] = None, poll_interval: float = 1.0,
+                 reconnect_delay: float = 5.0):
+        self.w3 = w3
+        self.ws_url = ws_url
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.latest: Optional[Head] = None
+        self.heads_seen = 0
+        self._event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        # Precisa ser chamado de dentro do event loop
+        if self._task is None:
+            self._event = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def next_head(self, after: Optional[Head] = None) -> Head:
+        """Espera até existir um head diferente de `after` e devolve o mais recente"""
+        self.start()
+        while self.latest is None or self.latest == after:
+            self._event.clear()
+            await self._event.wait()
+        return self.latest
+
+    def _publish(self, head: Head) -> None:
+        if self.latest is not None and head == self.latest:
+            return
+        if self.latest is not None and head.number < self.latest.number:
+            logger.warning(f"Head {head.number} anterior ao último visto ({self.latest.number}): possível reorg")
+        self.latest = head
+        self.heads_seen += 1
+        self._event.set()
+
+    async def _run(self) -> None:
+        while True:
+            if self.ws_url:
+                try:
+                    await self._subscribe()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Erro na assinatura newHeads ({self.ws_url}): {e}")
+                # Polling enquanto o websocket está fora, tentando reconectar depois
+                await self._poll(duration=self.reconnect_delay)
+            else:
+                await self._poll()
+
+    async def _subscribe(self) -> None:
+        async with websockets.connect(self.ws_url) as ws:
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+            response = json.loads(await ws.recv())
+            if "error" in response:
+                raise RuntimeError(response["error"])
+            subscription = response["result"]
+            logger.info(f"Assinatura newHeads ativa: {subscription}")
+
+            async for message in ws:
+                payload = json.loads(message)
+                params = payload.get("params") or {}
+                if payload.get("method") != "eth_subscription" or params.get("subscription") != subscription:
+                    continue
+                header = params["result"]
+                self._publish(Head(int(header["number"], 16), header.get("hash")))
+
+    async def _poll(self, duration: Optional[float] = None) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = None if duration is None else loop.time() + duration
+        while deadline is None or loop.time() < deadline:
+            try:
+                number = await self.w3.eth.block_number
+                if self.latest is None or number > self.latest.number:
+                    self._publish(Head(number))
+            except Exception as e:
+                logger.error(f"Erro ao consultar eth_blockNumber: {e}")
+            await asyncio.sleep(self.poll_interval)
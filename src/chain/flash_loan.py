@@ -0,0 +1,194 @@
+"""
+Custo e liquidez do flash loan da Aave
+
+O FlashArbitrage devolve amount + premium ao pool da Aave, e o flashLoanSimple
+só empresta o que a reserva tem em caixa (o saldo do ativo no aToken). Este
+modelo lê, uma vez por bloco e num único call_many, o
+FLASHLOAN_PREMIUM_TOTAL e, por ativo emprestável, o saldo disponível e os
+flags da reserva (ativa, pausada, flash loan habilitado).
+
+Com isso, antes da simulação, screen() descarta o candidato cujo spread não
+cobre o prêmio (o spread de preço médio é o teto do retorno realizado) e
+limita os tamanhos da escada à liquidez da reserva. Candidatos que
+reverteriam no flashLoanSimple não chegam ao calculateProfit nem ao envio.
+
+O endereço do aToken de cada reserva vem de getReserveData e não muda; fica
+em cache depois da primeira leitura. Reserva sem aToken (o MockAAVEPool
+devolve getReserveData zerado) é tratada como o próprio pool emprestando do
+seu saldo, como faz o mock.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from src.rpc.codec import checksum_address, compile_abi
+from src.rpc.multicall import Call
+from src.strategy.sizing import PERCENTAGE_FACTOR, flash_loan_premium
+
+logger = logging.getLogger(__name__)
+
+# DataTypes.ReserveData (getReserveData): todos os campos estáticos, 15 palavras em sequência
+RESERVE_DATA_OUTPUTS = [
+    "uint256",      # configuration
+    "uint128", "uint128", "uint128", "uint128", "uint128",
+    "uint40",       # lastUpdateTimestamp
+    "uint16",       # id
+    "address",      # aTokenAddress
+    "address", "address", "address",
+    "uint128", "uint128", "uint128",
+]
+A_TOKEN_FIELD = 8
+
+AAVE_ABI = [
+    {"name": "FLASHLOAN_PREMIUM_TOTAL", "inputs": [], "outputs": [{"type": "uint128"}], "type": "function"},
+    {"name": "getReserveData", "inputs": [{"type": "address"}],
+     "outputs": [{"type": abi_type} for abi_type in RESERVE_DATA_OUTPUTS], "type": "function"},
+    {"name": "balanceOf", "inputs": [{"type": "address"}], "outputs": [{"type": "uint256"}], "type": "function"},
+    # FlashLoanSimpleReceiverBase.POOL(): pool usado pelo FlashArbitrage
+    {"name": "POOL", "inputs": [], "outputs": [{"type": "address"}], "type": "function"},
+]
+AAVE = compile_abi(AAVE_ABI)
+
+# ReserveConfiguration: bits do mapa de configuração
+ACTIVE_BIT = 56
+PAUSED_BIT = 60
+FLASHLOAN_ENABLED_BIT = 63
+
+ZERO_ADDRESS = "0x" + "0" * 40
+
+CallMany = Callable[[Sequence[Call], object], List[Optional[tuple]]]
+
+
+class ReserveLiquidity(NamedTuple):
+    holder: str          # aToken da reserva (ou o próprio pool, sem aToken)
+    available: int       # saldo do ativo no holder, na unidade mínima
+    enabled: bool        # ativa, não pausada e com flash loan habilitado
+    block: Optional[int]
+
+
+def reserve_enabled(configuration: int) -> bool:
+    return (
+        bool(configuration >> ACTIVE_BIT & 1)
+        and not configuration >> PAUSED_BIT & 1
+        and bool(configuration >> FLASHLOAN_ENABLED_BIT & 1)
+    )
+
+
+def call(target: str, name: str, *args) -> Call:
+    codec = AAVE[name]
+    return Call(target, codec.encode(*args), codec.output_types)
+
+
+class FlashLoanCosts:
+    def __init__(self, call_many: CallMany, assets: Iterable[str], pool: Optional[str] = None,
+                 receiver: Optional[str] = None, default_premium_bps: int = 5, max_utilization: float = 1.0):
+        self.call_many = call_many
+        self.assets = [checksum_address(asset) for asset in assets]
+        self.pool = checksum_address(pool) if pool else None
+        self.receiver = checksum_address(receiver) if receiver else None
+        self.premium_bps = default_premium_bps    # vale até a primeira leitura do pool
+        self.max_utilization = max_utilization
+        self.holders: Dict[str, str] = {}
+        self.reserves: Dict[str, ReserveLiquidity] = {}
+        self.last_block: Optional[int] = None
+        self.rejected_premium = 0
+        self.rejected_liquidity = 0
+        self.resized = 0
+
+    def _resolve_pool(self, block_identifier) -> Optional[str]:
+        if self.pool is None and self.receiver is not None:
+            (result,) = self.call_many([call(self.receiver, "POOL")], block_identifier)
+            if result is not None and result[0] != ZERO_ADDRESS:
+                self.pool = checksum_address(result[0])
+                logger.info(f"Pool da Aave do FlashArbitrage: {self.pool}")
+        return self.pool
+
+    def _holder(self, pool: str, reserve_data: tuple) -> str:
+        a_token = reserve_data[A_TOKEN_FIELD]
+        return pool if a_token == ZERO_ADDRESS else checksum_address(a_token)
+
+    def update(self, block_identifier="latest") -> None:
+        """Prêmio e liquidez das reservas no bloco; uma rodada de call_many por head"""
+        block = block_identifier if isinstance(block_identifier, int) else None
+        if block is not None and block == self.last_block:
+            return
+        try:
+            pool = self._resolve_pool(block_identifier)
+            if pool is None:
+                return
+
+            # aTokens ainda desconhecidos: uma rodada extra, só na primeira vez
+            missing = [asset for asset in self.assets if asset not in self.holders]
+            if missing:
+                results = self.call_many([call(pool, "getReserveData", asset) for asset in missing], block_identifier)
+                for asset, result in zip(missing, results):
+                    if result is not None:
+                        self.holders[asset] = self._holder(pool, result)
+
+            known = [asset for asset in self.assets if asset in self.holders]
+            calls = [call(pool, "FLASHLOAN_PREMIUM_TOTAL")]
+            calls += [call(pool, "getReserveData", asset) for asset in known]
+            calls += [call(asset, "balanceOf", self.holders[asset]) for asset in known]
+            results = self.call_many(calls, block_identifier)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar custos do flash loan: {e}")
+            return
+
+        if results[0] is not None:
+            self.premium_bps = results[0][0]
+        reserve_results, balance_results = results[1:1 + len(known)], results[1 + len(known):]
+        for asset, reserve_data, balance in zip(known, reserve_results, balance_results):
+            if reserve_data is None or balance is None:
+                # Sem leitura neste bloco: o valor anterior some em vez de ficar velho
+                self.reserves.pop(asset, None)
+                continue
+            holder = self._holder(pool, reserve_data)
+            enabled = holder == pool or reserve_enabled(reserve_data[0])
+            self.reserves[asset] = ReserveLiquidity(self.holders[asset], balance[0], enabled, block)
+            # aToken trocado: o saldo lido é do antigo, vale a partir do próximo bloco
+            self.holders[asset] = holder
+        self.last_block = block
+
+    def fee(self, amount: int) -> int:
+        return flash_loan_premium(amount, self.premium_bps)
+
+    def max_amount(self, asset: str) -> Optional[int]:
+        """Maior empréstimo aceito para o ativo; None se a liquidez não é conhecida"""
+        reserve = self.reserves.get(checksum_address(asset))
+        if reserve is None:
+            return None
+        if not reserve.enabled:
+            return 0
+        return int(reserve.available * self.max_utilization)
+
+    def screen(self, asset: str, profit_rate: float, amounts: Sequence[int], min_profit: float) -> List[int]:
+        """
+        Tamanhos da escada que ainda valem simular: vazio se o spread não cobre
+        o prêmio ou a reserva não empresta; os demais limitados à liquidez.
+        """
+        if profit_rate - self.premium_bps / PERCENTAGE_FACTOR < min_profit:
+            self.rejected_premium += 1
+            return []
+        cap = self.max_amount(asset)
+        if cap is None:
+            return list(amounts)
+        if cap <= 0:
+            self.rejected_liquidity += 1
+            return []
+        sized: List[int] = []
+        for amount in amounts:
+            amount = min(amount, cap)
+            if amount > 0 and amount not in sized:
+                sized.append(amount)
+        if sized != list(amounts):
+            self.resized += 1
+        return sized
+
+    def stats(self) -> dict:
+        return {
+            "premium_bps": self.premium_bps,
+            "available": {asset: reserve.available for asset, reserve in self.reserves.items()},
+            "rejected_premium": self.rejected_premium,
+            "rejected_liquidity": self.rejected_liquidity,
+            "resized": self.resized,
+        }
@@ -0,0 +1,169 @@
+"""
+Oráculo de gás com previsão de fees EIP-1559
+
+Acompanha base fee, uso de gás e percentis de gorjeta dos últimos blocos via
+eth_feeHistory, buscando a cada head só os blocos novos. O feeHistory já
+devolve a base fee do próximo bloco; a partir dela o maxFee cobre o pior
+caso de `blocks_ahead` blocos cheios seguidos.
+
+Em rollups OP Stack (Base) o custo de uma transação também inclui a taxa de
+dados da L1. Os parâmetros do GasPriceOracle (l1BaseFee, blobBaseFee e os
+scalars) são lidos uma vez por head, num único call_many, e a taxa é
+calculada localmente com a mesma fórmula de getL1FeeUpperBound (Fjord).
+
+Tudo fica em memória: tx_cost() não faz nenhuma chamada RPC.
+"""
+
+import logging
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional, Sequence
+
+from web3 import Web3
+
+from src.rpc.multicall import Call, function_selector
+
+logger = logging.getLogger(__name__)
+
+# Predeploy do GasPriceOracle nas chains OP Stack
+GAS_PRICE_ORACLE_ADDRESS = "0x420000000000000000000000000000000000000F"
+
+L1_BASE_FEE = function_selector("l1BaseFee()")
+BLOB_BASE_FEE = function_selector("blobBaseFee()")
+BASE_FEE_SCALAR = function_selector("baseFeeScalar()")
+BLOB_BASE_FEE_SCALAR = function_selector("blobBaseFeeScalar()")
+
+# Constantes do GasPriceOracle (Fjord)
+L1_COST_INTERCEPT = -42_585_600
+L1_COST_FASTLZ_COEF = 836_500
+MIN_TRANSACTION_SIZE = 100
+L1_FEE_PRECISION = 10 ** 12
+
+CallMany = Callable[[Sequence[Call], object], List[Optional[tuple]]]
+
+
+class L1FeeParams(NamedTuple):
+    l1_base_fee: int
+    blob_base_fee: int
+    base_fee_scalar: int
+    blob_base_fee_scalar: int
+
+
+class GasQuote(NamedTuple):
+    block: int
+    base_fee: int        # prevista para o próximo bloco
+    priority_fee: int
+    max_fee: int
+
+
+def l1_fee_upper_bound(params: L1FeeParams, unsigned_tx_size: int) -> int:
+    """Mesma conta de GasPriceOracle.getL1FeeUpperBound: tamanho comprimido no pior caso"""
+    tx_size = unsigned_tx_size + 68
+    # Limite prático do fastlz (cobre 99,99% das transações), como no contrato
+    fastlz_size = tx_size + tx_size // 255 + 16
+    estimated_size = max(MIN_TRANSACTION_SIZE * 10 ** 6, L1_COST_INTERCEPT + L1_COST_FASTLZ_COEF * fastlz_size)
+    fee_scaled = (
+        params.base_fee_scalar * 16 * params.l1_base_fee + params.blob_base_fee_scalar * params.blob_base_fee
+    )
+    return estimated_size * fee_scaled // L1_FEE_PRECISION
+
+
+class GasOracle:
+    def __init__(self, w3: Web3, window: int = 20, reward_percentiles: Sequence[float] = (10, 50, 90),
+                 tip_percentile: float = 50, blocks_ahead: int = 2, elasticity: int = 6,
+                 denominator: int = 250, min_priority_fee: int = 0,
+                 call_many: Optional[CallMany] = None, l1_oracle: Optional[str] = None):
+        self.w3 = w3
+        self.window = window
+        self.reward_percentiles = list(reward_percentiles)
+        self.tip_index = self.reward_percentiles.index(tip_percentile)
+        self.blocks_ahead = blocks_ahead
+        self.elasticity = elasticity
+        self.denominator = denominator
+        self.min_priority_fee = min_priority_fee
+        self.call_many = call_many
+        self.l1_oracle = Web3.to_checksum_address(l1_oracle) if l1_oracle else None
+        self.base_fees: Deque[int] = deque(maxlen=window)
+        self.gas_used_ratios: Deque[float] = deque(maxlen=window)
+        self.rewards: Deque[List[int]] = deque(maxlen=window)
+        self.last_block: Optional[int] = None
+        self.next_base_fee: Optional[int] = None
+        self.l1_params: Optional[L1FeeParams] = None
+        self.quote: Optional[GasQuote] = None
+
+    def update(self, head: Optional[int] = None) -> Optional[GasQuote]:
+        """Uma chamada por head: eth_feeHistory só dos blocos ainda não vistos"""
+        if head is None:
+            head = self.w3.eth.block_number
+        if self.last_block is not None and head <= self.last_block:
+            return self.quote
+
+        count = self.window if self.last_block is None else min(self.window, head - self.last_block)
+        history = self.w3.eth.fee_history(count, head, self.reward_percentiles)
+        base_fees = list(history["baseFeePerGas"])
+        # N blocos + a base fee do bloco seguinte ao último
+        self.base_fees.extend(base_fees[:-1])
+        self.next_base_fee = base_fees[-1]
+        self.gas_used_ratios.extend(history["gasUsedRatio"])
+        self.rewards.extend(list(reward) for reward in history.get("reward") or [])
+        self.last_block = head
+
+        if self.call_many is not None and self.l1_oracle is not None:
+            self._update_l1(head)
+
+        priority_fee = self.priority_fee()
+        self.quote = GasQuote(head, self.next_base_fee, priority_fee, self.max_fee(priority_fee))
+        return self.quote
+
+    def _update_l1(self, head: int) -> None:
+        selectors = (L1_BASE_FEE, BLOB_BASE_FEE, BASE_FEE_SCALAR, BLOB_BASE_FEE_SCALAR)
+        try:
+            results = self.call_many([Call(self.l1_oracle, selector, ("uint256",)) for selector in selectors], head)
+        except Exception as e:
+            logger.error(f"Erro ao ler parâmetros de fee da L1: {e}")
+            return
+        if all(result is not None for result in results):
+            self.l1_params = L1FeeParams(*(result[0] for result in results))
+
+    def priority_fee(self) -> int:
+        # Mediana, na janela, do percentil escolhido: um bloco atípico não puxa a gorjeta
+        tips = sorted(reward[self.tip_index] for reward in self.rewards if len(reward) > self.tip_index)
+        if not tips:
+            return self.min_priority_fee
+        return max(self.min_priority_fee, tips[len(tips) // 2])
+
+    def predict_base_fee(self, blocks: int = 1) -> Optional[int]:
+        """Pior caso (blocos cheios) para daqui a `blocks` blocos"""
+        if self.next_base_fee is None:
+            return None
+        base_fee = self.next_base_fee
+        for _ in range(blocks - 1):
+            base_fee += base_fee * (self.elasticity - 1) // self.denominator
+        return base_fee
+
+    def max_fee(self, priority_fee: Optional[int] = None) -> Optional[int]:
+        base_fee = self.predict_base_fee(self.blocks_ahead)
+        if base_fee is None:
+            return None
+        return base_fee + (self.priority_fee() if priority_fee is None else priority_fee)
+
+    def l1_fee(self, unsigned_tx_size: int) -> int:
+        return 0 if self.l1_params is None else l1_fee_upper_bound(self.l1_params, unsigned_tx_size)
+
+    def tx_cost(self, gas_units: int, unsigned_tx_size: int = 0) -> Optional[int]:
+        """Custo esperado em wei (execução na L2 + dados na L1), sem RPC"""
+        if self.quote is None:
+            return None
+        return gas_units * (self.quote.base_fee + self.quote.priority_fee) + self.l1_fee(unsigned_tx_size)
+
+    def stats(self) -> dict:
+        quote = self.quote
+        return {
+            "block": None if quote is None else quote.block,
+            "base_fee_gwei": None if quote is None else quote.base_fee / 1e9,
+            "priority_fee_gwei": None if quote is None else quote.priority_fee / 1e9,
+            "max_fee_gwei": None if quote is None else quote.max_fee / 1e9,
+            "gas_used_ratio": None if not self.gas_used_ratios else round(
+                sum(self.gas_used_ratios) / len(self.gas_used_ratios), 4
+            ),
+            "l1_base_fee_gwei": None if self.l1_params is None else self.l1_params.l1_base_fee / 1e9,
+        }
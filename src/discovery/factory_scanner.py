@@ -0,0 +1,146 @@
+"""
+Descoberta de pools a partir das factories
+
+Duas formas de alimentar o PoolRegistry:
+
+- scan_logs(): varre os eventos PoolCreated de cada factory desde o último
+  bloco varrido (ou start_block) até o head menos `confirmations`, em
+  janelas de eth_getLogs. O progresso é gravado a cada janela, então uma
+  varredura interrompida retoma de onde parou.
+- discover_pairs(): para um conjunto de tokens, consulta diretamente
+  getPool(tokenA, tokenB, fee) em cada tier das factories V3 e
+  getPair(tokenA, tokenB, stable) no router do Aerodrome, tudo em lote.
+"""
+
+import logging
+from itertools import combinations
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.discovery.pool_registry import PoolRecord, PoolRegistry, sort_tokens
+from src.pricing.pool_reader import SOLIDLY, UNISWAP_V3, CallResults
+from src.rpc.multicall import Call, function_selector
+
+logger = logging.getLogger(__name__)
+
+ZERO_ADDRESS = "0x" + "00" * 20
+
+V3_POOL_CREATED_TOPIC = Web3.keccak(text="PoolCreated(address,address,uint24,int24,address)")
+SOLIDLY_POOL_CREATED_TOPIC = Web3.keccak(text="PoolCreated(address,address,bool,address,uint256)")
+
+GET_POOL = function_selector("getPool(address,address,uint24)")
+GET_PAIR = function_selector("getPair(address,address,bool)")
+
+# Tiers de fee padrão do Uniswap V3 e o tickSpacing de cada um
+V3_FEE_TIERS = {100: 1, 500: 10, 3000: 60, 10000: 200}
+
+
+class FactorySpec(NamedTuple):
+    dex: str
+    kind: str
+    address: str                  # factory (fonte dos logs PoolCreated)
+    start_block: int = 0
+    router: Optional[str] = None  # Solidly: router que expõe getPair/pairFor
+
+
+def _address_from_word(word: bytes) -> str:
+    return "0x" + bytes(word[12:32]).hex()
+
+
+def decode_pool_created(factory: FactorySpec, log) -> Optional[PoolRecord]:
+    topics = [bytes(HexBytes(topic)) for topic in log["topics"]]
+    data = bytes(HexBytes(log["data"]))
+    if len(topics) < 4:
+        return None
+    token0, token1 = _address_from_word(topics[1]), _address_from_word(topics[2])
+
+    if factory.kind == UNISWAP_V3 and topics[0] == V3_POOL_CREATED_TOPIC:
+        # topics: token0, token1, fee; data: tickSpacing, pool
+        return PoolRecord(
+            _address_from_word(data[32:64]), factory.dex, UNISWAP_V3, token0, token1,
+            fee=int.from_bytes(topics[3], "big"),
+            tick_spacing=int.from_bytes(data[0:32], "big", signed=True),
+            created_block=log["blockNumber"]
+        )
+    if factory.kind == SOLIDLY and topics[0] == SOLIDLY_POOL_CREATED_TOPIC:
+        # topics: token0, token1, stable; data: pool, total de pools
+        return PoolRecord(
+            _address_from_word(data[0:32]), factory.dex, SOLIDLY, token0, token1,
+            stable=bool(int.from_bytes(topics[3], "big")), created_block=log["blockNumber"]
+        )
+    return None
+
+
+class PoolDiscovery:
+    def __init__(self, w3: Web3, registry: PoolRegistry, factories: Sequence[FactorySpec],
+                 max_log_range: int = 2000, confirmations: int = 5):
+        self.w3 = w3
+        self.registry = registry
+        self.factories = list(factories)
+        self.max_log_range = max_log_range
+        self.confirmations = confirmations
+
+    # --- Varredura incremental de PoolCreated ---
+
+    def scan_logs(self, to_block: Optional[int] = None) -> int:
+        """Varre cada factory até `to_block` (padrão: head - confirmations); devolve quantos pools novos"""
+        if to_block is None:
+            to_block = self.w3.eth.block_number - self.confirmations
+
+        added = 0
+        for factory in self.factories:
+            last = self.registry.last_scanned(factory.address)
+            from_block = factory.start_block if last is None else last + 1
+            topic = V3_POOL_CREATED_TOPIC if factory.kind == UNISWAP_V3 else SOLIDLY_POOL_CREATED_TOPIC
+
+            while from_block <= to_block:
+                chunk_end = min(to_block, from_block + self.max_log_range - 1)
+                logs = self.w3.eth.get_logs({
+                    "fromBlock": from_block, "toBlock": chunk_end,
+                    "address": Web3.to_checksum_address(factory.address), "topics": [Web3.to_hex(topic)]
+                })
+                records = [record for record in (decode_pool_created(factory, log) for log in logs) if record]
+                added += self.registry.add(records)
+                self.registry.mark_scanned(factory.address, chunk_end)
+                from_block = chunk_end + 1
+
+        if added:
+            logger.info(f"Descoberta de pools: {added} pools novos até o bloco {to_block}")
+        return added
+
+    # --- Consulta direta por par de tokens ---
+
+    def pair_calls(self, tokens: Iterable[str]) -> List[Tuple[PoolRecord, Call]]:
+        """Chamadas getPool/getPair para todos os pares entre `tokens`, com o registro a preencher"""
+        planned = []
+        for token_a, token_b in combinations(sorted({token.lower() for token in tokens}), 2):
+            token0, token1 = sort_tokens(token_a, token_b)
+            args = (Web3.to_checksum_address(token0), Web3.to_checksum_address(token1))
+            for factory in self.factories:
+                if factory.kind == UNISWAP_V3:
+                    for fee, tick_spacing in V3_FEE_TIERS.items():
+                        record = PoolRecord(ZERO_ADDRESS, factory.dex, UNISWAP_V3, token0, token1,
+                                            fee=fee, tick_spacing=tick_spacing)
+                        calldata = GET_POOL + encode(["address", "address", "uint24"], [*args, fee])
+                        planned.append((record, Call(factory.address, calldata, ("address",))))
+                elif factory.kind == SOLIDLY and factory.router:
+                    for stable in (False, True):
+                        record = PoolRecord(ZERO_ADDRESS, factory.dex, SOLIDLY, token0, token1, stable=stable)
+                        calldata = GET_PAIR + encode(["address", "address", "bool"], [*args, stable])
+                        planned.append((record, Call(factory.router, calldata, ("address",))))
+        return planned
+
+    def discover_pairs(self, call_many: Callable[[List[Call]], CallResults], tokens: Iterable[str]) -> int:
+        planned = self.pair_calls(tokens)
+        results = call_many([call for _, call in planned])
+        records = [
+            record._replace(address=result[0].lower())
+            for (record, _), result in zip(planned, results)
+            if result is not None and int(result[0], 16) != 0
+        ]
+        added = self.registry.add(records)
+        logger.info(f"Descoberta por pares: {len(records)} pools encontrados, {added} novos no registro")
+        return added
@@ -0,0 +1,157 @@
+"""
+Registro persistente de pools
+
+Tabela SQLite em data/ com um índice por par de tokens (token0, token1):
+cada par pode ter vários pools (tiers de fee do V3, pools estável/volátil
+do Aerodrome) em várias DEXs. Guarda também até que bloco cada factory já
+foi varrida, para que a descoberta retome de onde parou.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, NamedTuple, Optional
+
+from src.pricing.pool_reader import SOLIDLY, PoolSpec
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pools (
+    chain_id INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    dex TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    token0 TEXT NOT NULL,
+    token1 TEXT NOT NULL,
+    fee INTEGER,
+    tick_spacing INTEGER,
+    stable INTEGER,
+    created_block INTEGER,
+    PRIMARY KEY (chain_id, address)
+);
+CREATE INDEX IF NOT EXISTS pools_by_pair ON pools (chain_id, token0, token1);
+CREATE TABLE IF NOT EXISTS scan_state (
+    chain_id INTEGER NOT NULL,
+    factory TEXT NOT NULL,
+    last_block INTEGER NOT NULL,
+    PRIMARY KEY (chain_id, factory)
+);
+"""
+
+# Fee padrão das factories Solidly/Aerodrome quando o pool não informa a sua
+SOLIDLY_DEFAULT_FEES = {False: 0.003, True: 0.0005}
+
+COLUMNS = "address, dex, kind, token0, token1, fee, tick_spacing, stable, created_block"
+
+
+class PoolRecord(NamedTuple):
+    address: str
+    dex: str
+    kind: str
+    token0: str
+    token1: str
+    fee: Optional[int] = None           # V3: fee em centésimos de bip (500 = 0.05%)
+    tick_spacing: Optional[int] = None
+    stable: Optional[bool] = None       # Solidly: curva estável ou volátil
+    created_block: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        # Nome usado na PriceTable: distingue pools da mesma DEX no mesmo par
+        if self.kind == SOLIDLY and self.stable is not None:
+            return f"{self.dex} {'estável' if self.stable else 'volátil'}"
+        if self.fee is not None:
+            return f"{self.dex} {self.fee / 10_000:.2f}%"
+        return self.dex
+
+    @property
+    def fee_rate(self) -> float:
+        # Fração cobrada por swap (0.003 = 0.3%)
+        if self.fee is not None:
+            return self.fee / 1_000_000
+        if self.kind == SOLIDLY:
+            return SOLIDLY_DEFAULT_FEES[bool(self.stable)]
+        return 0.0
+
+    def spec(self) -> PoolSpec:
+        return PoolSpec(self.label, self.address, self.kind)
+
+
+def sort_tokens(token_a: str, token_b: str):
+    # Mesma ordem de token0/token1 dos contratos (endereço numérico crescente)
+    token_a, token_b = token_a.lower(), token_b.lower()
+    return (token_a, token_b) if int(token_a, 16) < int(token_b, 16) else (token_b, token_a)
+
+
+class PoolRegistry:
+    def __init__(self, path: str = "data/pools.sqlite", chain_id: int = 8453):
+        self.path = path
+        self.chain_id = chain_id
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT COUNT(*) FROM pools WHERE chain_id = ?", (self.chain_id,)).fetchone()
+        return row[0]
+
+    def add(self, records: Iterable[PoolRecord]) -> int:
+        """Insere pools novos (pools já conhecidos são ignorados); devolve quantos entraram"""
+        rows = [
+            (self.chain_id, r.address.lower(), r.dex, r.kind, *sort_tokens(r.token0, r.token1),
+             r.fee, r.tick_spacing, None if r.stable is None else int(r.stable), r.created_block)
+            for r in records
+        ]
+        if not rows:
+            return 0
+        with self._lock, self._db:
+            before = self._db.total_changes
+            self._db.executemany(f"INSERT OR IGNORE INTO pools (chain_id, {COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            return self._db.total_changes - before
+
+    def pools_for_pair(self, token_a: str, token_b: str) -> List[PoolRecord]:
+        token0, token1 = sort_tokens(token_a, token_b)
+        return self._select("token0 = ? AND token1 = ?", (token0, token1))
+
+    def pools(self, dex: Optional[str] = None) -> List[PoolRecord]:
+        if dex is None:
+            return self._select("1", ())
+        return self._select("dex = ?", (dex,))
+
+    def _select(self, where: str, params: tuple) -> List[PoolRecord]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {COLUMNS} FROM pools WHERE chain_id = ? AND {where} ORDER BY dex, fee, address",
+                (self.chain_id, *params)
+            ).fetchall()
+        return [
+            PoolRecord(*row[:7], stable=None if row[7] is None else bool(row[7]), created_block=row[8])
+            for row in rows
+        ]
+
+    # --- Progresso da varredura por factory ---
+
+    def last_scanned(self, factory: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_block FROM scan_state WHERE chain_id = ? AND factory = ?",
+                (self.chain_id, factory.lower())
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_scanned(self, factory: str, block: int) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO scan_state (chain_id, factory, last_block) VALUES (?, ?, ?)",
+                (self.chain_id, factory.lower(), block)
+            )
@@ -0,0 +1,193 @@
+"""
+Envio de FlashArbitrage.executeArbitrage
+
+Transforma um candidato aprovado na simulação numa transação EIP-1559
+assinada e enviada com o mínimo de idas ao RPC no caminho quente:
+
+- calldata montado direto (seletor fixo + 7 palavras, ver encode_params);
+- nonce mantido localmente: uma leitura de get_transaction_count("pending")
+  na partida e depois de falhas, nunca por transação;
+- gás estimado uma vez por forma de rota (tokens + routers) e reaproveitado
+  com margem até expirar;
+- fees lidas do GasOracle (ou do último bloco) fora do caminho quente,
+  em refresh_fees uma vez por ciclo.
+
+Com tudo em cache, entre a detecção e o eth_sendRawTransaction sobram só a
+assinatura local e o POST.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from eth_account import Account
+from web3 import Web3
+
+from src.chain.gas_oracle import GasOracle
+from src.execution.simulator import ARBITRAGE_PARAMS_TYPE, ArbitrageParams, encode_params
+from src.rpc.multicall import function_selector
+
+logger = logging.getLogger(__name__)
+
+EXECUTE_ARBITRAGE_SELECTOR = function_selector(f"executeArbitrage({ARBITRAGE_PARAMS_TYPE})")
+
+# Tamanho aproximado da tx EIP-1559 sem assinatura: calldata + campos RLP (para a taxa de dados da L1)
+EXECUTE_TX_SIZE = 4 + 7 * 32 + 60
+
+
+def encode_execute_arbitrage(params: ArbitrageParams) -> bytes:
+    return encode_params(EXECUTE_ARBITRAGE_SELECTOR, params)
+
+
+class NonceManager:
+    """Nonce local da conta; só volta ao RPC na primeira vez e depois de uma falha"""
+
+    def __init__(self, w3: Web3, address: str):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self._next: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def sync(self) -> int:
+        nonce = self.w3.eth.get_transaction_count(self.address, "pending")
+        with self._lock:
+            self._next = nonce
+        return nonce
+
+    def next(self) -> int:
+        with self._lock:
+            if self._next is None:
+                self._next = self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def invalidate(self) -> None:
+        # Transação não saiu (ou nonce rejeitado): a próxima chamada relê da rede
+        with self._lock:
+            self._next = None
+
+
+class GasEstimateCache:
+    """eth_estimateGas por forma de rota, com margem e validade"""
+
+    def __init__(self, estimate: Callable[[Dict[str, Any]], int], margin: float = 1.2, ttl: float = 600.0):
+        self.estimate = estimate
+        self.margin = margin
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[int, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, tx: Dict[str, Any]) -> int:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        gas = int(self.estimate(tx) * self.margin)
+        self._entries[key] = (gas, now)
+        return gas
+
+    def forget(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+
+def route_shape(params: ArbitrageParams) -> Tuple[str, str, str, str]:
+    # O gás depende do caminho (tokens e routers), quase nada do amountIn
+    return params.token_a.lower(), params.token_b.lower(), params.dex_buy.lower(), params.dex_sell.lower()
+
+
+class ArbitrageExecutor:
+    def __init__(self, w3: Web3, contract: str, private_key: str, chain_id: int,
+                 priority_fee: int = Web3.to_wei(0.01, "gwei"), max_fee_cap: Optional[int] = None,
+                 min_profit_bps: int = 0, deadline_seconds: int = 60, gas_margin: float = 1.2,
+                 gas_ttl: float = 600.0, gas_oracle: Optional[GasOracle] = None):
+        self.w3 = w3
+        self.contract = Web3.to_checksum_address(contract)
+        self.account = Account.from_key(private_key)
+        self.chain_id = chain_id
+        self.priority_fee = priority_fee    # gorjeta mínima
+        self.tip = priority_fee
+        self.gas_oracle = gas_oracle
+        self.max_fee_cap = max_fee_cap
+        self.min_profit_bps = min_profit_bps
+        self.deadline_seconds = deadline_seconds
+        self.nonces = NonceManager(w3, self.account.address)
+        self.gas = GasEstimateCache(w3.eth.estimate_gas, gas_margin, gas_ttl)
+        self.max_fee: Optional[int] = None
+        self.stats = {"sent": 0, "failed": 0, "skipped": 0, "last_latency_ms": None}
+
+    def refresh_fees(self, base_fee: Optional[int] = None) -> None:
+        """Fora do caminho quente: previsão do GasOracle ou, sem ele, 2×baseFee + gorjeta"""
+        quote = self.gas_oracle.quote if self.gas_oracle is not None else None
+        if base_fee is None and quote is not None:
+            self.tip = max(self.priority_fee, quote.priority_fee)
+            self.max_fee = quote.max_fee - quote.priority_fee + self.tip
+            return
+        if base_fee is None:
+            base_fee = self.w3.eth.get_block("latest")["baseFeePerGas"]
+        self.tip = self.priority_fee
+        self.max_fee = 2 * base_fee + self.tip
+
+    def warm(self) -> None:
+        self.nonces.sync()
+        if self.max_fee is None:
+            self.refresh_fees()
+
+    def build(self, params: ArbitrageParams) -> Dict[str, Any]:
+        # Deadline e exigência de lucro do contrato são do executor, não da simulação
+        params = params._replace(
+            min_profit_bps=self.min_profit_bps, deadline=int(time.time()) + self.deadline_seconds
+        )
+        tx = {
+            "from": self.account.address,
+            "to": self.contract,
+            "data": encode_execute_arbitrage(params),
+            "value": 0,
+            "chainId": self.chain_id,
+            "type": 2,
+            "maxFeePerGas": self.max_fee,
+            "maxPriorityFeePerGas": self.tip,
+        }
+        tx["gas"] = self.gas.get(route_shape(params), tx)
+        return tx
+
+    def execute(self, params: ArbitrageParams, detected_at: Optional[float] = None) -> Optional[str]:
+        """
+        Assina e envia executeArbitrage. detected_at (time.perf_counter() da
+        detecção) alimenta a métrica de latência. Devolve o hash ou None.
+        """
+        if self.max_fee is None:
+            self.refresh_fees()
+        if self.max_fee_cap is not None and self.max_fee > self.max_fee_cap:
+            self.stats["skipped"] += 1
+            logger.warning(f"maxFeePerGas {self.max_fee} acima do limite {self.max_fee_cap}, execução ignorada")
+            return None
+
+        try:
+            tx = self.build(params)
+        except Exception as e:
+            # estimate_gas reverte quando a rota não dá lucro no estado atual
+            self.stats["skipped"] += 1
+            logger.error(f"Erro ao estimar gás de executeArbitrage: {e}")
+            return None
+
+        tx["nonce"] = self.nonces.next()
+        try:
+            signed = self.account.sign_transaction(tx)
+            raw = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+            tx_hash = self.w3.eth.send_raw_transaction(raw)
+        except Exception as e:
+            self.stats["failed"] += 1
+            self.nonces.invalidate()
+            self.gas.forget(route_shape(params))
+            logger.error(f"Erro ao enviar executeArbitrage (nonce {tx['nonce']}): {e}")
+            return None
+
+        self.stats["sent"] += 1
+        if detected_at is not None:
+            self.stats["last_latency_ms"] = round((time.perf_counter() - detected_at) * 1000, 2)
+        return Web3.to_hex(tx_hash)
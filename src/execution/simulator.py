@@ -0,0 +1,210 @@
+"""
+Simulação dos candidatos antes do alerta
+
+Um spread de preço médio não diz se a arbitragem executa: slippage e a
+lógica do próprio contrato ficam de fora. Cada candidato vira o struct
+ArbitrageParams do FlashArbitrage e é avaliado por calculateProfit (que
+chama _simulateArbitrage nos routers) via eth_call, fixado no bloco do
+snapshot. Só passam os que, descontados o prêmio do flash loan e o gás
+(do GasOracle, já em memória), ficam acima do threshold.
+
+Cada candidato é simulado numa escada de tamanhos (frações do tamanho base
+do token emprestado) e vale o melhor degrau. As chamadas saem em blocos por
+call_many (Multicall3, batch JSON-RPC ou motor assíncrono) e os blocos
+rodam em paralelo num pool de threads: centenas de candidatos por bloco
+custam poucas idas ao RPC.
+
+Com um TradeSizer, candidatos cujos dois pools têm estado exato no bloco
+(Solidly e V3) são simulados num único tamanho: o ótimo do quoter, limitado
+à liquidez do flash loan. A escada fica para os demais (routers sem modelo,
+como o MockDEX, ou estado que não pôde ser lido).
+
+Com um FlashLoanCosts, o prêmio é o lido do pool da Aave e os tamanhos passam
+antes por screen(): candidatos que não cobrem o prêmio ou sem liquidez na
+reserva nem chegam ao eth_call.
+
+Simulação em processo (py-evm sobre estado em cache) não está aqui: exigiria
+replicar o storage de pools e routers num EVM local a cada bloco.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from web3 import Web3
+
+from src.pricing.price_table import Opportunity
+from src.rpc.multicall import Call, function_selector
+from src.strategy.sizing import flash_loan_premium
+
+logger = logging.getLogger(__name__)
+
+ARBITRAGE_PARAMS_TYPE = "(address,address,address,address,uint256,uint256,uint256)"
+CALCULATE_PROFIT_SELECTOR = function_selector(f"calculateProfit({ARBITRAGE_PARAMS_TYPE})")
+
+# Frações do tamanho base simuladas para cada candidato
+DEFAULT_LADDER = (0.25, 0.5, 1.0, 2.0, 4.0)
+
+CallMany = Callable[[Sequence[Call], object], List[Optional[tuple]]]
+
+
+class ArbitrageParams(NamedTuple):
+    """Mesmos campos e ordem do struct FlashArbitrage.ArbitrageParams"""
+    token_a: str       # emprestado no flash loan e devolvido no fim
+    token_b: str
+    dex_buy: str       # router IUnifiedDEX: tokenA -> tokenB
+    dex_sell: str      # router IUnifiedDEX: tokenB -> tokenA
+    amount_in: int
+    min_profit_bps: int
+    deadline: int
+
+
+def encode_params(selector: bytes, params: ArbitrageParams) -> bytes:
+    """
+    Calldata de uma função que recebe só o struct: todos os campos são
+    estáticos, então o ABI é seletor + 7 palavras de 32 bytes, sem offsets.
+    Montado direto, sem passar pelo codec genérico do eth_abi.
+    """
+    words = [int(address, 16) for address in params[:4]] + list(params[4:])
+    return selector + b"".join(word.to_bytes(32, "big") for word in words)
+
+
+def encode_calculate_profit(params: ArbitrageParams) -> bytes:
+    return encode_params(CALCULATE_PROFIT_SELECTOR, params)
+
+
+def resolve_router(routers: Dict[str, str], dex_label: str) -> Optional[str]:
+    # "Uniswap V3 0.05%" usa o router de "Uniswap V3": vale o nome mais longo que casar
+    matches = [name for name in routers if dex_label == name or dex_label.startswith(name + " ")]
+    return routers[max(matches, key=len)] if matches else None
+
+
+class SimulationResult(NamedTuple):
+    opportunity: Opportunity
+    params: ArbitrageParams
+    profit: int        # retorno de calculateProfit, na unidade mínima de tokenA
+    flash_fee: int
+    gas_cost: int      # em tokenA
+    net_profit: int
+
+    @property
+    def profit_rate(self) -> float:
+        return self.net_profit / self.params.amount_in
+
+
+class CandidateSimulator:
+    def __init__(self, call_many: CallMany, contract: str, routers: Dict[str, str], min_profit: float,
+                 amount_for: Callable[[str], Optional[int]], ladder: Sequence[float] = DEFAULT_LADDER,
+                 premium_bps: int = 5, min_profit_bps: int = 0, deadline_seconds: int = 120,
+                 workers: int = 4, chunk_size: int = 100,
+                 gas_cost: Optional[Callable[[str], Optional[int]]] = None, flash_loans=None, sizer=None):
+        self.call_many = call_many
+        self.contract = Web3.to_checksum_address(contract)
+        self.routers = routers
+        self.min_profit = min_profit
+        self.amount_for = amount_for
+        self.ladder = ladder
+        self.premium_bps = premium_bps
+        self.min_profit_bps = min_profit_bps
+        self.deadline_seconds = deadline_seconds
+        self.chunk_size = chunk_size
+        self.gas_cost = gas_cost
+        self.flash_loans = flash_loans
+        self.sizer = sizer
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simulator")
+        self.simulated = 0
+        self.rejected = 0
+        self.screened = 0
+        self.sized = 0
+
+    def build_params(self, opportunity: Opportunity, amount_in: int, now: int) -> Optional[ArbitrageParams]:
+        # price = token_out por token_in: empresta token_out, compra token_in onde está
+        # barato (dex_buy) e vende onde está caro (dex_sell)
+        dex_buy = resolve_router(self.routers, opportunity.dex_buy)
+        dex_sell = resolve_router(self.routers, opportunity.dex_sell)
+        if dex_buy is None or dex_sell is None:
+            return None
+        return ArbitrageParams(
+            opportunity.token_out, opportunity.token_in, dex_buy, dex_sell,
+            amount_in, self.min_profit_bps, now + self.deadline_seconds
+        )
+
+    def _run_chunk(self, calls: List[Call], block_identifier) -> List[Optional[tuple]]:
+        try:
+            return self.call_many(calls, block_identifier)
+        except Exception as e:
+            logger.error(f"Erro ao simular {len(calls)} candidatos: {e}")
+            return [None] * len(calls)
+
+    def _gas_cost(self, gas_costs: Dict[str, int], token: str) -> int:
+        # Uma conversão por token emprestado e por rodada
+        if token not in gas_costs:
+            gas_costs[token] = (self.gas_cost(token) if self.gas_cost else None) or 0
+        return gas_costs[token]
+
+    def simulate(self, opportunities: Iterable[Opportunity], block_identifier="latest") -> List[SimulationResult]:
+        """Devolve, do mais para o menos lucrativo, os candidatos aprovados na simulação"""
+        opportunities = list(opportunities)
+        now = int(time.time())
+        premium_bps = self.flash_loans.premium_bps if self.flash_loans is not None else self.premium_bps
+        gas_costs: Dict[str, int] = {}
+        if self.sizer is not None:
+            self.sizer.load(opportunities, block_identifier)
+        calls: List[Call] = []
+        owners: List[tuple] = []
+        for index, opportunity in enumerate(opportunities):
+            if self.sizer is not None and self.sizer.models(opportunity):
+                trade = self.sizer.size(
+                    opportunity, premium_bps, self._gas_cost(gas_costs, opportunity.token_out),
+                    self.flash_loans.max_amount(opportunity.token_out) if self.flash_loans is not None else None
+                )
+                if trade is None:
+                    self.screened += 1
+                    continue
+                self.sized += 1
+                amounts = [trade.amount_in]
+            else:
+                base = self.amount_for(opportunity.token_out)
+                if not base:
+                    continue
+                amounts = [int(base * fraction) for fraction in self.ladder]
+            if self.flash_loans is not None:
+                amounts = self.flash_loans.screen(opportunity.token_out, opportunity.profit, amounts, self.min_profit)
+                if not amounts:
+                    self.screened += 1
+                    continue
+            for amount_in in amounts:
+                params = self.build_params(opportunity, amount_in, now)
+                if params is None:
+                    logger.debug(f"Sem router para {opportunity.dex_buy}/{opportunity.dex_sell}, candidato ignorado")
+                    break
+                calls.append(Call(self.contract, encode_calculate_profit(params), ("uint256",)))
+                owners.append((index, params))
+        if not calls:
+            return []
+
+        chunks = [calls[start:start + self.chunk_size] for start in range(0, len(calls), self.chunk_size)]
+        results = [
+            result
+            for chunk_results in self._executor.map(lambda chunk: self._run_chunk(chunk, block_identifier), chunks)
+            for result in chunk_results
+        ]
+
+        best: Dict[int, SimulationResult] = {}
+        for (index, params), result in zip(owners, results):
+            if result is None:
+                continue
+            flash_fee = flash_loan_premium(params.amount_in, premium_bps)
+            gas_cost = self._gas_cost(gas_costs, params.token_a)
+            simulation = SimulationResult(
+                opportunities[index], params, result[0], flash_fee, gas_cost, result[0] - flash_fee - gas_cost
+            )
+            if index not in best or simulation.net_profit > best[index].net_profit:
+                best[index] = simulation
+
+        passed = [simulation for simulation in best.values() if simulation.profit_rate >= self.min_profit]
+        passed.sort(key=lambda simulation: simulation.profit_rate, reverse=True)
+        self.simulated += len(best)
+        self.rejected += len(best) - len(passed)
+        return passed
@@ -0,0 +1,133 @@
+"""
+Métricas Prometheus do bot
+
+Histogramas e contadores do caminho quente ficam no registro padrão do
+prometheus_client e são atualizados onde o evento acontece: observe() num
+filho já resolvido custa ~1 µs (lock + bisect nos buckets), então dá para
+chamar dentro do laço. Os filhos por rótulo são resolvidos uma vez e
+guardados em `child()`.
+
+O que já é contado em outro lugar (hits de cache, saúde dos endpoints,
+bucket de rate limit, fila do Telegram, fees) não é duplicado: o
+MonitorCollector lê esses contadores só na hora do scrape.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Do RPC local (~1 ms) ao endpoint lento com retry (~10 s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+
+RPC_LATENCY = Histogram(
+    "arb_rpc_request_seconds", "Latência das requisições RPC por método (sem a espera no rate limit)",
+    ["method"], buckets=LATENCY_BUCKETS
+)
+RPC_REQUESTS = Counter("arb_rpc_requests_total", "Requisições RPC por método e resultado", ["method", "outcome"])
+RPC_BATCH_ITEMS = Counter("arb_rpc_batch_items_total", "Chamadas enviadas dentro de batches JSON-RPC", ["method"])
+CYCLE_DURATION = Histogram("arb_cycle_seconds", "Duração de cada ciclo de varredura", buckets=CYCLE_BUCKETS)
+SNAPSHOT_LATENCY = Histogram(
+    "arb_snapshot_seconds", "Leitura de preços de todos os pools por origem", ["source"], buckets=LATENCY_BUCKETS
+)
+QUOTE_LATENCY = Histogram(
+    "arb_dex_quote_seconds", "Latência de cotação de um pool por DEX", ["dex"], buckets=LATENCY_BUCKETS
+)
+DETECTION_TO_ALERT = Histogram(
+    "arb_detection_to_alert_seconds", "Da detecção à entrega do alerta no Telegram", buckets=CYCLE_BUCKETS
+)
+DETECTION_TO_SEND = Histogram(
+    "arb_detection_to_send_seconds", "Da detecção ao eth_sendRawTransaction", buckets=LATENCY_BUCKETS
+)
+ERRORS = Counter("arb_errors_total", "Erros por tipo", ["type"])
+OPPORTUNITIES = Counter("arb_opportunities_total", "Oportunidades encontradas por par", ["pair", "kind"])
+
+_children: Dict[Tuple[int, Tuple[str, ...]], Any] = {}
+
+
+def child(metric, *labels: str):
+    """metric.labels(*labels) com cache: no laço quente evita o lock e a validação dos rótulos"""
+    key = (id(metric), labels)
+    found = _children.get(key)
+    if found is None:
+        found = _children[key] = metric.labels(*labels)
+    return found
+
+
+def observe_rpc(method: str, seconds: float, ok: bool) -> None:
+    child(RPC_LATENCY, method).observe(seconds)
+    child(RPC_REQUESTS, method, "ok" if ok else "error").inc()
+
+
+def count_error(kind: str) -> None:
+    child(ERRORS, kind).inc()
+
+
+def render() -> Tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MonitorCollector:
+    """Converte, no scrape, os contadores que os componentes já mantêm"""
+
+    def __init__(self, caches: Optional[Dict[str, Any]] = None, provider_pool=None, limiter=None,
+                 telegram=None, gas_oracle=None, stats: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.caches = caches or {}
+        self.provider_pool = provider_pool
+        self.limiter = limiter
+        self.telegram = telegram
+        self.gas_oracle = gas_oracle
+        self.stats = stats
+
+    def collect(self) -> Iterable:
+        hits = CounterMetricFamily("arb_cache_hits", "Hits de cache", labels=["cache"])
+        misses = CounterMetricFamily("arb_cache_misses", "Misses de cache", labels=["cache"])
+        for name, cache in self.caches.items():
+            if cache is None:
+                continue
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+        yield hits
+        yield misses
+
+        if self.provider_pool is not None:
+            requests = CounterMetricFamily("arb_endpoint_requests", "Requisições por endpoint", labels=["endpoint"])
+            errors = CounterMetricFamily("arb_endpoint_errors", "Falhas por endpoint", labels=["endpoint"])
+            hedges = CounterMetricFamily("arb_endpoint_hedges", "Requisições de hedge por endpoint", labels=["endpoint"])
+            p95 = GaugeMetricFamily("arb_endpoint_p95_seconds", "p95 recente por endpoint", labels=["endpoint"])
+            for endpoint in self.provider_pool.stats():
+                labels = [endpoint["endpoint"]]
+                requests.add_metric(labels, endpoint["requests"])
+                errors.add_metric(labels, endpoint["errors"])
+                hedges.add_metric(labels, endpoint["hedges"])
+                if endpoint["p95_ms"] is not None:
+                    p95.add_metric(labels, endpoint["p95_ms"] / 1000)
+            yield from (requests, errors, hedges, p95)
+
+        if self.limiter is not None:
+            bucket = self.limiter.stats()
+            yield GaugeMetricFamily("arb_rpc_bucket_utilization", "Fração consumida do token bucket",
+                                    value=bucket["utilization"])
+            yield GaugeMetricFamily("arb_rpc_bucket_rate", "Taxa atual do token bucket (CU/s)", value=bucket["rate"])
+            yield CounterMetricFamily("arb_rpc_rate_limited", "Respostas 429 recebidas", value=bucket["rate_limited"])
+
+        if self.telegram is not None:
+            telegram = CounterMetricFamily("arb_telegram_messages", "Mensagens do Telegram por destino",
+                                           labels=["outcome"])
+            for outcome in ("sent", "failed", "coalesced", "dropped", "rate_limited"):
+                telegram.add_metric([outcome], self.telegram.stats[outcome])
+            yield telegram
+            yield GaugeMetricFamily("arb_telegram_queue", "Mensagens na fila do Telegram", value=self.telegram.pending())
+
+        quote = self.gas_oracle.quote if self.gas_oracle is not None else None
+        if quote is not None:
+            yield GaugeMetricFamily("arb_base_fee_wei", "Base fee prevista para o próximo bloco", value=quote.base_fee)
+            yield GaugeMetricFamily("arb_priority_fee_wei", "Gorjeta escolhida pelo oráculo", value=quote.priority_fee)
+
+        if self.stats is not None:
+            stats = self.stats()
+            if stats.get("last_block") is not None:
+                yield GaugeMetricFamily("arb_last_block", "Último bloco processado", value=stats["last_block"])
+            yield CounterMetricFamily("arb_blocks_skipped", "Blocos pulados entre ciclos",
+                                      value=stats.get("blocks_skipped", 0))
@@ -1,26 +1,234 @@
-import requests
+"""
+Notificações do Telegram em fila, fora do loop de varredura
+
+send_message() só enfileira e volta na hora; uma thread de fundo envia por
+uma requests.Session persistente (conexão reaproveitada), respeitando os
+limites do Telegram: ~30 mensagens/s por bot (ou o bucket compartilhado com
+o RPC, quando passado) e ~1 mensagem/s por chat.
+
+Alertas com a mesma chave (ex.: o par) são agrupados: o primeiro sai logo,
+os seguintes dentro de `coalesce_window` segundos viram uma única mensagem
+no fim da janela, com a contagem. A fila é limitada: cheia, a mensagem nova
+é descartada e a próxima enviada leva um resumo dos descartes. O scanner
+nunca espera pela rede.
+"""
+
+import itertools
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import requests
+
+from src.monitoring.metrics import DETECTION_TO_ALERT
+from src.rpc.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+
+# Limites documentados do Bot API
+BOT_MESSAGES_PER_SECOND = 30
+CHAT_MESSAGE_INTERVAL = 1.0
+
+
+class _Pending:
+    __slots__ = ("text", "count", "due", "keyed", "detected_at")
+
+    def __init__(self, text: str, due: float, keyed: bool, detected_at: Optional[float]):
+        self.text = text
+        self.count = 1
+        self.due = due
+        self.keyed = keyed
+        self.detected_at = detected_at    # time.perf_counter() do alerta mais antigo do grupo
+
 
 class TelegramNotifier:
-    def __init__(self):
-        self.token = os.getenv("TELEGRAM_BOT_TOKEN")
-        self.chat_id = os.getenv("TELEGRAM_CHAT_ID")
-        self.base_url = f"https://api.telegram.org/bot{self.token}"
-
-    def send_message(self, message):
-        url = f"{self.base_url}/sendMessage"
-        params = {
-            "chat_id": self.chat_id,
-            "text": message,
-            "parse_mode": "Markdown"
-        }
+    def __init__(self, token: Optional[str] = None, chat_id: Optional[str] = None,
+                 limiter: Optional[TokenBucket] = None, api_url: Optional[str] = None,
+                 max_queue: int = 100, coalesce_window: float = 10.0,
+                 chat_interval: float = CHAT_MESSAGE_INTERVAL, timeout: float = 10.0):
+        self.token = token if token is not None else os.getenv("TELEGRAM_BOT_TOKEN")
+        self.chat_id = chat_id if chat_id is not None else os.getenv("TELEGRAM_CHAT_ID")
+        self.base_url = f"{(api_url or os.getenv('TELEGRAM_API_URL') or TELEGRAM_API_URL).rstrip('/')}/bot{self.token}"
+        # Bucket compartilhado debita "telegram" com chave própria: um 429 daqui não pausa o RPC
+        self.limiter = limiter or TokenBucket(BOT_MESSAGES_PER_SECOND, BOT_MESSAGES_PER_SECOND)
+        self.max_queue = max_queue
+        self.coalesce_window = coalesce_window
+        self.chat_interval = chat_interval
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._pending: "OrderedDict[Hashable, _Pending]" = OrderedDict()
+        self._last_sent: Dict[Hashable, float] = {}
+        self._chat_ready = 0.0
+        self._dropped_unreported = 0
+        self._in_flight = 0
+        self._ids = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "coalesced": 0, "dropped": 0, "rate_limited": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.token and self.chat_id)
+
+    def send_message(self, message: str, key: Optional[Hashable] = None,
+                     detected_at: Optional[float] = None) -> bool:
+        """
+        Enfileira sem bloquear. Mensagens com a mesma `key` dentro da janela
+        são agrupadas. Com detected_at (time.perf_counter() da detecção), a
+        entrega alimenta o histograma de latência detecção -> alerta.
+        Devolve False se o Telegram não estiver configurado ou se a fila
+        estiver cheia.
+        """
+        if not self.configured:
+            logger.warning("Telegram não configurado")
+            return False
+
+        with self._cond:
+            if self._closed:
+                return False
+            now = time.monotonic()
+            if key is not None and key in self._pending:
+                pending = self._pending[key]
+                pending.text = message
+                pending.count += 1
+                if pending.detected_at is None:
+                    pending.detected_at = detected_at
+                self.stats["coalesced"] += 1
+                return True
+            if len(self._pending) >= self.max_queue:
+                self._dropped_unreported += 1
+                self.stats["dropped"] += 1
+                return False
+
+            keyed = key is not None
+            due = now
+            if keyed:
+                due = max(now, self._last_sent.get(key, float("-inf")) + self.coalesce_window)
+            else:
+                key = ("_", next(self._ids))
+            self._pending[key] = _Pending(message, due, keyed, detected_at)
+            self.stats["queued"] += 1
+            self._ensure_worker()
+            self._cond.notify()
+        return True
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+            self._worker.start()
+
+    def _next_ready(self):
+        """Sob o lock: espera a próxima mensagem vencida; None ao fechar com a fila vazia"""
+        while True:
+            now = time.monotonic()
+            ready = None
+            wake = None
+            for key, pending in self._pending.items():
+                # No fechamento não espera janelas de agrupamento
+                if pending.due <= now or self._closed:
+                    ready = key
+                    break
+                wake = pending.due if wake is None else min(wake, pending.due)
+            if ready is not None:
+                pending = self._pending.pop(ready)
+                if pending.keyed:
+                    # A janela conta da saída: alertas do par a partir daqui esperam o próximo envio agrupado
+                    self._last_sent[ready] = now
+                self._in_flight += 1
+                return ready, pending
+            if self._closed:
+                return None
+            self._cond.wait(None if wake is None else wake - now)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                item = self._next_ready()
+                if item is None:
+                    return
+                dropped, self._dropped_unreported = self._dropped_unreported, 0
+            key, pending = item
+            try:
+                self._deliver(key, pending, dropped)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _format(self, pending: _Pending, dropped: int) -> str:
+        text = pending.text
+        if pending.count > 1:
+            text += f"\n\n_(+{pending.count - 1} alertas iguais agrupados)_"
+        if dropped:
+            text += f"\n\n⚠️ _{dropped} mensagens descartadas com a fila cheia_"
+        return text
+
+    def _deliver(self, key: Hashable, pending: _Pending, dropped: int) -> None:
+        self.limiter.wait("telegram", key="telegram")
+        delay = self._chat_ready - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        payload = {"chat_id": self.chat_id, "text": self._format(pending, dropped), "parse_mode": "Markdown"}
         try:
-            response = requests.post(url, json=params)
+            response = self.session.post(f"{self.base_url}/sendMessage", json=payload, timeout=self.timeout)
+            self._chat_ready = time.monotonic() + self.chat_interval
+            if response.status_code == 429:
+                retry_after = response.json().get("parameters", {}).get("retry_after")
+                delay = self.limiter.penalize(retry_after, key="telegram")
+                self.stats["rate_limited"] += 1
+                self._requeue(key, pending, dropped, time.monotonic() + delay)
+                return
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error sending Telegram message: {e}")
-            return None
+            self.stats["sent"] += 1
+            if pending.detected_at is not None:
+                DETECTION_TO_ALERT.observe(time.perf_counter() - pending.detected_at)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Erro ao enviar mensagem Telegram: {e}")
+
+    def _requeue(self, key: Hashable, pending: _Pending, dropped: int, due: float) -> None:
+        # Depois de um 429 a mensagem volta para a fila; se o par já tem outra, somam-se as contagens
+        with self._cond:
+            self._dropped_unreported += dropped
+            queued = self._pending.get(key)
+            if queued is not None:
+                queued.count += pending.count
+                queued.due = max(queued.due, due)
+            else:
+                pending.due = due
+                self._pending[key] = pending
+                self._pending.move_to_end(key, last=False)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera a fila esvaziar (inclusive agrupamentos ainda na janela)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Envia o que restou na fila sem esperar as janelas e encerra a thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout)
+        self.session.close()
 
     def format_arbitrage_opportunity(self, opportunity):
         message = (
@@ -37,5 +245,4 @@ class TelegramNotifier:
 
     def send_arbitrage_opportunity(self, opportunity):
         message = self.format_arbitrage_opportunity(opportunity)
-        return self.send_message(message)
-
+        return self.send_message(message, key=(opportunity['tokenA'], opportunity['tokenB']))
@@ -1,5 +1,9 @@
 import os
-from telegram_notifier import TelegramNotifier
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+from src.notifications.telegram_notifier import TelegramNotifier  # noqa: E402
 
 # Set environment variables for testing
 os.environ['TELEGRAM_BOT_TOKEN'] = '7743586944:AAHLoX4pWPMd_lsN55TBuS22u0vW-c3uofE'
@@ -19,21 +23,15 @@ if __name__ == "__main__":
     
     # Test sending a simple message
     print("Sending test message...")
-    response = notifier.send_message("Olá! Este é um teste do sistema de notificações do bot de arbitragem.")
-    if response and response.get('ok'):
-        print("Test message sent successfully!")
-    else:
-        print("Failed to send test message.")
-        if response:
-            print(f"Response: {response}")
+    notifier.send_message("Olá! Este é um teste do sistema de notificações do bot de arbitragem.")
 
     # Test sending a formatted opportunity
     print("\nSending formatted opportunity...")
-    response = notifier.send_arbitrage_opportunity(test_opportunity)
-    if response and response.get('ok'):
-        print("Formatted opportunity sent successfully!")
-    else:
-        print("Failed to send formatted opportunity.")
-        if response:
-            print(f"Response: {response}")
+    notifier.send_arbitrage_opportunity(test_opportunity)
 
+    # Envio acontece na thread de fundo: espera a fila esvaziar
+    notifier.close()
+    if notifier.stats["sent"] == 2:
+        print("Messages sent successfully!")
+    else:
+        print(f"Failed to send messages: {notifier.stats}")
@@ -0,0 +1,108 @@
+"""
+Motor de preços assíncrono
+
+Executa o plano de snapshot (pool_reader.plan_snapshot) num event loop
+próprio sobre um provider web3 assíncrono. Todas as chamadas de uma rodada
+saem concorrentemente, limitadas por um token bucket (o do ProviderPool,
+compartilhado com o resto do bot, quando houver); com Multicall3 os lotes
+de aggregate3 também são enviados em paralelo.
+
+O loop roda numa thread dedicada para que o PriceMonitor continue síncrono:
+run_sync() submete uma corrotina e espera o resultado.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Iterable, List, Optional
+
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+from src.cache.token_metadata import TokenMetadataCache
+from src.chain.block_watcher import BlockWatcher, Head
+from src.pricing.pool_reader import CallResults, PoolSpec, SnapshotPlan, plan_snapshot
+from src.pricing.price_table import PriceTable
+from src.rpc.multicall import Call, checksum_address, decode_aggregate3, decode_result, encode_aggregate3
+from src.rpc.provider_pool import AsyncFailoverHTTPProvider, ProviderPool
+from src.rpc.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPriceEngine:
+    def __init__(self, rpc_url: str, metadata_cache: TokenMetadataCache, chain_id: int,
+                 rate: float = 10.0, burst: float = 20.0, multicall_address: Optional[str] = None,
+                 multicall_batch_size: int = 500, ws_url: Optional[str] = None,
+                 block_poll_interval: float = 1.0, provider_pool: Optional[ProviderPool] = None):
+        # Com um ProviderPool, as chamadas usam failover/hedge entre os endpoints dele
+        provider = AsyncFailoverHTTPProvider(provider_pool) if provider_pool else AsyncHTTPProvider(rpc_url)
+        self.w3 = AsyncWeb3(provider)
+        self.block_watcher = BlockWatcher(self.w3, ws_url, block_poll_interval)
+        self.metadata_cache = metadata_cache
+        self.chain_id = chain_id
+        # O bucket do pool já limita no transporte; debitar aqui de novo contaria em dobro
+        self.bucket = None if provider_pool and provider_pool.limiter else TokenBucket(rate, burst)
+        self.multicall_address = AsyncWeb3.to_checksum_address(multicall_address) if multicall_address else None
+        self.multicall_batch_size = multicall_batch_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # --- Event loop em background ---
+
+    def start(self) -> None:
+        if self._loop is not None:
+            return
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="price-engine", daemon=True).start()
+
+    def run_sync(self, coro, timeout: Optional[float] = None):
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def snapshot_sync(self, pools: Iterable[PoolSpec], block_identifier="latest",
+                      timeout: Optional[float] = None) -> PriceTable:
+        return self.run_sync(self.snapshot(pools, block_identifier), timeout)
+
+    def next_head_sync(self, after: Optional[Head] = None, timeout: Optional[float] = None) -> Head:
+        return self.run_sync(self.block_watcher.next_head(after), timeout)
+
+    # --- Snapshot ---
+
+    async def snapshot(self, pools: Iterable[PoolSpec], block_identifier="latest") -> PriceTable:
+        block = block_identifier if isinstance(block_identifier, int) else None
+        return await self._run_plan(plan_snapshot(pools, self.metadata_cache, self.chain_id, block), block_identifier)
+
+    async def _run_plan(self, plan: SnapshotPlan, block_identifier) -> PriceTable:
+        try:
+            calls = next(plan)
+            while True:
+                calls = plan.send(await self.call_many(calls, block_identifier))
+        except StopIteration as stop:
+            return stop.value
+
+    async def call_many(self, calls: List[Call], block_identifier="latest") -> CallResults:
+        if self.multicall_address is not None:
+            batches = [calls[i:i + self.multicall_batch_size] for i in range(0, len(calls), self.multicall_batch_size)]
+            results = await asyncio.gather(*(self._aggregate3(batch, block_identifier) for batch in batches))
+            return [result for batch in results for result in batch]
+        return list(await asyncio.gather(*(self._call(call, block_identifier) for call in calls)))
+
+    async def _acquire(self) -> None:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+
+    async def _aggregate3(self, calls: List[Call], block_identifier) -> CallResults:
+        await self._acquire()
+        raw = await self.w3.eth.call({"to": self.multicall_address, "data": encode_aggregate3(calls)}, block_identifier)
+        return decode_aggregate3(calls, raw)
+
+    async def _call(self, call: Call, block_identifier) -> Optional[tuple]:
+        # Falha de um pool não derruba a rodada: o resultado dele vira None
+        await self._acquire()
+        try:
+            raw = await self.w3.eth.call(
+                {"to": checksum_address(call.target), "data": call.calldata}, block_identifier
+            )
+        except Exception as e:
+            logger.warning(f"Erro em eth_call para {call.target}: {e}")
+            return None
+        return decode_result(call, True, bytes(raw))
@@ -0,0 +1,142 @@
+"""
+Snapshot de pools em lote
+
+plan_snapshot() descreve, para todos os pools do ciclo, as chamadas
+slot0/getReserves, token0, token1 e decimals necessárias e decodifica os
+resultados de volta para a PriceTable. Metadados já presentes no
+TokenMetadataCache não geram chamadas, então depois do primeiro ciclo sobra
+uma única rodada com o estado dos pools.
+
+O plano é um gerador que produz listas de chamadas e recebe os resultados,
+para que o mesmo código sirva ao leitor síncrono via Multicall3 e ao motor
+assíncrono.
+"""
+
+import logging
+from typing import Callable, Dict, Generator, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.cache.token_metadata import TokenMetadataCache
+from src.pricing.price_table import PriceTable
+from src.rpc.multicall import Call, Multicall, function_selector
+
+logger = logging.getLogger(__name__)
+
+UNISWAP_V3 = "uniswap_v3"
+SOLIDLY = "solidly"
+
+SLOT0 = function_selector("slot0()")
+GET_RESERVES = function_selector("getReserves()")
+TOKEN0 = function_selector("token0()")
+TOKEN1 = function_selector("token1()")
+DECIMALS = function_selector("decimals()")
+
+CallResults = List[Optional[tuple]]
+SnapshotPlan = Generator[List[Call], CallResults, PriceTable]
+
+
+class PoolSpec(NamedTuple):
+    dex: str
+    address: str
+    kind: str
+
+
+def v3_price(sqrt_price_x96: int, token0_decimals: int, token1_decimals: int) -> float:
+    # Preço de 1 token0 em token1
+    return (sqrt_price_x96 / 2**96)**2 * 10**(token0_decimals - token1_decimals)
+
+
+def reserves_price(reserve0: int, reserve1: int, token0_decimals: int, token1_decimals: int) -> Optional[float]:
+    if reserve0 == 0:
+        return None
+    return (reserve1 / 10**token1_decimals) / (reserve0 / 10**token0_decimals)
+
+
+def state_call(pool: PoolSpec) -> Optional[Call]:
+    if pool.kind == UNISWAP_V3:
+        return Call(pool.address, SLOT0, ("uint160", "int24"))
+    if pool.kind == SOLIDLY:
+        return Call(pool.address, GET_RESERVES, ("uint256", "uint256"))
+    return None
+
+
+def price_from_state(pool: PoolSpec, state: tuple, token0_decimals: int, token1_decimals: int) -> Optional[float]:
+    if pool.kind == UNISWAP_V3:
+        return v3_price(state[0], token0_decimals, token1_decimals)
+    return reserves_price(state[0], state[1], token0_decimals, token1_decimals)
+
+
+def plan_snapshot(pools: Iterable[PoolSpec], metadata_cache: TokenMetadataCache, chain_id: int,
+                  block: Optional[int] = None) -> SnapshotPlan:
+    pools = list(pools)
+
+    # 1. token0/token1 dos pools que ainda não estão no cache
+    pending = []
+    for pool in pools:
+        for field, selector in (("token0", TOKEN0), ("token1", TOKEN1)):
+            if metadata_cache.lookup(chain_id, pool.address, field) is None:
+                pending.append((pool.address, field, Call(pool.address, selector, ("address",))))
+    if pending:
+        results = yield [call for _, _, call in pending]
+        for (address, field, _), result in zip(pending, results):
+            if result is not None:
+                metadata_cache.set(chain_id, address, field, result[0])
+
+    pool_tokens: Dict[str, Tuple[str, str]] = {}
+    for pool in pools:
+        token0 = metadata_cache.get(chain_id, pool.address, "token0")
+        token1 = metadata_cache.get(chain_id, pool.address, "token1")
+        if token0 is not None and token1 is not None:
+            pool_tokens[pool.address] = (token0, token1)
+
+    # 2. decimals dos tokens envolvidos
+    decimals: Dict[str, int] = {}
+    pending = []
+    for token in {token for tokens in pool_tokens.values() for token in tokens}:
+        value = metadata_cache.lookup(chain_id, token, "decimals")
+        if value is None:
+            pending.append((token, Call(token, DECIMALS, ("uint8",))))
+        else:
+            decimals[token] = value
+    if pending:
+        results = yield [call for _, call in pending]
+        for (token, _), result in zip(pending, results):
+            if result is not None:
+                decimals[token] = result[0]
+                metadata_cache.set(chain_id, token, "decimals", result[0])
+
+    # 3. estado dos pools (slot0 / getReserves)
+    priced = [(pool, state_call(pool)) for pool in pools if pool.address in pool_tokens]
+    priced = [(pool, call) for pool, call in priced if call is not None]
+    states = (yield [call for _, call in priced]) if priced else []
+
+    table = PriceTable(block)
+    for (pool, _), state in zip(priced, states):
+        token0, token1 = pool_tokens[pool.address]
+        token0_decimals, token1_decimals = decimals.get(token0), decimals.get(token1)
+        if state is None or token0_decimals is None or token1_decimals is None:
+            logger.warning(f"Pool {pool.dex} {pool.address} sem estado válido neste ciclo")
+            continue
+        table.add_pool(pool.dex, token0, token1, price_from_state(pool, state, token0_decimals, token1_decimals))
+    return table
+
+
+def run_plan(plan: SnapshotPlan, call_many: Callable[[List[Call]], CallResults]) -> PriceTable:
+    try:
+        calls = next(plan)
+        while True:
+            calls = plan.send(call_many(calls))
+    except StopIteration as stop:
+        return stop.value
+
+
+class MulticallPoolReader:
+    # multicall: qualquer objeto com call_many (Multicall ou JsonRpcBatch)
+    def __init__(self, multicall: Multicall, metadata_cache: TokenMetadataCache, chain_id: int):
+        self.multicall = multicall
+        self.metadata_cache = metadata_cache
+        self.chain_id = chain_id
+
+    def snapshot(self, pools: Iterable[PoolSpec], block_identifier="latest") -> PriceTable:
+        block = block_identifier if isinstance(block_identifier, int) else None
+        plan = plan_snapshot(pools, self.metadata_cache, self.chain_id, block)
+        return run_plan(plan, lambda calls: self.multicall.call_many(calls, block_identifier))
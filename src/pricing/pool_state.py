@@ -0,0 +1,265 @@
+"""
+Estado incremental de pools a partir de logs
+
+Cada pool é lido uma vez (bootstrap: slot0 + liquidity ou getReserves) e
+depois atualizado só pelos eventos emitidos on-chain:
+
+- Uniswap V3 / SushiSwap V3: Swap (sqrtPriceX96, liquidity, tick) e
+  Mint/Burn dentro do range ativo (liquidity)
+- Aerodrome / Solidly / V2: Sync (reserve0, reserve1)
+
+O custo de RPC por ciclo passa a ser um eth_getLogs proporcional à atividade,
+não ao número de pools. O estado fica em colunas (PoolStore) e os preços de
+todos os pools saem numa operação vetorizada. Cada bloco aplicado guarda os
+estados anteriores dos pools alterados (undo log); se o hash de um
+checkpoint deixa de ser canônico (reorg), os blocos posteriores são
+desfeitos.
+"""
+
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.cache.token_metadata import TokenMetadataCache
+from src.pricing.pool_reader import (
+    GET_RESERVES, SLOT0, SOLIDLY, UNISWAP_V3, CallResults, PoolSpec
+)
+from src.pricing.pool_store import PoolStore
+from src.pricing.price_table import PriceTable
+from src.rpc.multicall import Call, function_selector
+
+logger = logging.getLogger(__name__)
+
+LIQUIDITY = function_selector("liquidity()")
+
+V3_SWAP_TOPIC = Web3.keccak(text="Swap(address,address,int256,int256,uint160,uint128,int24)")
+V3_MINT_TOPIC = Web3.keccak(text="Mint(address,address,int24,int24,uint128,uint256,uint256)")
+V3_BURN_TOPIC = Web3.keccak(text="Burn(address,int24,int24,uint128,uint256,uint256)")
+SOLIDLY_SYNC_TOPIC = Web3.keccak(text="Sync(uint256,uint256)")
+V2_SYNC_TOPIC = Web3.keccak(text="Sync(uint112,uint112)")
+
+TOPICS = [V3_SWAP_TOPIC, V3_MINT_TOPIC, V3_BURN_TOPIC, SOLIDLY_SYNC_TOPIC, V2_SYNC_TOPIC]
+
+
+class PoolState(NamedTuple):
+    sqrt_price_x96: int = 0
+    tick: int = 0
+    liquidity: int = 0
+    reserve0: int = 0
+    reserve1: int = 0
+    block: int = 0
+
+
+def _word(data: bytes, index: int) -> int:
+    return int.from_bytes(data[32 * index:32 * (index + 1)], "big")
+
+
+def _signed_word(data: bytes, index: int) -> int:
+    return int.from_bytes(data[32 * index:32 * (index + 1)], "big", signed=True)
+
+
+def _signed_topic(topic) -> int:
+    return int.from_bytes(bytes(HexBytes(topic)), "big", signed=True)
+
+
+class PoolStateEngine:
+    def __init__(self, pools: Iterable[PoolSpec], max_reorg_depth: int = 64, max_log_range: int = 2000):
+        self.store = PoolStore()
+        for pool in pools:
+            self.store.add(pool)
+        self.block: Optional[int] = None
+        self.max_log_range = max_log_range
+        self.logs_applied = 0
+        self.reorgs = 0
+        # (número, hash) de cada bloco sincronizado e estados anteriores (por id do pool) por bloco
+        self._checkpoints: Deque[Tuple[int, bytes]] = deque(maxlen=max_reorg_depth)
+        self._undo: Dict[int, Dict[int, PoolState]] = {}
+
+    @property
+    def bootstrapped(self) -> bool:
+        return self.block is not None
+
+    def state(self, index: int) -> Optional[PoolState]:
+        """Estado exato de um pool (ints Python), para o undo log e para o quoter"""
+        if not self.store.has_state(index):
+            return None
+        pool = self.store[index]
+        return PoolState(pool.sqrt_price_x96, pool.tick, pool.liquidity, pool.reserve0, pool.reserve1, pool.block)
+
+    def _put(self, index: int, state: Optional[PoolState]) -> None:
+        if state is None:
+            self.store.clear_state(index)
+            return
+        self.store.set_v3(index, state.sqrt_price_x96, state.tick, state.liquidity, state.block)
+        self.store.set_reserves(index, state.reserve0, state.reserve1, state.block)
+
+    # --- Bootstrap ---
+
+    def bootstrap(self, call_many: Callable[[List[Call], object], CallResults], block: int,
+                  block_hash: Optional[bytes] = None) -> None:
+        """Lê o estado completo de todos os pools no bloco `block`"""
+        calls: List[Tuple[int, str, Call]] = []
+        for pool in self.store:
+            if pool.kind == UNISWAP_V3:
+                calls.append((pool.index, "slot0", Call(pool.address, SLOT0, ("uint160", "int24"))))
+                calls.append((pool.index, "liquidity", Call(pool.address, LIQUIDITY, ("uint128",))))
+            elif pool.kind == SOLIDLY:
+                calls.append((pool.index, "reserves", Call(pool.address, GET_RESERVES, ("uint256", "uint256"))))
+
+        results = call_many([call for _, _, call in calls], block)
+
+        states: Dict[int, PoolState] = {}
+        for (index, field, _), result in zip(calls, results):
+            if result is None:
+                continue
+            state = states.get(index, PoolState(block=block))
+            if field == "slot0":
+                state = state._replace(sqrt_price_x96=result[0], tick=result[1])
+            elif field == "liquidity":
+                state = state._replace(liquidity=result[0])
+            else:
+                state = state._replace(reserve0=result[0], reserve1=result[1])
+            states[index] = state
+
+        self.store.clear_state()
+        for index, state in states.items():
+            self._put(index, state)
+        self.block = block
+        self._undo.clear()
+        self._checkpoints.clear()
+        if block_hash is not None:
+            self._checkpoints.append((block, bytes(HexBytes(block_hash))))
+        logger.info(f"Estado de {len(states)}/{len(self.store)} pools inicializado no bloco {block}")
+
+    # --- Logs ---
+
+    def apply_log(self, log) -> bool:
+        index = self.store.index(log["address"])
+        if index is None or not log["topics"]:
+            return False
+        state = self.state(index)
+        if state is None:
+            return False
+
+        topic = bytes(HexBytes(log["topics"][0]))
+        data = bytes(HexBytes(log["data"]))
+        block = log["blockNumber"]
+
+        if topic == V3_SWAP_TOPIC:
+            # data: amount0, amount1, sqrtPriceX96, liquidity, tick
+            new_state = state._replace(
+                sqrt_price_x96=_word(data, 2), liquidity=_word(data, 3), tick=_signed_word(data, 4), block=block
+            )
+        elif topic in (V3_MINT_TOPIC, V3_BURN_TOPIC):
+            # topics: evento, owner, tickLower, tickUpper; liquidity só muda se o range contém o tick atual
+            tick_lower, tick_upper = _signed_topic(log["topics"][2]), _signed_topic(log["topics"][3])
+            if not tick_lower <= state.tick < tick_upper:
+                return False
+            amount = _word(data, 1 if topic == V3_MINT_TOPIC else 0)
+            delta = amount if topic == V3_MINT_TOPIC else -amount
+            # Nunca negativa: um Burn fora de ordem não pode quebrar a coluna uint128
+            new_state = state._replace(liquidity=max(0, state.liquidity + delta), block=block)
+        elif topic in (SOLIDLY_SYNC_TOPIC, V2_SYNC_TOPIC):
+            new_state = state._replace(reserve0=_word(data, 0), reserve1=_word(data, 1), block=block)
+        else:
+            return False
+
+        # Guarda o estado anterior só na primeira alteração do pool neste bloco
+        self._undo.setdefault(block, {}).setdefault(index, state)
+        self._put(index, new_state)
+        self.logs_applied += 1
+        return True
+
+    def apply_logs(self, logs: Iterable) -> int:
+        ordered = sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+        return sum(1 for log in ordered if not log.get("removed") and self.apply_log(log))
+
+    # --- Sincronização e reorgs ---
+
+    def sync(self, w3: Web3, to_block="latest") -> int:
+        """Aplica os logs entre o último bloco sincronizado e `to_block`; devolve quantos foram aplicados"""
+        if not self.bootstrapped:
+            raise RuntimeError("PoolStateEngine precisa de bootstrap antes de sync")
+
+        self._check_reorg(w3)
+        if not self.bootstrapped:
+            return 0
+
+        head = w3.eth.get_block(to_block)
+        if head["number"] <= self.block:
+            return 0
+
+        addresses = [pool.address for pool in self.store]
+        topics = [[Web3.to_hex(topic) for topic in TOPICS]]
+        applied = 0
+        from_block = self.block + 1
+        while from_block <= head["number"]:
+            chunk_end = min(head["number"], from_block + self.max_log_range - 1)
+            logs = w3.eth.get_logs({
+                "fromBlock": from_block, "toBlock": chunk_end, "address": addresses, "topics": topics
+            })
+            applied += self.apply_logs(logs)
+            from_block = chunk_end + 1
+
+        self.block = head["number"]
+        self._checkpoints.append((head["number"], bytes(HexBytes(head["hash"]))))
+        self._prune_undo()
+        return applied
+
+    def _check_reorg(self, w3: Web3) -> None:
+        rolled_back = False
+        while self._checkpoints:
+            number, block_hash = self._checkpoints[-1]
+            if bytes(HexBytes(w3.eth.get_block(number)["hash"])) == block_hash:
+                break
+            self._checkpoints.pop()
+            rolled_back = True
+
+        if not rolled_back:
+            return
+
+        self.reorgs += 1
+        if not self._checkpoints:
+            # Reorg mais profundo que os checkpoints guardados: refazer o bootstrap
+            logger.warning("Reorg além dos checkpoints disponíveis, estado dos pools será reinicializado")
+            self.block = None
+            self.store.clear_state()
+            self._undo.clear()
+            return
+
+        target = self._checkpoints[-1][0]
+        logger.warning(f"Reorg detectado: revertendo estado dos pools de {self.block} para {target}")
+        self.rollback(target)
+
+    def rollback(self, block: int) -> None:
+        for number in sorted((n for n in self._undo if n > block), reverse=True):
+            for index, previous in self._undo.pop(number).items():
+                self._put(index, previous)
+        self.block = block
+
+    def _prune_undo(self) -> None:
+        if not self._checkpoints:
+            return
+        oldest = self._checkpoints[0][0]
+        for number in [n for n in self._undo if n <= oldest]:
+            del self._undo[number]
+
+    # --- Preços ---
+
+    def price_table(self, metadata_cache: TokenMetadataCache, chain_id: int) -> PriceTable:
+        # Tokens e decimais entram na store uma vez, quando o cache passa a conhecê-los
+        for index in self.store.without_tokens():
+            pool = self.store[index]
+            token0 = metadata_cache.get(chain_id, pool.address, "token0")
+            token1 = metadata_cache.get(chain_id, pool.address, "token1")
+            if token0 is None or token1 is None:
+                continue
+            token0_decimals = metadata_cache.get(chain_id, token0, "decimals")
+            token1_decimals = metadata_cache.get(chain_id, token1, "decimals")
+            if token0_decimals is None or token1_decimals is None:
+                continue
+            self.store.set_tokens(index, token0, token1, token0_decimals, token1_decimals)
+        return self.store.price_table(self.block)
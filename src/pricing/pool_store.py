@@ -0,0 +1,308 @@
+"""
+Estado de pools em colunas (struct-of-arrays)
+
+Para 10k+ pools, um dict endereço -> tupla de ints Python custa centenas de
+bytes por pool e cada passada desempacota objeto por objeto. Aqui cada campo
+é um array NumPy indexado pelo id do pool:
+
+- endereços viram chaves de 20 bytes internadas em ids densos
+  (AddressInterner); o id do pool é a própria linha das colunas
+- sqrtPriceX96 (uint160), liquidity (uint128) e reserves (até uint256) ficam
+  exatos em limbs uint64 little-endian (lidos e gravados como bytes por um
+  memoryview) e viram float64 de uma vez para os preços
+- fee uint32, decimais uint8, tick int32, tipo e DEX uint8/uint16
+
+PoolView dá acesso por pool (__slots__, sem cópia) para quem precisa dos
+inteiros exatos, como o quoter e o undo log do PoolStateEngine.
+"""
+
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+
+from src.pricing.pool_reader import SOLIDLY, UNISWAP_V3, PoolSpec
+from src.pricing.price_table import PriceTable
+
+KINDS = [UNISWAP_V3, SOLIDLY]
+
+# Colunas de inteiros grandes: nome -> limbs de 64 bits
+WIDE_COLUMNS = {
+    "sqrt_price": 3,    # uint160
+    "liquidity": 2,     # uint128
+    "reserve0": 4,      # uint256
+    "reserve1": 4,
+}
+
+Address = Union[str, bytes]
+
+
+def limbs_to_float(column: np.ndarray) -> np.ndarray:
+    result = np.zeros(len(column), dtype=np.float64)
+    for i in range(column.shape[1] - 1, -1, -1):
+        result = result * 2.0**64 + column[:, i]
+    return result
+
+
+class AddressInterner:
+    """Endereço (chave de 20 bytes) -> id inteiro denso, na ordem de chegada"""
+
+    __slots__ = ("_ids", "_keys")
+
+    def __init__(self):
+        self._ids: Dict[bytes, int] = {}
+        self._keys: List[bytes] = []
+
+    @staticmethod
+    def key(address: Address) -> bytes:
+        if isinstance(address, (bytes, bytearray)):
+            key = bytes(address)
+        else:
+            key = bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+        if len(key) != 20:
+            raise ValueError(f"Endereço inválido: {address!r}")
+        return key
+
+    def intern(self, address: Address) -> int:
+        key = self.key(address)
+        address_id = self._ids.get(key)
+        if address_id is None:
+            address_id = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+        return address_id
+
+    def get(self, address: Address) -> Optional[int]:
+        return self._ids.get(self.key(address))
+
+    def address(self, address_id: int) -> str:
+        return "0x" + self._keys[address_id].hex()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class PoolView:
+    """Um pool da store: lê as colunas na hora, sem copiar o estado"""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: "PoolStore", index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def address(self) -> str:
+        return self.store.pools.address(self.index)
+
+    @property
+    def dex(self) -> str:
+        return self.store.dexes[self.store.dex[self.index]]
+
+    @property
+    def kind(self) -> str:
+        return KINDS[self.store.kind[self.index]]
+
+    @property
+    def token0(self) -> Optional[str]:
+        token_id = int(self.store.token0[self.index])
+        return None if token_id < 0 else self.store.tokens.address(token_id)
+
+    @property
+    def token1(self) -> Optional[str]:
+        token_id = int(self.store.token1[self.index])
+        return None if token_id < 0 else self.store.tokens.address(token_id)
+
+    @property
+    def decimals0(self) -> int:
+        return int(self.store.decimals0[self.index])
+
+    @property
+    def decimals1(self) -> int:
+        return int(self.store.decimals1[self.index])
+
+    @property
+    def fee(self) -> int:
+        return int(self.store.fee[self.index])
+
+    @property
+    def sqrt_price_x96(self) -> int:
+        return self.store.get_int("sqrt_price", self.index)
+
+    @property
+    def tick(self) -> int:
+        return int(self.store.tick[self.index])
+
+    @property
+    def liquidity(self) -> int:
+        return self.store.get_int("liquidity", self.index)
+
+    @property
+    def reserve0(self) -> int:
+        return self.store.get_int("reserve0", self.index)
+
+    @property
+    def reserve1(self) -> int:
+        return self.store.get_int("reserve1", self.index)
+
+    @property
+    def block(self) -> Optional[int]:
+        block = int(self.store.block[self.index])
+        return None if block < 0 else block
+
+    def spec(self) -> PoolSpec:
+        return PoolSpec(self.dex, self.address, self.kind)
+
+    def __repr__(self) -> str:
+        return f"PoolView({self.dex}, {self.address}, block={self.block})"
+
+
+class PoolStore:
+    def __init__(self, capacity: int = 1024):
+        self.pools = AddressInterner()     # id do pool = linha nas colunas
+        self.tokens = AddressInterner()
+        self.dexes: List[str] = []
+        self._dex_ids: Dict[str, int] = {}
+        self._bytes: Dict[str, memoryview] = {}
+        self.capacity = 0
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        # Cresce dobrando; as linhas novas nascem sem tokens (-1) e sem estado (bloco -1)
+        size = len(self)
+
+        def grow(name: str, dtype, width: int = 0, fill=0) -> None:
+            column = np.full((capacity, width) if width else capacity, fill, dtype=dtype)
+            if self.capacity:
+                column[:size] = getattr(self, name)[:size]
+            setattr(self, name, column)
+
+        grow("dex", np.uint16)
+        grow("kind", np.uint8)
+        grow("fee", np.uint32)
+        grow("token0", np.int32, fill=-1)
+        grow("token1", np.int32, fill=-1)
+        grow("decimals0", np.uint8)
+        grow("decimals1", np.uint8)
+        grow("tick", np.int32)
+        grow("block", np.int64, fill=-1)
+        for name, limbs in WIDE_COLUMNS.items():
+            grow(name, np.dtype("<u8"), limbs)
+            self._bytes[name] = memoryview(getattr(self, name)).cast("B")
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+    @property
+    def nbytes(self) -> int:
+        columns = (
+            self.dex, self.kind, self.fee, self.token0, self.token1, self.decimals0, self.decimals1,
+            self.sqrt_price, self.tick, self.liquidity, self.reserve0, self.reserve1, self.block
+        )
+        return sum(column.nbytes for column in columns)
+
+    # --- Pools e metadados ---
+
+    def add(self, spec: PoolSpec, fee: int = 0) -> int:
+        index = self.pools.get(spec.address)
+        if index is not None:
+            return index
+        if len(self) == self.capacity:
+            self._allocate(2 * self.capacity)
+        index = self.pools.intern(spec.address)
+        dex_id = self._dex_ids.get(spec.dex)
+        if dex_id is None:
+            dex_id = self._dex_ids[spec.dex] = len(self.dexes)
+            self.dexes.append(spec.dex)
+        self.dex[index] = dex_id
+        self.kind[index] = KINDS.index(spec.kind)
+        self.fee[index] = fee
+        return index
+
+    def index(self, address: Address) -> Optional[int]:
+        return self.pools.get(address)
+
+    def set_tokens(self, index: int, token0: Address, token1: Address, decimals0: int, decimals1: int) -> None:
+        self.token0[index] = self.tokens.intern(token0)
+        self.token1[index] = self.tokens.intern(token1)
+        self.decimals0[index] = decimals0
+        self.decimals1[index] = decimals1
+
+    def has_tokens(self, index: int) -> bool:
+        return self.token0[index] >= 0 and self.token1[index] >= 0
+
+    def without_tokens(self) -> List[int]:
+        size = len(self)
+        return np.flatnonzero((self.token0[:size] < 0) | (self.token1[:size] < 0)).tolist()
+
+    # --- Estado ---
+
+    def get_int(self, name: str, index: int) -> int:
+        width = 8 * WIDE_COLUMNS[name]
+        return int.from_bytes(self._bytes[name][index * width:(index + 1) * width], "little")
+
+    def set_int(self, name: str, index: int, value: int) -> None:
+        # to_bytes recusa (OverflowError) valor negativo ou maior que a coluna
+        width = 8 * WIDE_COLUMNS[name]
+        self._bytes[name][index * width:(index + 1) * width] = value.to_bytes(width, "little")
+
+    def set_v3(self, index: int, sqrt_price_x96: int, tick: int, liquidity: int, block: int) -> None:
+        self.set_int("sqrt_price", index, sqrt_price_x96)
+        self.tick[index] = tick
+        self.set_int("liquidity", index, liquidity)
+        self.block[index] = block
+
+    def set_reserves(self, index: int, reserve0: int, reserve1: int, block: int) -> None:
+        self.set_int("reserve0", index, reserve0)
+        self.set_int("reserve1", index, reserve1)
+        self.block[index] = block
+
+    def has_state(self, index: int) -> bool:
+        return self.block[index] >= 0
+
+    def clear_state(self, index: Optional[int] = None) -> None:
+        rows = slice(None) if index is None else index
+        for column in (self.sqrt_price, self.tick, self.liquidity, self.reserve0, self.reserve1):
+            column[rows] = 0
+        self.block[rows] = -1
+
+    # --- Acesso por pool ---
+
+    def __getitem__(self, index: int) -> PoolView:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return PoolView(self, index)
+
+    def __iter__(self) -> Iterator[PoolView]:
+        return (PoolView(self, index) for index in range(len(self)))
+
+    # --- Preços ---
+
+    def prices(self) -> np.ndarray:
+        """Preço de 1 token0 em token1 de cada pool, ajustado por decimais; NaN sem estado ou sem tokens"""
+        size = len(self)
+        scale = 10.0 ** (self.decimals0[:size].astype(np.int64) - self.decimals1[:size].astype(np.int64))
+        v3 = self.kind[:size] == KINDS.index(UNISWAP_V3)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sqrt_price = limbs_to_float(self.sqrt_price[:size]) / 2.0**96
+            reserve0 = limbs_to_float(self.reserve0[:size])
+            reserve1 = limbs_to_float(self.reserve1[:size])
+            prices = np.where(v3, sqrt_price * sqrt_price, reserve1 / reserve0) * scale
+
+        valid = (self.block[:size] >= 0) & (self.token0[:size] >= 0) & (self.token1[:size] >= 0)
+        valid &= np.where(v3, True, reserve0 > 0)
+        prices[~valid] = np.nan
+        return prices
+
+    def price_table(self, block: Optional[int] = None) -> PriceTable:
+        table = PriceTable(block)
+        prices = self.prices()
+        size = len(self)
+        token0, token1, dex = self.token0[:size].tolist(), self.token1[:size].tolist(), self.dex[:size].tolist()
+        prices_list = prices.tolist()
+        for index in np.flatnonzero(np.isfinite(prices)).tolist():
+            table.add_pool(
+                self.dexes[dex[index]], self.tokens.address(token0[index]), self.tokens.address(token1[index]),
+                prices_list[index]
+            )
+        return table
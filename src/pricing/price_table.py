@@ -0,0 +1,71 @@
+"""
+Tabela de preços por ciclo
+
+Cada pool é lido uma única vez por ciclo (snapshot) e guardado aqui nos dois
+sentidos. A comparação entre DEXs é uma função pura sobre a tabela, sem
+nenhuma chamada RPC, e pode ser medida offline.
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Opportunity(NamedTuple):
+    token_in: str
+    token_out: str
+    dex_buy: str
+    dex_sell: str
+    price_buy: float
+    price_sell: float
+    profit: float                          # spread usado no threshold (líquido de fees, se conhecidas)
+    gross_profit: Optional[float] = None   # spread bruto, sem fees
+
+
+class PriceTable:
+    """Preços de um ciclo indexados por par (token_in, token_out) -> {dex: preço}"""
+
+    __slots__ = ("block", "_prices")
+
+    def __init__(self, block: Optional[int] = None):
+        self.block = block
+        self._prices: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def add_pool(self, dex_name: str, token0: str, token1: str, price: float) -> None:
+        # price = quantidade de token1 por 1 token0, já ajustada por decimais
+        if not price or price <= 0:
+            return
+        token0, token1 = token0.lower(), token1.lower()
+        self._prices.setdefault((token0, token1), {})[dex_name] = price
+        self._prices.setdefault((token1, token0), {})[dex_name] = 1 / price
+
+    def get(self, dex_name: str, token_in: str, token_out: str) -> Optional[float]:
+        return self._prices.get((token_in.lower(), token_out.lower()), {}).get(dex_name)
+
+    def mid_price(self, token_in: str, token_out: str) -> Optional[float]:
+        """Mediana entre as DEXs: referência para converter valores entre tokens"""
+        quotes = sorted(self._prices.get((token_in.lower(), token_out.lower()), {}).values())
+        return quotes[len(quotes) // 2] if quotes else None
+
+    def pairs(self) -> Iterator[Tuple[Tuple[str, str], Dict[str, float]]]:
+        return iter(self._prices.items())
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+
+def find_arbitrage_opportunities(table: PriceTable, min_profit: float) -> List[Opportunity]:
+    """Compara em memória todas as DEXs de cada par e devolve as oportunidades acima do threshold"""
+    opportunities = []
+    for (token_in, token_out), quotes in table.pairs():
+        if len(quotes) < 2:
+            continue
+        for dex_buy, price_buy in quotes.items():
+            for dex_sell, price_sell in quotes.items():
+                if dex_buy == dex_sell:
+                    continue
+                profit = (price_sell / price_buy) - 1
+                if profit > min_profit:
+                    opportunities.append(Opportunity(
+                        token_in, token_out, dex_buy, dex_sell, price_buy, price_sell, profit, profit
+                    ))
+    opportunities.sort(key=lambda o: o.profit, reverse=True)
+    return opportunities
@@ -0,0 +1,502 @@
+"""
+Cotação exata em inteiros, espelhando a matemática on-chain
+
+- Solidly/Aerodrome volátil (produto constante com fee em bps)
+- Solidly/Aerodrome estável (curva x³y + y³x com Newton em inteiros, na
+  forma e com o arredondamento do Pool do Aerodrome)
+- Uniswap V3 / SushiSwap V3: swap exact-input com cruzamento de ticks,
+  usando tick bitmap e liquidityNet em cache (TickMath, SqrtPriceMath e
+  SwapMath portados do core do V3)
+- MockDEX dos testes Hardhat (preço fixo * amountIn / 1e18)
+
+Dado um tamanho de entrada, devolve a saída exata sem eth_call. Inteiros do
+Python têm precisão arbitrária, então mulDiv de 512 bits é só a*b//c.
+scripts/validate_quoter.py compara as cotações com o MockDEX num nó local e
+com quoteExactInputSingle / getAmountOut num bloco fixo.
+"""
+
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.rpc.multicall import Call, function_selector
+
+Q96 = 1 << 96
+MAX_UINT256 = (1 << 256) - 1
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+FEE_DENOMINATOR_V3 = 1_000_000
+FEE_DENOMINATOR_SOLIDLY = 10_000
+
+_LOG_TICK_BASE = math.log(1.0001)
+
+
+# --- Helpers de aritmética (FullMath / UnsafeMath) ---
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    return -(-a // b)
+
+
+# --- MockDEX ---
+
+def mock_dex_amount_out(amount_in: int, price: int) -> int:
+    # MockDEX.getAmountsOut: (amountIn * prices[tokenIn][tokenOut]) / 1e18
+    return amount_in * price // 10**18
+
+
+# --- Solidly / Aerodrome ---
+
+def solidly_volatile_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_bps: int = 30) -> int:
+    amount_in -= amount_in * fee_bps // FEE_DENOMINATOR_SOLIDLY
+    if reserve_in + amount_in == 0:
+        return 0
+    return amount_in * reserve_out // (reserve_in + amount_in)
+
+
+# Curva estável do Pool do Aerodrome (x³y + y³x), com o mesmo arredondamento do contrato
+
+def _stable_f(x0: int, y: int) -> int:
+    a = x0 * y // 10**18
+    b = x0 * x0 // 10**18 + y * y // 10**18
+    return a * b // 10**18
+
+
+def _stable_d(x0: int, y: int) -> int:
+    return 3 * x0 * (y * y // 10**18) // 10**18 + (x0 * x0 // 10**18 * x0 // 10**18)
+
+
+def _stable_k(x: int, y: int, unit0: int, unit1: int) -> int:
+    # Pool._k: reescala x e y pelos decimais do pool antes de avaliar a curva
+    return _stable_f(x * 10**18 // unit0, y * 10**18 // unit1)
+
+
+def _stable_get_y(x0: int, xy: int, y: int, unit0: int, unit1: int) -> int:
+    for _ in range(255):
+        k = _stable_f(x0, y)
+        if k < xy:
+            dy = (xy - k) * 10**18 // _stable_d(x0, y)
+            if dy == 0:
+                if k == xy:
+                    return y
+                # Pool._get_y usa _k aqui, com a reescala pelos decimais do pool
+                if _stable_k(x0, y + 1, unit0, unit1) > xy:
+                    return y + 1
+                dy = 1
+            y += dy
+        else:
+            dy = (k - xy) * 10**18 // _stable_d(x0, y)
+            if dy == 0:
+                if k == xy or _stable_f(x0, y - 1) < xy:
+                    return y
+                dy = 1
+            y -= dy
+    raise ArithmeticError("!y")
+
+
+def solidly_stable_amount_out(amount_in: int, reserve_in: int, reserve_out: int,
+                              decimals_in: int, decimals_out: int, fee_bps: int = 5,
+                              zero_for_one: bool = True) -> int:
+    """Pool._getAmountOut estável; zero_for_one diz se o token de entrada é o token0 do pool"""
+    amount_in -= amount_in * fee_bps // FEE_DENOMINATOR_SOLIDLY
+    unit_in, unit_out = 10**decimals_in, 10**decimals_out
+    unit0, unit1 = (unit_in, unit_out) if zero_for_one else (unit_out, unit_in)
+    xy = _stable_k(reserve_in, reserve_out, unit_in, unit_out)
+    reserve_a = reserve_in * 10**18 // unit_in
+    reserve_b = reserve_out * 10**18 // unit_out
+    amount_in = amount_in * 10**18 // unit_in
+    y = reserve_b - _stable_get_y(amount_in + reserve_a, xy, reserve_b, unit0, unit1)
+    return y * unit_out // 10**18
+
+
+class SolidlyPoolState:
+    """Reservas e parâmetros de um pool Solidly/Aerodrome (metadata() do pool)"""
+
+    __slots__ = ("reserve0", "reserve1", "stable", "fee_bps", "decimals0", "decimals1")
+
+    def __init__(self, reserve0: int, reserve1: int, stable: bool, fee_bps: int, decimals0: int, decimals1: int):
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        self.stable = stable
+        self.fee_bps = fee_bps
+        self.decimals0 = decimals0
+        self.decimals1 = decimals1
+
+    def quote_exact_input(self, amount_in: int, zero_for_one: bool) -> int:
+        if amount_in <= 0:
+            return 0
+        reserve_in, reserve_out = (self.reserve0, self.reserve1) if zero_for_one else (self.reserve1, self.reserve0)
+        if not self.stable:
+            return solidly_volatile_amount_out(amount_in, reserve_in, reserve_out, self.fee_bps)
+        decimals_in, decimals_out = (
+            (self.decimals0, self.decimals1) if zero_for_one else (self.decimals1, self.decimals0)
+        )
+        return solidly_stable_amount_out(
+            amount_in, reserve_in, reserve_out, decimals_in, decimals_out, self.fee_bps, zero_for_one
+        )
+
+
+# --- Uniswap V3: TickMath ---
+
+_TICK_MULTIPLIERS = (
+    (0x2, 0xfff97272373d413259a46990580e213a),
+    (0x4, 0xfff2e50f5f656932ef12357cf3c7fdcc),
+    (0x8, 0xffe5caca7e10e4e61c3624eaa0941cd0),
+    (0x10, 0xffcb9843d60f6159c9db58835c926644),
+    (0x20, 0xff973b41fa98c081472e6896dfb254c0),
+    (0x40, 0xff2ea16466c96a3843ec78b326b52861),
+    (0x80, 0xfe5dee046a99a2a811c461f1969c3053),
+    (0x100, 0xfcbe86c7900a88aedcffc83b479aa3a4),
+    (0x200, 0xf987a7253ac413176f2b074cf7815e54),
+    (0x400, 0xf3392b0822b70005940c7a398e4b70f3),
+    (0x800, 0xe7159475a2c29b7443b29c7fa6e889d9),
+    (0x1000, 0xd097f3bdfd2022b8845ad8f792aa5825),
+    (0x2000, 0xa9f746462d870fdf8a65dc1f90e061e5),
+    (0x4000, 0x70d869a156d2a1b890bb3df62baf32f7),
+    (0x8000, 0x31be135f97d08fd981231505542fcfa6),
+    (0x10000, 0x9aa508b5b7a84e1c677de54f3e99bc9),
+    (0x20000, 0x5d6af8dedb81196699c329225ee604),
+    (0x40000, 0x2216e584f5fa1ea926041bedfe98),
+    (0x80000, 0x48a170391f7dc42444e8fa2),
+)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError("T")
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    for bit, multiplier in _TICK_MULTIPLIERS:
+        if abs_tick & bit:
+            ratio = (ratio * multiplier) >> 128
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Maior tick cujo sqrt ratio é <= sqrt_price_x96 (mesmo resultado do TickMath on-chain)"""
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError("R")
+    # Estimativa por log em float e ajuste exato com get_sqrt_ratio_at_tick
+    tick = math.floor(2 * math.log(sqrt_price_x96 / Q96) / _LOG_TICK_BASE)
+    tick = max(MIN_TICK, min(MAX_TICK, tick))
+    while tick > MIN_TICK and get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while tick < MAX_TICK and get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+# --- Uniswap V3: SqrtPriceMath ---
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+def _next_sqrt_price_from_amount0_rounding_up(sqrt_price: int, liquidity: int, amount: int) -> int:
+    if amount == 0:
+        return sqrt_price
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price
+    # Mesmo desvio do contrato quando amount * sqrtPrice estouraria uint256
+    if product <= MAX_UINT256:
+        denominator = numerator1 + product
+        if denominator <= MAX_UINT256:
+            return mul_div_rounding_up(numerator1, sqrt_price, denominator)
+    return div_rounding_up(numerator1, numerator1 // sqrt_price + amount)
+
+
+def _next_sqrt_price_from_amount1_rounding_down(sqrt_price: int, liquidity: int, amount: int) -> int:
+    return sqrt_price + (amount << 96) // liquidity
+
+
+def get_next_sqrt_price_from_input(sqrt_price: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount_in)
+    return _next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount_in)
+
+
+# --- Uniswap V3: SwapMath (exact input) ---
+
+def compute_swap_step(sqrt_current: int, sqrt_target: int, liquidity: int, amount_remaining: int,
+                      fee_pips: int) -> Tuple[int, int, int, int]:
+    zero_for_one = sqrt_current >= sqrt_target
+    amount_remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR_V3 - fee_pips, FEE_DENOMINATOR_V3)
+
+    if zero_for_one:
+        amount_in = get_amount0_delta(sqrt_target, sqrt_current, liquidity, True)
+    else:
+        amount_in = get_amount1_delta(sqrt_current, sqrt_target, liquidity, True)
+
+    if amount_remaining_less_fee >= amount_in:
+        sqrt_next = sqrt_target
+    else:
+        sqrt_next = get_next_sqrt_price_from_input(sqrt_current, liquidity, amount_remaining_less_fee, zero_for_one)
+
+    reached_target = sqrt_next == sqrt_target
+    if zero_for_one:
+        if not reached_target:
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not reached_target:
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if not reached_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, FEE_DENOMINATOR_V3 - fee_pips)
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+# --- Uniswap V3: TickBitmap ---
+
+def _most_significant_bit(x: int) -> int:
+    return x.bit_length() - 1
+
+
+def _least_significant_bit(x: int) -> int:
+    return (x & -x).bit_length() - 1
+
+
+def next_initialized_tick_within_one_word(bitmap: Dict[int, int], tick: int, tick_spacing: int,
+                                          lte: bool) -> Tuple[int, bool]:
+    compressed = tick // tick_spacing
+    if lte:
+        word_pos, bit_pos = compressed >> 8, compressed % 256
+        masked = bitmap.get(word_pos, 0) & ((1 << bit_pos) - 1 + (1 << bit_pos))
+        if masked:
+            return (compressed - (bit_pos - _most_significant_bit(masked))) * tick_spacing, True
+        return (compressed - bit_pos) * tick_spacing, False
+
+    compressed += 1
+    word_pos, bit_pos = compressed >> 8, compressed % 256
+    masked = bitmap.get(word_pos, 0) & (~((1 << bit_pos) - 1) & MAX_UINT256)
+    if masked:
+        return (compressed + (_least_significant_bit(masked) - bit_pos)) * tick_spacing, True
+    return (compressed + (255 - bit_pos)) * tick_spacing, False
+
+
+class V3PoolState:
+    """
+    Estado de um pool V3 suficiente para simular swaps: slot0, liquidez ativa
+    e ticks inicializados. word_range é o intervalo (inclusivo) de palavras
+    do tick bitmap que foi lido; None quando liquidity_net tem todos os ticks.
+    """
+
+    __slots__ = (
+        "sqrt_price_x96", "tick", "liquidity", "fee", "tick_spacing", "liquidity_net", "bitmap", "word_range"
+    )
+
+    def __init__(self, sqrt_price_x96: int, tick: int, liquidity: int, fee: int, tick_spacing: int,
+                 liquidity_net: Optional[Dict[int, int]] = None, bitmap: Optional[Dict[int, int]] = None,
+                 word_range: Optional[Tuple[int, int]] = None):
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.liquidity = liquidity
+        self.fee = fee
+        self.tick_spacing = tick_spacing
+        self.liquidity_net = liquidity_net or {}
+        self.bitmap = bitmap if bitmap is not None else self._bitmap_from_ticks(self.liquidity_net, tick_spacing)
+        self.word_range = word_range
+
+    def _word_loaded(self, tick: int, lte: bool) -> bool:
+        # Palavra que nextInitializedTickWithinOneWord vai consultar a partir de `tick`
+        if self.word_range is None:
+            return True
+        compressed = tick // self.tick_spacing + (0 if lte else 1)
+        return self.word_range[0] <= compressed >> 8 <= self.word_range[1]
+
+    @staticmethod
+    def _bitmap_from_ticks(liquidity_net: Dict[int, int], tick_spacing: int) -> Dict[int, int]:
+        bitmap: Dict[int, int] = {}
+        for tick in liquidity_net:
+            compressed = tick // tick_spacing
+            bitmap[compressed >> 8] = bitmap.get(compressed >> 8, 0) | (1 << (compressed % 256))
+        return bitmap
+
+    def quote_exact_input(self, amount_in: int, zero_for_one: bool) -> Optional[int]:
+        """
+        Saída exata de um swap exact-input, sem alterar o estado. None se o
+        swap passa do trecho lido do bitmap: fora dele a liquidez é
+        desconhecida, e seguir com a atual pode tanto sub quanto superestimar.
+        """
+        if amount_in <= 0:
+            return 0
+
+        sqrt_price, tick, liquidity = self.sqrt_price_x96, self.tick, self.liquidity
+        sqrt_limit = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        remaining, amount_out = amount_in, 0
+
+        while remaining != 0 and sqrt_price != sqrt_limit:
+            if not self._word_loaded(tick, zero_for_one):
+                return None
+            sqrt_start = sqrt_price
+            tick_next, initialized = next_initialized_tick_within_one_word(
+                self.bitmap, tick, self.tick_spacing, zero_for_one
+            )
+            tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+            sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+
+            if (sqrt_next < sqrt_limit) if zero_for_one else (sqrt_next > sqrt_limit):
+                sqrt_target = sqrt_limit
+            else:
+                sqrt_target = sqrt_next
+
+            sqrt_price, step_in, step_out, fee_amount = compute_swap_step(
+                sqrt_price, sqrt_target, liquidity, remaining, self.fee
+            )
+            remaining -= step_in + fee_amount
+            amount_out += step_out
+
+            if sqrt_price == sqrt_next:
+                if initialized:
+                    net = self.liquidity_net.get(tick_next, 0)
+                    liquidity += -net if zero_for_one else net
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price != sqrt_start:
+                tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+        return amount_out
+
+
+# --- Carga do estado V3 on-chain ---
+
+SLOT0 = function_selector("slot0()")
+LIQUIDITY = function_selector("liquidity()")
+FEE = function_selector("fee()")
+TICK_SPACING = function_selector("tickSpacing()")
+
+
+TICK_BITMAP = function_selector("tickBitmap(int16)")
+TICKS = function_selector("ticks(int24)")
+# Pool.metadata() do Aerodrome: dec0 e dec1 vêm como 10**decimais
+METADATA = function_selector("metadata()")
+METADATA_OUTPUTS = ("uint256", "uint256", "uint256", "uint256", "bool", "address", "address")
+
+CallMany = Callable[[List[Call], object], List[Optional[tuple]]]
+
+
+def _encode_int(value: int) -> bytes:
+    return (value % (1 << 256)).to_bytes(32, "big")
+
+
+def load_v3_pool_states(call_many: CallMany, pool_addresses: Iterable[str], block_identifier="latest",
+                        words_each_side: int = 2) -> Dict[str, V3PoolState]:
+    """
+    Lê, para todos os pools juntos e em três rodadas de call_many, slot0,
+    liquidity, fee e tickSpacing, as palavras do tick bitmap em torno do
+    tick atual e o liquidityNet de cada tick inicializado encontrado.
+    """
+    addresses = list(dict.fromkeys(pool_addresses))
+    calls = [
+        call
+        for address in addresses
+        for call in (
+            Call(address, SLOT0, ("uint160", "int24")),
+            Call(address, LIQUIDITY, ("uint128",)),
+            Call(address, FEE, ("uint24",)),
+            Call(address, TICK_SPACING, ("int24",)),
+        )
+    ]
+    results = call_many(calls, block_identifier)
+    base = {}
+    for index, address in enumerate(addresses):
+        chunk = results[4 * index:4 * index + 4]
+        if all(result is not None for result in chunk):
+            (sqrt_price_x96, tick), (liquidity,), (fee,), (tick_spacing,) = chunk
+            base[address] = (sqrt_price_x96, tick, liquidity, fee, tick_spacing)
+
+    words = []
+    word_ranges: Dict[str, Tuple[int, int]] = {}
+    for address, (_, tick, _, _, tick_spacing) in base.items():
+        center = (tick // tick_spacing) >> 8
+        word_ranges[address] = (center - words_each_side, center + words_each_side)
+        words += [(address, word) for word in range(center - words_each_side, center + words_each_side + 1)]
+    results = call_many([Call(address, TICK_BITMAP + _encode_int(word), ("uint256",)) for address, word in words],
+                        block_identifier)
+    bitmaps: Dict[str, Dict[int, int]] = {address: {} for address in base}
+    # Palavra ou tick sem leitura deixaria um buraco dentro da janela: o pool fica de fora
+    failed = set()
+    for (address, word), result in zip(words, results):
+        if result is None:
+            failed.add(address)
+        elif result[0]:
+            bitmaps[address][word] = result[0]
+
+    ticks = [
+        (address, tick)
+        for address, bitmap in bitmaps.items()
+        for tick in _initialized_ticks(bitmap, base[address][4])
+    ]
+    results = call_many([Call(address, TICKS + _encode_int(tick), ("uint128", "int128")) for address, tick in ticks],
+                        block_identifier)
+    liquidity_net: Dict[str, Dict[int, int]] = {address: {} for address in base}
+    for (address, tick), result in zip(ticks, results):
+        if result is None:
+            failed.add(address)
+        else:
+            liquidity_net[address][tick] = result[1]
+
+    # Swaps que saem da janela lida devolvem None em quote_exact_input, em vez de seguir com a liquidez atual
+    return {
+        address: V3PoolState(sqrt_price_x96, tick, liquidity, fee, tick_spacing, liquidity_net[address],
+                             bitmaps[address], word_ranges[address])
+        for address, (sqrt_price_x96, tick, liquidity, fee, tick_spacing) in base.items()
+        if address not in failed
+    }
+
+
+def load_v3_pool_state(call_many: CallMany, pool_address: str, block_identifier="latest",
+                       words_each_side: int = 2) -> Optional[V3PoolState]:
+    return load_v3_pool_states(call_many, [pool_address], block_identifier, words_each_side).get(pool_address)
+
+
+def load_solidly_pool_states(call_many: CallMany, fees_bps: Dict[str, int],
+                             block_identifier="latest") -> Dict[str, SolidlyPoolState]:
+    """metadata() de cada pool (decimais, reservas e estável/volátil) numa rodada; fee em bps por endereço"""
+    addresses = list(fees_bps)
+    results = call_many([Call(address, METADATA, METADATA_OUTPUTS) for address in addresses], block_identifier)
+    states = {}
+    for address, result in zip(addresses, results):
+        if result is None:
+            continue
+        unit0, unit1, reserve0, reserve1, stable = result[:5]
+        states[address] = SolidlyPoolState(
+            reserve0, reserve1, stable, fees_bps[address], len(str(unit0)) - 1, len(str(unit1)) - 1
+        )
+    return states
+
+
+def _initialized_ticks(bitmap: Dict[int, int], tick_spacing: int) -> Iterable[int]:
+    for word, bits in bitmap.items():
+        while bits:
+            bit = _least_significant_bit(bits)
+            yield ((word << 8) + bit) * tick_spacing
+            bits &= bits - 1
@@ -0,0 +1,321 @@
+"""
+Varredura em vários processos, com os pools particionados por par
+
+Com o registro completo, um processo só não dá conta de decodificar e
+pontuar milhares de pools por bloco: o GIL serializa tudo. Aqui cada pool
+vai para o shard crc32(par) % N, então todos os pools de um par ficam no
+mesmo processo e nenhum spread cruza shards.
+
+Cada worker tem o próprio leitor (sessão RPC, Multicall3, decodificação) e
+o próprio Detector. A cada bloco ele grava os preços do seu shard numa
+tabela em memória compartilhada (multiprocessing.shared_memory) e devolve
+ao coordenador só os candidatos. O coordenador deduplica, ordena e lê a
+tabela completa da memória compartilhada, sem pickle, para o histórico, os
+ciclos multi-hop e a conversão de gás.
+
+Com event_driven, o leitor de cada worker mantém um PoolStateEngine só com
+os pools do seu shard: bootstrap no primeiro bloco e, depois, um
+eth_getLogs por bloco filtrado aos endereços do shard, em vez de reler o
+estado de todos os pools. O dimensionamento pelo quoter continua no
+coordenador (TradeSizer): ele precisa de ticks além do slot0/liquidity que o
+motor guarda e só roda para os poucos candidatos que sobram do top-K.
+"""
+
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from web3 import Web3
+
+from src.pricing.pool_reader import PoolSpec, price_from_state, state_call
+from src.pricing.pool_state import PoolStateEngine
+from src.pricing.price_table import Opportunity, PriceTable
+from src.rpc.batch import JsonRpcBatch
+from src.rpc.multicall import Multicall
+from src.rpc.provider_pool import FailoverHTTPProvider, ProviderPool
+from src.rpc.rate_limit import COMPUTE_UNITS, TokenBucket
+from src.strategy.detector import Detector
+
+logger = logging.getLogger(__name__)
+
+
+class ShardPool(NamedTuple):
+    spec: PoolSpec
+    token0: str
+    token1: str
+    token0_decimals: int
+    token1_decimals: int
+
+
+def shard_of(token0: str, token1: str, shards: int) -> int:
+    # crc32 e não hash(): o hash de str muda entre processos (PYTHONHASHSEED)
+    token_a, token_b = sorted((token0.lower(), token1.lower()))
+    return zlib.crc32(f"{token_a}/{token_b}".encode()) % shards
+
+
+def partition(pools: Sequence[ShardPool], shards: int) -> List[List[int]]:
+    """Slots (índices em `pools`) de cada shard"""
+    slots: List[List[int]] = [[] for _ in range(shards)]
+    for slot, pool in enumerate(pools):
+        slots[shard_of(pool.token0, pool.token1, shards)].append(slot)
+    return slots
+
+
+class SharedPriceTable:
+    """Preço e bloco de cada slot de pool num segmento de memória compartilhada"""
+
+    def __init__(self, size: int, name: Optional[str] = None):
+        self.size = size
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=max(16, 16 * size))
+        self.prices = np.ndarray((size,), dtype=np.float64, buffer=self.shm.buf, offset=0)
+        self.blocks = np.ndarray((size,), dtype=np.int64, buffer=self.shm.buf, offset=8 * size)
+        if self.owner:
+            self.prices.fill(np.nan)
+            self.blocks.fill(-1)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slots: np.ndarray, prices: np.ndarray, block: int) -> None:
+        self.prices[slots] = prices
+        self.blocks[slots] = block
+
+    def table(self, pools: Sequence[ShardPool], block: Optional[int] = None) -> PriceTable:
+        # Só os slots gravados neste bloco: um shard que falhou não entra com preço velho
+        valid = np.isfinite(self.prices)
+        if block is not None:
+            valid &= self.blocks == block
+        table = PriceTable(block)
+        prices = self.prices.tolist()
+        for slot in np.flatnonzero(valid).tolist():
+            pool = pools[slot]
+            table.add_pool(pool.spec.dex, pool.token0, pool.token1, prices[slot])
+        return table
+
+    def close(self) -> None:
+        # As views NumPy seguram o buffer; sem soltá-las o close() falha
+        del self.prices, self.blocks
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RpcShardReader:
+    """
+    Leitor de um worker: provider, rate limit e Multicall3 próprios.
+
+    Nada é conectado antes de read(), então a instância vai para o processo
+    filho por pickle e cada worker abre as próprias sessões HTTP (e, com
+    event_driven, o próprio PoolStateEngine).
+    """
+
+    def __init__(self, rpc_urls: Sequence[str], multicall_address: Optional[str] = None, timeout: float = 10.0,
+                 rate: Optional[float] = None, burst: Optional[float] = None, batch_size: int = 100,
+                 event_driven: bool = False, max_log_range: int = 2000):
+        self.rpc_urls = list(rpc_urls)
+        self.multicall_address = multicall_address
+        self.timeout = timeout
+        self.rate = rate
+        self.burst = burst
+        self.batch_size = batch_size
+        self.event_driven = event_driven
+        self.max_log_range = max_log_range
+        self._w3 = None
+        self._reader = None
+        self._engine: Optional[PoolStateEngine] = None
+
+    def _connect(self):
+        limiter = TokenBucket(self.rate, self.burst or self.rate, COMPUTE_UNITS) if self.rate else None
+        self._w3 = Web3(FailoverHTTPProvider(ProviderPool(self.rpc_urls, timeout=self.timeout, limiter=limiter)))
+        if self.multicall_address:
+            return Multicall(self._w3, self.multicall_address)
+        return JsonRpcBatch(self._w3.provider.make_raw_batch, self.batch_size)
+
+    def _read_events(self, pools: Sequence[ShardPool], block_identifier) -> List[Optional[float]]:
+        engine = self._engine
+        if engine is None:
+            # Tokens e decimais já vêm do coordenador: a store precifica sem metadados
+            engine = PoolStateEngine([pool.spec for pool in pools], max_log_range=self.max_log_range)
+            for pool in pools:
+                engine.store.set_tokens(
+                    engine.store.index(pool.spec.address), pool.token0, pool.token1,
+                    pool.token0_decimals, pool.token1_decimals
+                )
+            self._engine = engine
+
+        if engine.bootstrapped:
+            # getLogs só dos endereços do shard; um reorg além dos checkpoints zera o motor
+            engine.sync(self._w3, block_identifier)
+        if not engine.bootstrapped:
+            head = self._w3.eth.get_block(block_identifier)
+            engine.bootstrap(self._reader.call_many, head["number"], head["hash"])
+
+        prices = engine.store.prices()[[engine.store.index(pool.spec.address) for pool in pools]]
+        return [None if np.isnan(price) else price for price in prices.tolist()]
+
+    def read(self, pools: Sequence[ShardPool], block_identifier) -> List[Optional[float]]:
+        if self._reader is None:
+            self._reader = self._connect()
+        if self.event_driven:
+            return self._read_events(pools, block_identifier)
+        calls = [state_call(pool.spec) for pool in pools]
+        results = iter(self._reader.call_many([call for call in calls if call is not None], block_identifier))
+        prices: List[Optional[float]] = []
+        for pool, call in zip(pools, calls):
+            state = next(results) if call is not None else None
+            prices.append(
+                None if state is None
+                else price_from_state(pool.spec, state, pool.token0_decimals, pool.token1_decimals)
+            )
+        return prices
+
+
+class ShardResult(NamedTuple):
+    shard: int
+    sequence: int
+    opportunities: List[Opportunity]
+    priced: int
+    cpu_seconds: float
+    error: Optional[str] = None
+
+
+def _worker(shard: int, slots: List[int], pools: List[ShardPool], reader, detector: Detector, shm_name: str,
+            size: int, commands, results) -> None:
+    # Ctrl+C vai para o grupo todo; quem encerra os workers é o close() do coordenador
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shared = SharedPriceTable(size, shm_name)
+    slot_array = np.asarray(slots, dtype=np.int64)
+    try:
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            sequence, block = command
+            started = time.process_time()
+            try:
+                prices = reader.read(pools, block)
+                values = np.array([np.nan if price is None else price for price in prices], dtype=np.float64)
+                shared.write(slot_array, values, block)
+
+                table = PriceTable(block)
+                for pool, price in zip(pools, prices):
+                    if price is not None:
+                        table.add_pool(pool.spec.dex, pool.token0, pool.token1, price)
+                opportunities = detector.spreads(table)
+                results.put(ShardResult(
+                    shard, sequence, opportunities, int(np.isfinite(values).sum()), time.process_time() - started
+                ))
+            except Exception as e:
+                logger.error(f"Erro no shard {shard} no bloco {block}: {e}")
+                results.put(ShardResult(shard, sequence, [], 0, time.process_time() - started, str(e)))
+    finally:
+        shared.close()
+
+
+class ShardedScanner:
+    """Coordenador: distribui o bloco, junta os candidatos e expõe a tabela compartilhada"""
+
+    def __init__(self, pools: Sequence[ShardPool], shards: int, reader, detector: Detector,
+                 timeout: float = 60.0, start_method: str = "spawn"):
+        self.pools = list(pools)
+        self.shards = max(1, min(shards, len(self.pools)))
+        self.reader = reader
+        self.detector = detector
+        self.timeout = timeout
+        self.start_method = start_method
+        self.shared: Optional[SharedPriceTable] = None
+        self._workers: Dict[int, Tuple[multiprocessing.Process, object]] = {}
+        self._results = None
+        self._sequence = 0
+        self.stats = {
+            "scans": 0,
+            "timeouts": 0,
+            "shard_errors": 0,
+            "last_ms": None,
+            "cpu_seconds": [0.0] * self.shards,
+            "pools_per_shard": [],
+        }
+
+    def start(self) -> None:
+        # spawn por padrão: o monitor já tem threads (Flask, Telegram, hedge) e fork copiaria locks presos
+        context = multiprocessing.get_context(self.start_method)
+        self.shared = SharedPriceTable(len(self.pools))
+        self._results = context.Queue()
+        slots_by_shard = partition(self.pools, self.shards)
+        self.stats["pools_per_shard"] = [len(slots) for slots in slots_by_shard]
+        for shard, slots in enumerate(slots_by_shard):
+            if not slots:
+                continue
+            commands = context.Queue()
+            # Só spreads nos workers; os ciclos precisam do grafo inteiro e ficam no coordenador
+            detector = Detector(self.detector.min_profit, self.detector.top_k, self.detector.fees)
+            process = context.Process(
+                target=_worker, name=f"shard-{shard}", daemon=True,
+                args=(shard, slots, [self.pools[slot] for slot in slots], self.reader, detector,
+                      self.shared.name, len(self.pools), commands, self._results)
+            )
+            process.start()
+            self._workers[shard] = (process, commands)
+
+    def scan(self, block: int) -> List[Opportunity]:
+        """Candidatos de todos os shards no bloco, deduplicados e ordenados por lucro"""
+        if self.shared is None:
+            raise RuntimeError("ShardedScanner precisa de start() antes de scan()")
+        dead = [process.name for process, _ in self._workers.values() if not process.is_alive()]
+        if dead:
+            raise RuntimeError(f"Workers parados: {', '.join(dead)}")
+
+        self._sequence += 1
+        started = time.perf_counter()
+        for _, commands in self._workers.values():
+            commands.put((self._sequence, block))
+
+        best: Dict[Tuple[str, str, str, str], Opportunity] = {}
+        pending = set(self._workers)
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            try:
+                result = self._results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.stats["timeouts"] += 1
+                logger.warning(f"Shards {sorted(pending)} sem resposta no bloco {block}")
+                break
+            if result.sequence != self._sequence:
+                continue    # resposta atrasada de um scan que já expirou
+            pending.discard(result.shard)
+            self.stats["cpu_seconds"][result.shard] = round(result.cpu_seconds, 6)
+            if result.error is not None:
+                self.stats["shard_errors"] += 1
+            for opportunity in result.opportunities:
+                key = (opportunity.token_in, opportunity.token_out, opportunity.dex_buy, opportunity.dex_sell)
+                if key not in best or opportunity.profit > best[key].profit:
+                    best[key] = opportunity
+
+        opportunities = sorted(best.values(), key=lambda o: o.profit, reverse=True)
+        self.stats["scans"] += 1
+        self.stats["last_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        top_k = self.detector.top_k
+        return opportunities[:top_k] if top_k is not None else opportunities
+
+    def table(self, block: Optional[int] = None) -> PriceTable:
+        return self.shared.table(self.pools, block)
+
+    def close(self) -> None:
+        for _, commands in self._workers.values():
+            commands.put(None)
+        for process, _ in self._workers.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers = {}
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
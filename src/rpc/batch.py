@@ -0,0 +1,77 @@
+"""
+Leituras em lote via batch JSON-RPC
+
+Alternativa ao Multicall3 para quando ele não está disponível: as eth_call
+pendentes de uma rodada vão num único corpo HTTP (lista de requisições),
+em blocos do tamanho máximo aceito pelo provedor. As respostas voltam fora
+de ordem e são casadas pelo id. O erro de um item (revert, limite) vira
+None só para ele; itens recusados por rate limit são reenviados uma vez.
+
+Mesma interface de Multicall.call_many, então serve ao MulticallPoolReader
+e ao run_plan sem mudanças.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from web3 import Web3
+
+from src.rpc.multicall import Call, checksum_address, decode_result
+from src.rpc.provider_pool import is_rate_limited
+
+logger = logging.getLogger(__name__)
+
+BatchSender = Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]
+
+
+def block_param(block_identifier) -> str:
+    return hex(block_identifier) if isinstance(block_identifier, int) else str(block_identifier)
+
+
+class JsonRpcBatch:
+    def __init__(self, send: BatchSender, batch_size: int = 100, rate_limiter=None):
+        self.send = send
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter
+        self.batches_sent = 0
+
+    def call_many(self, calls: Sequence[Call], block_identifier="latest") -> List[Optional[tuple]]:
+        block = block_param(block_identifier)
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": index,
+                "method": "eth_call",
+                "params": [{"to": checksum_address(call.target), "data": Web3.to_hex(call.calldata)}, block],
+            }
+            for index, call in enumerate(calls)
+        ]
+
+        responses = self._send_chunks(payload)
+        retry = [request for request in payload if is_rate_limited(responses.get(request["id"]))]
+        if retry:
+            logger.warning(f"{len(retry)} itens do batch recusados por rate limit, reenviando")
+            responses.update(self._send_chunks(retry))
+
+        results: List[Optional[tuple]] = []
+        for index, call in enumerate(calls):
+            response = responses.get(index)
+            if response is None or "result" not in response:
+                error = (response or {}).get("error", "sem resposta")
+                logger.debug(f"eth_call para {call.target} falhou no batch: {error}")
+                results.append(None)
+                continue
+            results.append(decode_result(call, True, bytes(Web3.to_bytes(hexstr=response["result"]))))
+        return results
+
+    def _send_chunks(self, payload: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        responses: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(payload), self.batch_size):
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
+            chunk = payload[start:start + self.batch_size]
+            self.batches_sent += 1
+            for response in self.send(chunk):
+                if isinstance(response, dict) and isinstance(response.get("id"), int):
+                    responses[response["id"]] = response
+        return responses
@@ -0,0 +1,321 @@
+"""
+Codecs ABI pré-compilados
+
+O caminho genérico do web3 (w3.eth.contract(...).functions.x().call())
+refaz o checksum, monta o contrato, resolve a ABI e passa pelo eth_abi a
+cada chamada; com o RPC em lote, esse overhead Python passa a dominar.
+
+Aqui cada função vira um FunctionCodec uma vez só: seletor e calldata fixa
+(funções sem argumentos) prontos, e o retorno decodificado por fatias de 32
+bytes sobre um memoryview quando os tipos de saída são estáticos (uintN,
+intN, address, bool, bytesN) ou arrays deles. O resto cai no eth_abi.
+
+As ABIs do repositório (aerodrome_abi.json, sushiswap_v3_abi.json) vêm
+dentro de um bloco ```json e a da SushiSwap está truncada: load_abi tira a
+cerca e aproveita as entradas completas. Elas são de routers; as funções de
+pool e ERC20 (slot0, getReserves, token0, token1, decimals) vêm dos
+fragmentos abaixo.
+"""
+
+import json
+import logging
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+ABI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+BUNDLED_ABIS = {
+    "aerodrome": "aerodrome_abi.json",
+    "sushiswap_v3": "sushiswap_v3_abi.json",
+}
+
+V3_POOL_ABI = [
+    {"name": "slot0", "inputs": [], "outputs": [{"type": "uint160"}, {"type": "int24"}], "type": "function"},
+    {"name": "liquidity", "inputs": [], "outputs": [{"type": "uint128"}], "type": "function"},
+    {"name": "token0", "inputs": [], "outputs": [{"type": "address"}], "type": "function"},
+    {"name": "token1", "inputs": [], "outputs": [{"type": "address"}], "type": "function"},
+]
+
+SOLIDLY_POOL_ABI = [
+    {"name": "getReserves", "inputs": [], "outputs": [{"type": "uint256"}, {"type": "uint256"}], "type": "function"},
+    {"name": "token0", "inputs": [], "outputs": [{"type": "address"}], "type": "function"},
+    {"name": "token1", "inputs": [], "outputs": [{"type": "address"}], "type": "function"},
+]
+
+ERC20_ABI = [
+    {"name": "decimals", "inputs": [], "outputs": [{"type": "uint8"}], "type": "function"},
+]
+
+Decoder = Callable[[Any], tuple]
+
+
+def function_selector(signature: str) -> bytes:
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+@lru_cache(maxsize=65536)
+def checksum_address(address: str) -> str:
+    # O checksum custa um keccak; os mesmos pools voltam em todo ciclo
+    return Web3.to_checksum_address(address)
+
+
+# --- Decodificação por offset fixo ---
+
+def _word_reader(abi_type: str) -> Optional[Callable[[memoryview, int], Any]]:
+    """Leitor de uma palavra de 32 bytes, com as mesmas validações do eth_abi; None se o tipo não é estático"""
+    if abi_type.startswith("uint"):
+        bits = int(abi_type[4:] or 256)
+
+        def read_uint(view: memoryview, offset: int) -> int:
+            value = int.from_bytes(view[offset:offset + 32], "big")
+            if value >> bits:
+                raise ValueError(f"Valor fora de {abi_type}")
+            return value
+        return read_uint
+
+    if abi_type.startswith("int"):
+        bits = int(abi_type[3:] or 256)
+        low, high = -(1 << (bits - 1)), 1 << (bits - 1)
+
+        def read_int(view: memoryview, offset: int) -> int:
+            value = int.from_bytes(view[offset:offset + 32], "big", signed=True)
+            if not low <= value < high:
+                raise ValueError(f"Valor fora de {abi_type}")
+            return value
+        return read_int
+
+    if abi_type == "address":
+        def read_address(view: memoryview, offset: int) -> str:
+            if int.from_bytes(view[offset:offset + 12], "big"):
+                raise ValueError("Padding não nulo em address")
+            # Minúsculo, como o eth_abi; checksum fica com quem precisa (checksum_address)
+            return "0x" + view[offset + 12:offset + 32].hex()
+        return read_address
+
+    if abi_type == "bool":
+        def read_bool(view: memoryview, offset: int) -> bool:
+            value = int.from_bytes(view[offset:offset + 32], "big")
+            if value > 1:
+                raise ValueError("Valor inválido para bool")
+            return value == 1
+        return read_bool
+
+    if abi_type.startswith("bytes") and abi_type[5:].isdigit():
+        size = int(abi_type[5:])
+
+        def read_fixed_bytes(view: memoryview, offset: int) -> bytes:
+            if int.from_bytes(view[offset + size:offset + 32], "big"):
+                raise ValueError(f"Padding não nulo em {abi_type}")
+            return bytes(view[offset:offset + size])
+        return read_fixed_bytes
+
+    return None
+
+
+def _slow_decoder(output_types: Tuple[str, ...]) -> Decoder:
+    def decode_generic(data) -> tuple:
+        return decode(list(output_types), bytes(data))
+    return decode_generic
+
+
+@lru_cache(maxsize=None)
+def decoder(output_types: Tuple[str, ...]) -> Decoder:
+    """Decodificador para os tipos de saída: fatias de memoryview se todos forem estáticos ou T[] estático"""
+    readers = []
+    for abi_type in output_types:
+        is_array = abi_type.endswith("[]")
+        reader = _word_reader(abi_type[:-2] if is_array else abi_type)
+        if reader is None:
+            return _slow_decoder(output_types)
+        readers.append((is_array, reader))
+    head_size = 32 * len(readers)
+
+    def decode_static(data) -> tuple:
+        view = memoryview(data)
+        size = len(view)
+        if size < head_size:
+            raise ValueError(f"Retorno com {size} bytes, esperado ao menos {head_size}")
+        values = []
+        for index, (is_array, reader) in enumerate(readers):
+            offset = 32 * index
+            if not is_array:
+                values.append(reader(view, offset))
+                continue
+            start = int.from_bytes(view[offset:offset + 32], "big")
+            if start + 32 > size:
+                raise ValueError("Offset de array fora do retorno")
+            length = int.from_bytes(view[start:start + 32], "big")
+            if start + 32 + 32 * length > size:
+                raise ValueError("Array maior que o retorno")
+            values.append(tuple(reader(view, start + 32 + 32 * i) for i in range(length)))
+        return tuple(values)
+    return decode_static
+
+
+def decode_aggregate3_results(raw) -> List[Tuple[bool, memoryview]]:
+    """(success, returnData) de cada item de um retorno (bool,bytes)[] do aggregate3, sem copiar os dados"""
+    view = memoryview(raw)
+    size = len(view)
+    array = int.from_bytes(view[0:32], "big")
+    if size < 64 or array + 32 > size:
+        raise ValueError("Retorno do aggregate3 inválido")
+    length = int.from_bytes(view[array:array + 32], "big")
+    heads = array + 32
+    if heads + 32 * length > size:
+        raise ValueError("Retorno do aggregate3 truncado")
+    results = []
+    for index in range(length):
+        item = heads + int.from_bytes(view[heads + 32 * index:heads + 32 * (index + 1)], "big")
+        success = int.from_bytes(view[item:item + 32], "big") == 1
+        data = item + int.from_bytes(view[item + 32:item + 64], "big")
+        data_length = int.from_bytes(view[data:data + 32], "big")
+        if data + 32 + data_length > size:
+            raise ValueError("returnData fora do retorno do aggregate3")
+        results.append((success, view[data + 32:data + 32 + data_length]))
+    return results
+
+
+# --- Funções ---
+
+def canonical_type(param: Dict[str, Any]) -> str:
+    abi_type = param["type"]
+    if abi_type.startswith("tuple"):
+        return "(" + ",".join(canonical_type(component) for component in param["components"]) + ")" + abi_type[5:]
+    return abi_type
+
+
+class FunctionCodec:
+    __slots__ = ("name", "signature", "selector", "input_types", "output_types", "calldata", "decode")
+
+    def __init__(self, name: str, input_types: Sequence[str], output_types: Sequence[str]):
+        self.name = name
+        self.input_types = tuple(input_types)
+        self.output_types = tuple(output_types)
+        self.signature = f"{name}({','.join(self.input_types)})"
+        self.selector = function_selector(self.signature)
+        # Sem argumentos a calldata é só o seletor: nada a codificar por chamada
+        self.calldata: Optional[bytes] = None if self.input_types else self.selector
+        self.decode: Decoder = decoder(self.output_types)
+
+    @classmethod
+    def from_abi(cls, entry: Dict[str, Any]) -> "FunctionCodec":
+        return cls(
+            entry["name"],
+            [canonical_type(param) for param in entry.get("inputs", [])],
+            [canonical_type(param) for param in entry.get("outputs", [])],
+        )
+
+    def encode(self, *args) -> bytes:
+        if self.calldata is not None:
+            return self.calldata
+        return self.selector + encode(list(self.input_types), list(args))
+
+    def __repr__(self) -> str:
+        return f"FunctionCodec({self.signature} -> ({','.join(self.output_types)}))"
+
+
+def load_abi(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        text = f.read().strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    # Arquivo truncado: fica com as entradas completas do array
+    parser = json.JSONDecoder()
+    entries: List[Dict[str, Any]] = []
+    index = text.find("[") + 1
+    while 0 < index < len(text):
+        while index < len(text) and text[index] in " \t\r\n,":
+            index += 1
+        try:
+            entry, index = parser.raw_decode(text, index)
+        except json.JSONDecodeError:
+            break
+        if isinstance(entry, dict):
+            entries.append(entry)
+    logger.warning(f"ABI {os.path.basename(path)} incompleta: {len(entries)} entradas aproveitadas")
+    return entries
+
+
+def compile_abi(abi: Sequence[Dict[str, Any]]) -> Dict[str, FunctionCodec]:
+    """Codecs por nome (a primeira sobrecarga) e por assinatura completa"""
+    codecs: Dict[str, FunctionCodec] = {}
+    for entry in abi:
+        if entry.get("type") != "function" or "name" not in entry:
+            continue
+        try:
+            codec = FunctionCodec.from_abi(entry)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Função {entry.get('name')} ignorada na ABI: {e}")
+            continue
+        codecs.setdefault(codec.name, codec)
+        codecs[codec.signature] = codec
+    return codecs
+
+
+@lru_cache(maxsize=None)
+def bundled_codecs(name: str) -> Dict[str, FunctionCodec]:
+    """Codecs de uma ABI do repositório (ex.: bundled_codecs("aerodrome")["getAmountsOut"])"""
+    path = os.path.join(ABI_DIR, BUNDLED_ABIS[name])
+    try:
+        return compile_abi(load_abi(path))
+    except Exception as e:
+        logger.error(f"Erro ao carregar ABI {path}: {e}")
+        return {}
+
+
+V3_POOL = compile_abi(V3_POOL_ABI)
+SOLIDLY_POOL = compile_abi(SOLIDLY_POOL_ABI)
+ERC20 = compile_abi(ERC20_ABI)
+
+
+# --- Contratos ---
+
+class CodecContract:
+    """Contrato de um endereço com checksum e codecs já resolvidos"""
+
+    __slots__ = ("w3", "address", "codecs")
+
+    def __init__(self, w3: Web3, address: str, codecs: Dict[str, FunctionCodec]):
+        self.w3 = w3
+        self.address = checksum_address(address)
+        self.codecs = codecs
+
+    def call(self, name: str, *args, block_identifier="latest") -> tuple:
+        codec = self.codecs[name]
+        raw = self.w3.eth.call({"to": self.address, "data": codec.encode(*args)}, block_identifier)
+        return codec.decode(raw)
+
+
+class ContractCache:
+    """Um CodecContract por (endereço, ABI), com descarte do menos usado"""
+
+    def __init__(self, w3: Web3, max_size: int = 4096):
+        self.w3 = w3
+        self.max_size = max_size
+        self._contracts: "OrderedDict[Tuple[str, int], CodecContract]" = OrderedDict()
+
+    def get(self, address: str, codecs: Dict[str, FunctionCodec]) -> CodecContract:
+        key = (address.lower(), id(codecs))
+        contract = self._contracts.get(key)
+        if contract is None:
+            contract = self._contracts[key] = CodecContract(self.w3, address, codecs)
+            if len(self._contracts) > self.max_size:
+                self._contracts.popitem(last=False)
+        else:
+            self._contracts.move_to_end(key)
+        return contract
+
+    def __len__(self) -> int:
+        return len(self._contracts)
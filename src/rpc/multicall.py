@@ -0,0 +1,87 @@
+"""
+Leituras em lote via Multicall3 (aggregate3)
+
+Empacota várias chamadas view num único eth_call ao contrato Multicall3.
+Cada chamada é enviada com allowFailure=True, então um pool que reverte só
+invalida o próprio resultado (None) e não o lote inteiro.
+"""
+
+import logging
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from eth_abi import encode
+from web3 import Web3
+
+from src.rpc.codec import checksum_address, decode_aggregate3_results, decoder, function_selector
+
+logger = logging.getLogger(__name__)
+
+# Endereço canônico do Multicall3, o mesmo em Base, Optimism, Ethereum, etc.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+AGGREGATE3_SELECTOR = function_selector("aggregate3((address,bool,bytes)[])")
+
+
+class Call(NamedTuple):
+    target: str
+    calldata: bytes
+    output_types: Sequence[str]
+
+
+class Multicall:
+    def __init__(self, w3: Web3, address: str = MULTICALL3_ADDRESS, batch_size: int = 500, rate_limiter=None):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter
+        self._calls: List[Call] = []
+
+    def add(self, target: str, calldata: bytes, output_types: Sequence[str]) -> int:
+        self._calls.append(Call(checksum_address(target), calldata, tuple(output_types)))
+        return len(self._calls) - 1
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def execute(self, block_identifier="latest") -> List[Optional[tuple]]:
+        """Executa as chamadas pendentes; o índice devolvido por add() indexa o resultado"""
+        calls, self._calls = self._calls, []
+        return self.call_many(calls, block_identifier)
+
+    def call_many(self, calls: Sequence[Call], block_identifier="latest") -> List[Optional[tuple]]:
+        calls = [call._replace(target=checksum_address(call.target)) for call in calls]
+        results: List[Optional[tuple]] = []
+        for start in range(0, len(calls), self.batch_size):
+            results.extend(self._execute_batch(calls[start:start + self.batch_size], block_identifier))
+        return results
+
+    def _execute_batch(self, calls: List[Call], block_identifier) -> List[Optional[tuple]]:
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait()
+        raw = self.w3.eth.call({"to": self.address, "data": encode_aggregate3(calls)}, block_identifier)
+        return decode_aggregate3(calls, raw)
+
+
+def encode_aggregate3(calls: Sequence[Call]) -> bytes:
+    return AGGREGATE3_SELECTOR + encode(
+        ["(address,bool,bytes)[]"],
+        [[(call.target, True, call.calldata) for call in calls]]
+    )
+
+
+def decode_aggregate3(calls: Sequence[Call], raw: bytes) -> List[Optional[tuple]]:
+    returned = decode_aggregate3_results(raw)
+    if len(returned) != len(calls):
+        raise ValueError(f"aggregate3 devolveu {len(returned)} resultados para {len(calls)} chamadas")
+    return [decode_result(call, success, return_data) for call, (success, return_data) in zip(calls, returned)]
+
+
+def decode_result(call: Call, success: bool, return_data: bytes) -> Optional[Any]:
+    if not success or not return_data:
+        return None
+    try:
+        return decoder(tuple(call.output_types))(return_data)
+    except Exception as e:
+        logger.debug(f"Falha ao decodificar retorno de {call.target}: {e}")
+        return None
@@ -0,0 +1,425 @@
+"""
+Pool de providers RPC com failover e requisições hedged
+
+Mantém sessões keep-alive para vários endpoints JSON-RPC e mede, por
+endpoint, latência (janela móvel para p50/p95) e taxa de erro (EWMA). Cada
+chamada vai para o endpoint mais saudável; timeouts, HTTP 429/5xx e erros
+de rate limit do JSON-RPC passam a chamada para o próximo e colocam o
+endpoint em cooldown depois de falhas seguidas.
+
+Com hedge ligado, se o endpoint escolhido não responder até o p95 da sua
+própria latência, a mesma chamada é disparada no segundo melhor e vale a
+primeira resposta. Envio de transações nunca é duplicado.
+
+FailoverHTTPProvider (web3 síncrono) e AsyncFailoverHTTPProvider (AsyncWeb3)
+compartilham o mesmo ProviderPool, então as estatísticas valem para os dois.
+Com um TokenBucket no pool, toda requisição debita as compute units do seu
+método antes de sair; um 429 (com Retry-After) freia o bucket inteiro e a
+chamada recusada é repetida uma vez depois do bloqueio.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.base import JSONBaseProvider
+
+from src.monitoring.metrics import RPC_BATCH_ITEMS, child, observe_rpc
+from src.rpc.rate_limit import TokenBucket, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {"Content-Type": "application/json"}
+
+# Códigos JSON-RPC usados pelos provedores para limite de requisições/capacidade
+RATE_LIMIT_CODES = {-32005, -32016, -32090, 429}
+
+# Métodos que não podem ser disparados em dois endpoints ao mesmo tempo
+NO_HEDGE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction"}
+
+
+class EndpointError(Exception):
+    """Falha de transporte ou de capacidade: a chamada pode ir para outro endpoint"""
+
+
+class RateLimitedError(EndpointError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class EndpointHealth:
+    __slots__ = (
+        "url", "name", "latencies", "error_rate", "requests", "errors", "hedges",
+        "consecutive_failures", "cooldown_until", "last_used"
+    )
+
+    def __init__(self, url: str, window: int = 256):
+        self.url = url
+        # Só host no nome: a URL costuma carregar a API key
+        self.name = urlparse(url).netloc or url
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def score(self) -> float:
+        # Menor é melhor: latência mediana penalizada pela taxa de erro (que também
+        # pesa sozinha, para um endpoint que só falhou não parecer o mais rápido)
+        p50 = self.percentile(0.5)
+        return (p50 if p50 is not None else 0.0) * (1 + 10 * self.error_rate) + self.error_rate
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "endpoint": self.name,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "p50_ms": None if p50 is None else round(p50 * 1000, 1),
+            "p95_ms": None if p95 is None else round(p95 * 1000, 1),
+            "hedges": self.hedges,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+class ProviderPool:
+    """Saúde e roteamento dos endpoints; o transporte fica nos providers"""
+
+    def __init__(self, urls: Sequence[str], timeout: float = 10.0, hedge: bool = True,
+                 hedge_delay: float = 0.5, min_samples: int = 20, cooldown: float = 30.0,
+                 max_failures: int = 3, pool_size: int = 20, error_decay: float = 0.1,
+                 probe_interval: float = 60.0, limiter: Optional[TokenBucket] = None):
+        if not urls:
+            raise ValueError("ProviderPool precisa de pelo menos um endpoint")
+        self.endpoints = [EndpointHealth(url) for url in urls]
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.max_failures = max_failures
+        self.pool_size = pool_size
+        self.error_decay = error_decay
+        self.probe_interval = probe_interval
+        self.limiter = limiter
+        self._lock = threading.Lock()
+
+    def ranked(self) -> List[EndpointHealth]:
+        """
+        Endpoints do mais saudável ao menos; os em cooldown ficam por último.
+        Um endpoint sem uso há mais de probe_interval vai na frente uma vez,
+        para que uma latência ruim antiga não o exclua para sempre.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ranked = sorted(self.endpoints, key=lambda e: (
+                e.cooldown_until > now, now - e.last_used < self.probe_interval, e.score()
+            ))
+            ranked[0].last_used = now
+            return ranked
+
+    def available(self, endpoint: EndpointHealth) -> bool:
+        return endpoint.cooldown_until <= time.monotonic()
+
+    def should_hedge(self, method: str, ranked: List[EndpointHealth]) -> bool:
+        return (
+            self.hedge and len(ranked) > 1 and method not in NO_HEDGE_METHODS and self.available(ranked[1])
+        )
+
+    def hedge_deadline(self, endpoint: EndpointHealth) -> float:
+        # p95 do próprio endpoint; sem amostras suficientes usa o atraso padrão
+        with self._lock:
+            if len(endpoint.latencies) < self.min_samples:
+                return self.hedge_delay
+            return endpoint.percentile(0.95)
+
+    def record(self, endpoint: EndpointHealth, latency: float, ok: bool) -> None:
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.last_used = time.monotonic()
+            endpoint.error_rate += self.error_decay * ((0.0 if ok else 1.0) - endpoint.error_rate)
+            if ok:
+                endpoint.latencies.append(latency)
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.errors += 1
+            endpoint.consecutive_failures += 1
+            now = time.monotonic()
+            if endpoint.consecutive_failures >= self.max_failures and endpoint.cooldown_until <= now:
+                endpoint.cooldown_until = now + self.cooldown
+                logger.warning(f"Endpoint RPC {endpoint.name} em cooldown por {self.cooldown:.0f}s")
+
+    def failed(self, endpoint: EndpointHealth, latency: float, error: Exception) -> EndpointError:
+        """Registra a falha e devolve o erro a propagar; 429 também freia o bucket"""
+        self.record(endpoint, latency, False)
+        if not isinstance(error, RateLimitedError):
+            return EndpointError(f"{endpoint.name}: {error}")
+        if self.limiter is not None:
+            delay = self.limiter.penalize(error.retry_after)
+            logger.warning(f"Rate limit em {endpoint.name}, pausando chamadas RPC por {delay:.1f}s")
+        return RateLimitedError(f"{endpoint.name}: {error}", error.retry_after)
+
+    def retry_rate_limited(self, limited: bool, attempt: int) -> bool:
+        # Todos recusaram por limite: espera o bloqueio no bucket e tenta mais uma vez
+        return limited and self.limiter is not None and attempt == 0
+
+    def record_hedge(self, endpoint: EndpointHealth) -> None:
+        with self._lock:
+            endpoint.hedges += 1
+
+    def stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [endpoint.stats() for endpoint in self.endpoints]
+
+
+def is_rate_limited(response) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    return bool(error) and (
+        error.get("code") in RATE_LIMIT_CODES or "rate limit" in str(error.get("message", "")).lower()
+    )
+
+
+def check_status(status: int, retry_after: Optional[str] = None) -> None:
+    # Antes de decodificar: o corpo de um 429/5xx nem sempre é JSON
+    if status == 429:
+        raise RateLimitedError(f"HTTP {status}", parse_retry_after(retry_after))
+    if status >= 500:
+        raise EndpointError(f"HTTP {status}")
+
+
+def check_response(response):
+    # Num batch, só troca de endpoint se todos os itens foram recusados por limite
+    items = response if isinstance(response, list) else [response]
+    if items and all(is_rate_limited(item) for item in items):
+        raise RateLimitedError(f"rate limit: {items[0]['error'].get('message')}")
+    return response
+
+
+class FailoverHTTPProvider(JSONBaseProvider):
+    def __init__(self, pool: ProviderPool, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pool = pool
+        self._sessions: Dict[str, requests.Session] = {}
+        for endpoint in pool.endpoints:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._sessions[endpoint.url] = session
+        self._executor = ThreadPoolExecutor(max_workers=2 * pool.pool_size, thread_name_prefix="rpc-hedge")
+
+    def __str__(self) -> str:
+        return f"FailoverHTTPProvider({', '.join(e.name for e in self.pool.endpoints)})"
+
+    def _post(self, endpoint: EndpointHealth, body: bytes) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            response = self._sessions[endpoint.url].post(
+                endpoint.url, data=body, headers=HEADERS, timeout=self.pool.timeout
+            )
+            check_status(response.status_code, response.headers.get("Retry-After"))
+            result = check_response(self.decode_rpc_response(response.content))
+        except Exception as e:
+            raise self.pool.failed(endpoint, time.monotonic() - started, e) from e
+        self.pool.record(endpoint, time.monotonic() - started, True)
+        return result
+
+    def _hedged(self, primary: EndpointHealth, secondary: EndpointHealth, body: bytes) -> Dict[str, Any]:
+        futures = [self._executor.submit(self._post, primary, body)]
+        done, _ = wait(futures, timeout=self.pool.hedge_deadline(primary))
+        # Dispara no segundo endpoint se o primeiro passou do p95 ou já falhou
+        if not done or futures[0].exception() is not None:
+            if not done:
+                self.pool.record_hedge(secondary)
+            futures.append(self._executor.submit(self._post, secondary, body))
+
+        pending = set(futures)
+        error: Optional[Exception] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _dispatch(self, method: str, body: bytes, cost=None):
+        errors = []
+        # Latência por método para o /metrics, sem contar a espera no bucket
+        started = time.perf_counter()
+        waited = 0.0
+        ok = False
+        try:
+            for attempt in range(2):
+                if self.pool.limiter is not None:
+                    waited += self.pool.limiter.wait(method if cost is None else cost)
+                ranked = self.pool.ranked()
+                limited = False
+
+                start = 0
+                if self.pool.should_hedge(method, ranked):
+                    try:
+                        result = self._hedged(ranked[0], ranked[1], body)
+                        ok = True
+                        return result
+                    except EndpointError as e:
+                        errors.append(str(e))
+                        limited = isinstance(e, RateLimitedError)
+                        start = 2
+
+                for endpoint in ranked[start:]:
+                    try:
+                        result = self._post(endpoint, body)
+                        ok = True
+                        return result
+                    except EndpointError as e:
+                        errors.append(str(e))
+                        limited = limited or isinstance(e, RateLimitedError)
+                        logger.warning(f"Falha em {method} via {endpoint.name}, tentando próximo endpoint: {e}")
+
+                if not self.pool.retry_rate_limited(limited, attempt):
+                    break
+
+            raise ConnectionError(f"Todos os endpoints RPC falharam em {method}: {'; '.join(errors)}")
+        finally:
+            observe_rpc(method, time.perf_counter() - started - waited, ok)
+
+    def make_request(self, method, params) -> Dict[str, Any]:
+        return self._dispatch(method, self.encode_rpc_request(method, params))
+
+    def make_raw_batch(self, payload: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Envia um batch JSON-RPC já montado (lista de requisições) num único POST"""
+        cost = None
+        if self.pool.limiter is not None:
+            cost = sum(self.pool.limiter.cost(request["method"]) for request in payload)
+        for method, count in Counter(request["method"] for request in payload).items():
+            child(RPC_BATCH_ITEMS, method).inc(count)
+        response = self._dispatch("batch", json.dumps(payload).encode(), cost)
+        if not isinstance(response, list):
+            # Alguns provedores respondem ao batch inteiro com um único erro
+            raise ValueError(f"Resposta inválida para batch JSON-RPC: {response}")
+        if self.pool.limiter is not None and any(is_rate_limited(item) for item in response):
+            # Limite em parte dos itens: freia o bucket antes do reenvio
+            self.pool.limiter.penalize()
+        return response
+
+
+class AsyncFailoverHTTPProvider(AsyncJSONBaseProvider):
+    def __init__(self, pool: ProviderPool, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pool = pool
+        # aiohttp amarra a sessão ao event loop em que foi criada
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def __str__(self) -> str:
+        return f"AsyncFailoverHTTPProvider({', '.join(e.name for e in self.pool.endpoints)})"
+
+    def _client(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.pool.timeout)
+            )
+        return self._session
+
+    async def disconnect(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _post(self, endpoint: EndpointHealth, body: bytes) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            async with self._client().post(endpoint.url, data=body, headers=HEADERS) as response:
+                check_status(response.status, response.headers.get("Retry-After"))
+                result = check_response(self.decode_rpc_response(await response.read()))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            raise self.pool.failed(endpoint, time.monotonic() - started, e) from e
+        self.pool.record(endpoint, time.monotonic() - started, True)
+        return result
+
+    async def _hedged(self, primary: EndpointHealth, secondary: EndpointHealth, body: bytes) -> Dict[str, Any]:
+        tasks = [asyncio.ensure_future(self._post(primary, body))]
+        done, _ = await asyncio.wait(tasks, timeout=self.pool.hedge_deadline(primary))
+        if not done or tasks[0].exception() is not None:
+            if not done:
+                self.pool.record_hedge(secondary)
+            tasks.append(asyncio.ensure_future(self._post(secondary, body)))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def make_request(self, method, params) -> Dict[str, Any]:
+        body = self.encode_rpc_request(method, params)
+        errors = []
+        started = time.perf_counter()
+        waited = 0.0
+        ok = False
+        try:
+            for attempt in range(2):
+                if self.pool.limiter is not None:
+                    waited += await self.pool.limiter.acquire(method)
+                ranked = self.pool.ranked()
+                limited = False
+
+                start = 0
+                if self.pool.should_hedge(method, ranked):
+                    try:
+                        result = await self._hedged(ranked[0], ranked[1], body)
+                        ok = True
+                        return result
+                    except EndpointError as e:
+                        errors.append(str(e))
+                        limited = isinstance(e, RateLimitedError)
+                        start = 2
+
+                for endpoint in ranked[start:]:
+                    try:
+                        result = await self._post(endpoint, body)
+                        ok = True
+                        return result
+                    except EndpointError as e:
+                        errors.append(str(e))
+                        limited = limited or isinstance(e, RateLimitedError)
+                        logger.warning(f"Falha em {method} via {endpoint.name}, tentando próximo endpoint: {e}")
+
+                if not self.pool.retry_rate_limited(limited, attempt):
+                    break
+
+            raise ConnectionError(f"Todos os endpoints RPC falharam em {method}: {'; '.join(errors)}")
+        finally:
+            observe_rpc(method, time.perf_counter() - started - waited, ok)
@@ -0,0 +1,178 @@
+"""
+Token bucket para chamadas RPC
+
+Permite rajadas de até `burst` unidades e reabastece `rate` unidades por
+segundo, em vez de um intervalo fixo entre cada chamada. Com uma tabela de
+custos, cada método debita suas compute units (eth_getLogs pesa mais que
+eth_call); sem ela, toda chamada custa 1.
+
+Uma única instância é compartilhada entre threads e event loops: o débito é
+feito sob um lock e a espera acontece fora dele (time.sleep em wait(),
+asyncio.sleep em acquire()).
+
+Ao receber 429 (ou erro de rate limit), penalize() bloqueia o bucket pelo
+Retry-After (ou por um backoff exponencial) e corta a taxa pela metade; a
+taxa volta linearmente ao valor configurado em `recovery` segundos. Um
+bloqueio com chave (ex.: "telegram") só afeta quem adquire com essa chave.
+"""
+
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Union
+
+# Compute units por método (tabela da Alchemy); métodos fora dela custam DEFAULT_COST
+COMPUTE_UNITS: Dict[str, float] = {
+    "eth_chainId": 0,
+    "net_version": 0,
+    "eth_blockNumber": 10,
+    "eth_feeHistory": 10,
+    "eth_gasPrice": 20,
+    "eth_maxPriorityFeePerGas": 10,
+    "eth_getBalance": 19,
+    "eth_getCode": 26,
+    "eth_getStorageAt": 17,
+    "eth_getTransactionCount": 26,
+    "eth_getBlockByNumber": 16,
+    "eth_getTransactionReceipt": 15,
+    "eth_call": 26,
+    "eth_estimateGas": 87,
+    "eth_getLogs": 75,
+    "eth_sendRawTransaction": 250,
+    # Não é RPC: mensagem do notificador, para dividir o mesmo orçamento
+    "telegram": 26,
+}
+DEFAULT_COST = 26
+
+Cost = Union[float, str]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After em segundos ou como data HTTP"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, costs: Optional[Dict[str, float]] = None,
+                 min_rate_fraction: float = 0.1, recovery: float = 60.0, max_backoff: float = 60.0):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.costs = costs
+        self.min_rate = rate * min_rate_fraction
+        self.recovery = recovery
+        self.max_backoff = max_backoff
+        self.updated = time.monotonic()
+        self.blocked_until: Dict[Optional[str], float] = {}
+        self.strikes: Dict[Optional[str], int] = {}
+        self.acquired = 0
+        self.rate_limited = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def cost(self, cost: Cost) -> float:
+        if not isinstance(cost, str):
+            return float(cost)
+        if self.costs is None:
+            return 1.0
+        return float(self.costs.get(cost, DEFAULT_COST))
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + elapsed * self.max_rate / self.recovery)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def _take(self, cost: float, key: Optional[str]) -> float:
+        """Debita e devolve 0, ou devolve quantos segundos esperar antes de tentar de novo"""
+        # Custo acima da capacidade (batch grande) sai com o bucket cheio e deixa saldo negativo
+        needed = min(cost, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            blocked = max(self.blocked_until.get(None, 0.0), self.blocked_until.get(key, 0.0) if key else 0.0)
+            if blocked > now:
+                delay = blocked - now
+            else:
+                self._refill(now)
+                if self.tokens >= needed:
+                    self.tokens -= cost
+                    self.acquired += 1
+                    return 0.0
+                delay = (needed - self.tokens) / self.rate
+            self.waited += delay
+            return delay
+
+    def wait(self, cost: Cost = 1.0, key: Optional[str] = None) -> float:
+        """Versão bloqueante, para threads. Devolve o tempo total de espera"""
+        units = self.cost(cost)
+        waited = 0.0
+        while True:
+            delay = self._take(units, key)
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def acquire(self, cost: Cost = 1.0, key: Optional[str] = None) -> float:
+        units = self.cost(cost)
+        waited = 0.0
+        while True:
+            delay = self._take(units, key)
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def penalize(self, retry_after: Optional[float] = None, key: Optional[str] = None) -> float:
+        """
+        Registra um 429: bloqueia pelo Retry-After ou por backoff exponencial.
+        Sem chave, também corta a taxa pela metade. Devolve o bloqueio aplicado.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            blocked_until = self.blocked_until.get(key, 0.0)
+            # Backoff recomeça depois de um período sem 429
+            strikes = self.strikes.get(key, 0) if now - blocked_until < self.max_backoff else 0
+            # Vários 429 dentro do mesmo bloqueio contam como um só
+            if blocked_until <= now:
+                strikes += 1
+                self.strikes[key] = strikes
+                if key is None:
+                    self.rate = max(self.min_rate, self.rate / 2)
+            delay = retry_after if retry_after is not None else min(self.max_backoff, 2.0 ** (strikes - 1))
+            self.blocked_until[key] = max(self.blocked_until.get(key, 0.0), now + delay)
+            self.rate_limited += 1
+            return delay
+
+    def utilization(self) -> float:
+        """Fração do bucket consumida (0 = cheio, 1 = vazio, acima de 1 = em débito)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return 1.0 - self.tokens / self.capacity
+
+    def stats(self) -> Dict[str, Any]:
+        utilization = self.utilization()
+        with self._lock:
+            return {
+                "utilization": round(utilization, 4),
+                "rate": round(self.rate, 2),
+                "max_rate": self.max_rate,
+                "capacity": self.capacity,
+                "acquired": self.acquired,
+                "rate_limited": self.rate_limited,
+                "waited_s": round(self.waited, 3),  # soma das esperas de todos os chamadores
+                "blocked": self.blocked_until.get(None, 0.0) > time.monotonic(),
+            }
@@ -0,0 +1,379 @@
+"""
+Histórico de preços e oportunidades em colunas NumPy
+
+Cada snapshot (um preço por pool e par) e cada oportunidade detectada vão
+para data/history em segmentos diários, uma coluna por arquivo binário de
+largura fixa (block.bin, pair.bin, price.bin...). Tokens e DEXs viram ids
+inteiros num dicionário JSON ao lado, então uma linha de preço ocupa 26
+bytes.
+
+O caminho quente só enfileira a tabela ou as oportunidades; a conversão em
+linhas e as escritas acontecem numa thread de fundo, em blocos.
+
+A leitura abre as colunas com np.memmap: só as páginas das colunas e do
+intervalo de tempo consultados saem do disco, então semanas de histórico
+cabem numa consulta sem carregar tudo em memória. O intervalo é achado com
+busca binária no timestamp, que só cresce dentro de um segmento.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.pricing.price_table import Opportunity, PriceTable
+
+logger = logging.getLogger(__name__)
+
+PRICES = "prices"
+OPPORTUNITIES = "opportunities"
+
+SCHEMAS: Dict[str, Dict[str, np.dtype]] = {
+    PRICES: {
+        "timestamp": np.dtype("<u4"),
+        "block": np.dtype("<i8"),      # -1 quando o ciclo não foi fixado num bloco
+        "pair": np.dtype("<u4"),       # par canônico (token0 < token1)
+        "dex": np.dtype("<u2"),
+        "price": np.dtype("<f8"),      # token1 por token0
+    },
+    OPPORTUNITIES: {
+        "timestamp": np.dtype("<u4"),
+        "block": np.dtype("<i8"),
+        "pair": np.dtype("<u4"),
+        "reversed": np.dtype("u1"),    # 1 quando token_in é o token1 do par canônico
+        "kind": np.dtype("u1"),
+        "status": np.dtype("u1"),
+        "dex_buy": np.dtype("<u2"),
+        "dex_sell": np.dtype("<u2"),
+        "price_buy": np.dtype("<f8"),
+        "price_sell": np.dtype("<f8"),
+        "profit": np.dtype("<f4"),
+        "gross_profit": np.dtype("<f4"),
+        "simulated_profit": np.dtype("<f4"),  # NaN sem simulação
+    },
+}
+
+# kind
+SPREAD = 0
+MULTI_HOP = 1
+
+# status
+NOT_SIMULATED = 0
+APPROVED = 1
+REJECTED = 2
+
+
+def canonical_pair(token_a: str, token_b: str) -> Tuple[str, str]:
+    token_a, token_b = token_a.lower(), token_b.lower()
+    return (token_a, token_b) if token_a < token_b else (token_b, token_a)
+
+
+def segment_name(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y%m%d")
+
+
+class Dictionary:
+    """Strings (pares, DEXs) <-> ids inteiros, persistido em JSON"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pairs: List[str] = []
+        self.dexes: List[str] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.pairs = data.get("pairs", [])
+            self.dexes = data.get("dexes", [])
+        self._pair_ids = {pair: index for index, pair in enumerate(self.pairs)}
+        self._dex_ids = {dex: index for index, dex in enumerate(self.dexes)}
+        self.dirty = False
+
+    def pair_id(self, token_a: str, token_b: str) -> int:
+        key = "/".join(canonical_pair(token_a, token_b))
+        index = self._pair_ids.get(key)
+        if index is None:
+            index = self._pair_ids[key] = len(self.pairs)
+            self.pairs.append(key)
+            self.dirty = True
+        return index
+
+    def path_id(self, tokens: Sequence[str]) -> int:
+        # Ciclos multi-hop: a rota inteira vira um "par"
+        key = ">".join(token.lower() for token in tokens)
+        index = self._pair_ids.get(key)
+        if index is None:
+            index = self._pair_ids[key] = len(self.pairs)
+            self.pairs.append(key)
+            self.dirty = True
+        return index
+
+    def dex_id(self, dex: str) -> int:
+        index = self._dex_ids.get(dex)
+        if index is None:
+            index = self._dex_ids[dex] = len(self.dexes)
+            self.dexes.append(dex)
+            self.dirty = True
+        return index
+
+    def find_pair(self, token_a: str, token_b: str) -> Optional[int]:
+        return self._pair_ids.get("/".join(canonical_pair(token_a, token_b)))
+
+    def find_dex(self, dex: str) -> Optional[int]:
+        return self._dex_ids.get(dex)
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"pairs": self.pairs, "dexes": self.dexes}, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+class HistoryWriter:
+    def __init__(self, root: str, flush_rows: int = 50_000, flush_interval: float = 5.0, max_queue: int = 1000):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.dictionary = Dictionary(os.path.join(root, "dictionary.json"))
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(max_queue)
+        self._buffers = self._empty_buffers()
+        self._buffered = 0
+        self._flushed_at = time.monotonic()
+        self.stats = {"snapshots": 0, "price_rows": 0, "opportunity_rows": 0, "dropped": 0, "flushes": 0}
+        self._worker = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._worker.start()
+
+    @staticmethod
+    def _empty_buffers() -> Dict[str, Dict[str, Dict[str, list]]]:
+        # tabela -> segmento -> coluna -> valores
+        return {
+            table: defaultdict(lambda table=table: {column: [] for column in SCHEMAS[table]})
+            for table in SCHEMAS
+        }
+
+    # --- caminho quente: só enfileira ---
+
+    def _put(self, item) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def record_snapshot(self, table: PriceTable, timestamp: Optional[float] = None) -> None:
+        self._put((self._add_snapshot, table, timestamp or time.time()))
+
+    def record_opportunities(self, block: Optional[int], opportunities: Iterable[Tuple[Opportunity, int, Optional[float]]],
+                             timestamp: Optional[float] = None) -> None:
+        """opportunities: (oportunidade, status, lucro simulado ou None)"""
+        self._put((self._add_opportunities, (block, list(opportunities)), timestamp or time.time()))
+
+    def record_cycle(self, block: Optional[int], cycle, timestamp: Optional[float] = None) -> None:
+        self._put((self._add_cycle, (block, cycle), timestamp or time.time()))
+
+    # --- thread de fundo ---
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is not None:
+                if item[0] is None:
+                    self._flush()
+                    return
+                handler, payload, timestamp = item
+                try:
+                    handler(payload, timestamp)
+                except Exception as e:
+                    logger.error(f"Erro ao registrar histórico: {e}")
+            if self._buffered >= self.flush_rows or time.monotonic() - self._flushed_at >= self.flush_interval:
+                try:
+                    self._flush()
+                except Exception as e:
+                    logger.error(f"Erro ao gravar histórico: {e}")
+
+    def _append(self, table: str, segment: str, row: tuple) -> None:
+        columns = self._buffers[table][segment]
+        for column, value in zip(columns.values(), row):
+            column.append(value)
+        self._buffered += 1
+
+    def _add_snapshot(self, table: PriceTable, timestamp: float) -> None:
+        block = -1 if table.block is None else table.block
+        segment = segment_name(timestamp)
+        rows = 0
+        for (token_in, token_out), quotes in table.pairs():
+            # A tabela guarda os dois sentidos: só o canônico vai para o disco
+            if token_in > token_out:
+                continue
+            pair = self.dictionary.pair_id(token_in, token_out)
+            for dex, price in quotes.items():
+                self._append(PRICES, segment, (int(timestamp), block, pair, self.dictionary.dex_id(dex), price))
+                rows += 1
+        self.stats["snapshots"] += 1
+        self.stats["price_rows"] += rows
+
+    def _add_opportunities(self, payload, timestamp: float) -> None:
+        block, opportunities = payload
+        block = -1 if block is None else block
+        segment = segment_name(timestamp)
+        for opportunity, status, simulated in opportunities:
+            self._append(OPPORTUNITIES, segment, (
+                int(timestamp), block, self.dictionary.pair_id(opportunity.token_in, opportunity.token_out),
+                int(opportunity.token_in.lower() > opportunity.token_out.lower()), SPREAD, status,
+                self.dictionary.dex_id(opportunity.dex_buy), self.dictionary.dex_id(opportunity.dex_sell),
+                opportunity.price_buy, opportunity.price_sell, opportunity.profit,
+                opportunity.profit if opportunity.gross_profit is None else opportunity.gross_profit,
+                np.nan if simulated is None else simulated,
+            ))
+        self.stats["opportunity_rows"] += len(opportunities)
+
+    def _add_cycle(self, payload, timestamp: float) -> None:
+        block, cycle = payload
+        pools = self.dictionary.dex_id(" > ".join(cycle.pools))
+        self._append(OPPORTUNITIES, segment_name(timestamp), (
+            int(timestamp), -1 if block is None else block, self.dictionary.path_id(cycle.tokens), 0, MULTI_HOP,
+            NOT_SIMULATED, pools, pools, np.nan, np.nan, cycle.profit, cycle.profit, np.nan,
+        ))
+        self.stats["opportunity_rows"] += 1
+
+    def _flush(self) -> None:
+        self._flushed_at = time.monotonic()
+        if not self._buffered:
+            return
+        # Buffers trocados antes de gravar: uma falha perde o bloco, não repete linhas
+        buffers, self._buffers, self._buffered = self._buffers, self._empty_buffers(), 0
+        # Dicionário antes das colunas: um leitor nunca vê um id sem nome
+        self.dictionary.save()
+        for table, segments in buffers.items():
+            for segment, columns in segments.items():
+                directory = os.path.join(self.root, table, segment)
+                os.makedirs(directory, exist_ok=True)
+                for column, values in columns.items():
+                    with open(os.path.join(directory, f"{column}.bin"), "ab") as f:
+                        f.write(np.asarray(values, dtype=SCHEMAS[table][column]).tobytes())
+        self.stats["flushes"] += 1
+
+    def flush(self) -> None:
+        """Espera a fila esvaziar e grava o que estiver em buffer"""
+        done = threading.Event()
+
+        def flush_now(payload, timestamp) -> None:
+            try:
+                self._flush()
+            finally:
+                done.set()
+
+        self._queue.put((flush_now, None, 0))
+        done.wait()
+
+    def close(self) -> None:
+        self._queue.put((None, None, None))
+        self._worker.join()
+
+
+class HistoryReader:
+    def __init__(self, root: str):
+        self.root = root
+        self.dictionary = Dictionary(os.path.join(root, "dictionary.json"))
+
+    def segments(self, table: str, start: Optional[float] = None, end: Optional[float] = None) -> List[str]:
+        directory = os.path.join(self.root, table)
+        if not os.path.isdir(directory):
+            return []
+        first = segment_name(start) if start is not None else ""
+        last = segment_name(end) if end is not None else "99999999"
+        return sorted(name for name in os.listdir(directory) if first <= name <= last)
+
+    def open_segment(self, table: str, segment: str) -> Dict[str, np.ndarray]:
+        """Colunas do segmento em memmap; uma escrita cortada no meio fica de fora"""
+        directory = os.path.join(self.root, table, segment)
+        schema = SCHEMAS[table]
+        sizes = {column: os.path.getsize(os.path.join(directory, f"{column}.bin")) // dtype.itemsize
+                 for column, dtype in schema.items()}
+        rows = min(sizes.values())
+        if rows == 0:
+            return {column: np.empty(0, dtype) for column, dtype in schema.items()}
+        return {
+            column: np.memmap(os.path.join(directory, f"{column}.bin"), dtype=dtype, mode="r", shape=(rows,))
+            for column, dtype in schema.items()
+        }
+
+    def scan(self, table: str, start: Optional[float] = None, end: Optional[float] = None,
+             segments: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Fatias [start, end) de cada segmento (ou só dos pedidos), ainda em memmap"""
+        for segment in self.segments(table, start, end) if segments is None else segments:
+            columns = self.open_segment(table, segment)
+            timestamps = columns["timestamp"]
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, "left"))
+            hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, "left"))
+            if hi > lo:
+                yield {column: values[lo:hi] for column, values in columns.items()}
+
+    def prices(self, token_a: str, token_b: str, dex: str, start: Optional[float] = None,
+               end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(timestamp, block, preço token_b por token_a) de um pool ao longo do tempo"""
+        pair, dex_id = self.dictionary.find_pair(token_a, token_b), self.dictionary.find_dex(dex)
+        parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        if pair is not None and dex_id is not None:
+            for columns in self.scan(PRICES, start, end):
+                mask = (columns["pair"] == pair) & (columns["dex"] == dex_id)
+                parts.append((columns["timestamp"][mask], columns["block"][mask], columns["price"][mask]))
+        if not parts:
+            return np.empty(0, "<u4"), np.empty(0, "<i8"), np.empty(0, "<f8")
+        timestamps, blocks, prices = (np.concatenate(column) for column in zip(*parts))
+        if token_a.lower() > token_b.lower():
+            prices = 1 / prices
+        return timestamps, blocks, prices
+
+    def spread_distribution(self, token_a: str, token_b: str, dex_buy: str, dex_sell: str,
+                            start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Spread relativo (venda / compra - 1) do par entre duas DEXs, snapshot a snapshot"""
+        buy_times, buy_blocks, buy = self.prices(token_a, token_b, dex_buy, start, end)
+        sell_times, sell_blocks, sell = self.prices(token_a, token_b, dex_sell, start, end)
+        # Casa os dois lados pelo mesmo snapshot (bloco quando houver, senão o segundo)
+        buy_keys = np.where(buy_blocks >= 0, buy_blocks, -buy_times.astype(np.int64))
+        sell_keys = np.where(sell_blocks >= 0, sell_blocks, -sell_times.astype(np.int64))
+        _, buy_index, sell_index = np.intersect1d(buy_keys, sell_keys, assume_unique=False, return_indices=True)
+        return sell[sell_index] / buy[buy_index] - 1
+
+    def hit_rates(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Por par: snapshots com preço, snapshots com oportunidade e aprovadas na simulação"""
+        snapshots: Dict[int, int] = defaultdict(int)
+        for columns in self.scan(PRICES, start, end):
+            # Um snapshot por (par, timestamp): vários pools do par no mesmo ciclo contam uma vez
+            keys = np.unique(columns["pair"].astype(np.uint64) << np.uint64(32) | columns["timestamp"])
+            pairs, counts = np.unique(keys >> np.uint64(32), return_counts=True)
+            for pair, count in zip(pairs.tolist(), counts.tolist()):
+                snapshots[pair] += count
+
+        hits: Dict[int, int] = defaultdict(int)
+        approved: Dict[int, int] = defaultdict(int)
+        for columns in self.scan(OPPORTUNITIES, start, end):
+            spread = columns["kind"] == SPREAD
+            for target, mask in ((hits, spread), (approved, spread & (columns["status"] == APPROVED))):
+                keys = np.unique(columns["pair"][mask].astype(np.uint64) << np.uint64(32) | columns["timestamp"][mask])
+                pairs, counts = np.unique(keys >> np.uint64(32), return_counts=True)
+                for pair, count in zip(pairs.tolist(), counts.tolist()):
+                    target[pair] += count
+
+        rates = {}
+        for pair, total in snapshots.items():
+            rates[self.dictionary.pairs[pair]] = {
+                "snapshots": total,
+                "with_opportunity": hits[pair],
+                "approved": approved[pair],
+                "hit_rate": hits[pair] / total,
+            }
+        return rates
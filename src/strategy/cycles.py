@@ -0,0 +1,306 @@
+"""
+Detecção de ciclos multi-hop num grafo de tokens
+
+Cada pool vira duas arestas dirigidas entre tokens com peso -log(taxa), a
+taxa já líquida da fee do pool (preço * (1 - fee)); um ciclo é lucrativo
+quando a soma dos pesos é negativa. Só a melhor aresta de cada par
+(token_in, token_out) entra na busca, que é um DFS limitado a ciclos de 2 a
+`max_length` hops (o tamanho que o contrato executa), em vez de
+Bellman-Ford/SPFA, que acham um ciclo negativo qualquer sem limite de
+tamanho e sem enumerar os demais.
+
+O grafo é atualizado incrementalmente: mudar o preço de um pool só marca
+as arestas afetadas como sujas, e a busca parte apenas delas (todo ciclo
+que ficou lucrativo contém uma aresta alterada).
+
+Para podar a busca, cada token recebe um potencial φ (log do preço relativo,
+fixado quando o token entra no grafo e recentralizado por rebalance()) e a
+adjacência guarda o peso reduzido w + φ(u) - φ(v). A soma de um ciclo não
+muda, mas os pesos reduzidos ficam perto de zero (≈ fee), então com as
+listas de saída ordenadas a busca para assim que o limite inferior do
+caminho passa do threshold.
+"""
+
+import math
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from src.pricing.price_table import PriceTable
+
+Edge = Tuple[int, int]
+
+
+class Cycle(NamedTuple):
+    tokens: Tuple[str, ...]   # tokens[0] -> tokens[1] -> ... -> tokens[0]
+    pools: Tuple[str, ...]    # pool usado em cada hop
+    rates: Tuple[float, ...]  # taxa de cada hop
+    profit: float
+
+
+class TokenGraph:
+    """Grafo dirigido token -> token com a melhor taxa de cada par entre todos os pools"""
+
+    __slots__ = (
+        "max_length", "_index", "_tokens", "_potential", "_edges", "_best", "_out", "_in",
+        "_sorted_out", "_min_in", "_dirty"
+    )
+
+    def __init__(self, max_length: int = 4):
+        if not 2 <= max_length <= 4:
+            raise ValueError("max_length deve estar entre 2 e 4")
+        self.max_length = max_length
+        self._index: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._potential: List[Optional[float]] = []
+        # (u, v) -> {pool: peso} e melhor (peso, pool) de cada aresta
+        self._edges: Dict[Edge, Dict[str, float]] = {}
+        self._best: Dict[Edge, Tuple[float, str]] = {}
+        # Adjacência com o peso reduzido da melhor aresta: _out[u][v] e _in[v][u]
+        self._out: List[Dict[int, float]] = []
+        self._in: List[Dict[int, float]] = []
+        # Caches por nó, invalidados quando a adjacência do nó muda
+        self._sorted_out: List[Optional[List[Tuple[float, int]]]] = []
+        self._min_in: List[Optional[float]] = []
+        self._dirty: Set[Edge] = set()
+
+    def __len__(self) -> int:
+        return len(self._best)
+
+    @property
+    def token_count(self) -> int:
+        return len(self._tokens)
+
+    def _token(self, address: str) -> int:
+        address = address.lower()
+        index = self._index.get(address)
+        if index is None:
+            index = len(self._tokens)
+            self._index[address] = index
+            self._tokens.append(address)
+            self._potential.append(None)
+            self._out.append({})
+            self._in.append({})
+            self._sorted_out.append(None)
+            self._min_in.append(None)
+        return index
+
+    # --- Atualização ---
+
+    def set_rate(self, pool: str, token_in: str, token_out: str, rate: float) -> bool:
+        """Define a taxa de um sentido do pool; devolve True se a melhor aresta do par mudou"""
+        if not rate or rate <= 0:
+            return self.remove_rate(pool, token_in, token_out)
+        edge = (self._token(token_in), self._token(token_out))
+        weight = -math.log(rate)
+        pools = self._edges.setdefault(edge, {})
+        if pools.get(pool) == weight:
+            return False
+        pools[pool] = weight
+
+        best = self._best.get(edge)
+        if best is None or weight < best[0]:
+            return self._set_best(edge, (weight, pool))
+        if best[1] == pool:
+            return self._set_best(edge, min((w, p) for p, w in pools.items()))
+        return False
+
+    def remove_rate(self, pool: str, token_in: str, token_out: str) -> bool:
+        index_in, index_out = self._index.get(token_in.lower()), self._index.get(token_out.lower())
+        edge = (index_in, index_out)
+        pools = self._edges.get(edge)
+        if pools is None or pools.pop(pool, None) is None:
+            return False
+        if pools:
+            if self._best[edge][1] != pool:
+                return False
+            return self._set_best(edge, min((w, p) for p, w in pools.items()))
+
+        del self._edges[edge]
+        del self._best[edge]
+        del self._out[index_in][index_out]
+        del self._in[index_out][index_in]
+        self._sorted_out[index_in] = None
+        self._min_in[index_out] = None
+        self._dirty.discard(edge)
+        return True
+
+    def update_pool(self, pool: str, token0: str, token1: str, price: float, fee_bps: int = 0) -> bool:
+        """price = token1 por 1 token0; a taxa de cada sentido desconta a fee do pool"""
+        if not price or price <= 0:
+            changed = self.remove_rate(pool, token0, token1)
+            return self.remove_rate(pool, token1, token0) or changed
+        keep = 1 - fee_bps / 10_000
+        changed = self.set_rate(pool, token0, token1, price * keep)
+        return self.set_rate(pool, token1, token0, keep / price) or changed
+
+    def update_from_table(self, table: PriceTable, fees: Optional[Dict[str, float]] = None) -> int:
+        """
+        Sincroniza com a tabela do ciclo (pool = rótulo na tabela); cada pool
+        entra por update_pool com a sua fee (fração por rótulo, como no
+        Detector; rótulo sem fee conhecida entra sem desconto). Devolve
+        quantos pools mudaram.
+        """
+        fees = fees or {}
+        changed = 0
+        seen: Set[Tuple[Edge, str]] = set()
+        for (token_in, token_out), quotes in table.pairs():
+            # A tabela guarda os dois sentidos de cada pool: só o par ordenado é lido
+            if token_in > token_out:
+                continue
+            for dex_name, price in quotes.items():
+                fee_bps = round(fees.get(dex_name, 0.0) * 10_000)
+                changed += self.update_pool(dex_name, token_in, token_out, price, fee_bps)
+                index_in, index_out = self._index[token_in], self._index[token_out]
+                seen.add(((index_in, index_out), dex_name))
+                seen.add(((index_out, index_in), dex_name))
+
+        # Pools que não vieram nesta tabela saem do grafo em vez de ficar com preço velho
+        stale = [(edge, pool) for edge, pools in self._edges.items() for pool in pools if (edge, pool) not in seen]
+        for (index_in, index_out), pool in stale:
+            changed += self.remove_rate(pool, self._tokens[index_in], self._tokens[index_out])
+        return changed
+
+    def _set_best(self, edge: Edge, best: Tuple[float, str]) -> bool:
+        previous = self._best.get(edge)
+        self._best[edge] = best
+        if previous is not None and previous[0] == best[0]:
+            return previous[1] != best[1]
+
+        index_in, index_out = edge
+        potential = self._potential
+        # O primeiro preço visto de um token fixa seu potencial relativo ao vizinho
+        if potential[index_in] is None and potential[index_out] is None:
+            potential[index_in] = 0.0
+        if potential[index_out] is None:
+            potential[index_out] = potential[index_in] + best[0]
+        elif potential[index_in] is None:
+            potential[index_in] = potential[index_out] - best[0]
+
+        reduced = best[0] + potential[index_in] - potential[index_out]
+        self._out[index_in][index_out] = reduced
+        self._in[index_out][index_in] = reduced
+        self._sorted_out[index_in] = None
+        self._min_in[index_out] = None
+        self._dirty.add(edge)
+        return True
+
+    def rebalance(self, sweeps: int = 4) -> None:
+        """
+        Recentraliza os potenciais pela média dos vizinhos (Gauss-Seidel). Os
+        potenciais iniciais acumulam o ruído da primeira aresta de cada token;
+        depois de rebalancear, os pesos reduzidos ficam mais perto de zero e a
+        poda corta mais cedo. A soma dos ciclos não muda.
+        """
+        neighbours: List[Dict[int, float]] = [{} for _ in self._tokens]
+        for (u, v), (weight, _) in self._best.items():
+            # φ(v) - φ(u) estimado por (w(u->v) - w(v->u)) / 2, que cancela a fee dos dois sentidos
+            reverse = self._best.get((v, u))
+            delta = (weight - reverse[0]) / 2 if reverse is not None else weight
+            neighbours[v][u] = delta
+            neighbours[u].setdefault(v, -delta)
+
+        potential = self._potential
+        for _ in range(sweeps):
+            for node, adjacent in enumerate(neighbours):
+                if adjacent:
+                    potential[node] = sum(potential[u] + delta for u, delta in adjacent.items()) / len(adjacent)
+
+        for (u, v), (weight, _) in self._best.items():
+            reduced = weight + potential[u] - potential[v]
+            self._out[u][v] = reduced
+            self._in[v][u] = reduced
+        self._sorted_out = [None] * len(self._tokens)
+        self._min_in = [None] * len(self._tokens)
+
+    def rate(self, token_in: str, token_out: str) -> Optional[float]:
+        edge = (self._index.get(token_in.lower()), self._index.get(token_out.lower()))
+        best = self._best.get(edge)
+        return math.exp(-best[0]) if best is not None else None
+
+    # --- Busca de ciclos ---
+
+    def _outgoing(self, node: int) -> List[Tuple[float, int]]:
+        ordered = self._sorted_out[node]
+        if ordered is None:
+            ordered = sorted((w, v) for v, w in self._out[node].items())
+            self._sorted_out[node] = ordered
+        return ordered
+
+    def _min_incoming(self, node: int) -> float:
+        lowest = self._min_in[node]
+        if lowest is None:
+            lowest = min(self._in[node].values(), default=math.inf)
+            self._min_in[node] = lowest
+        return lowest
+
+    def find_cycles(self, min_profit: float = 0.0, full: bool = False) -> List[Cycle]:
+        """
+        Ciclos com lucro > min_profit. Por padrão só os que passam por arestas
+        alteradas desde a última busca; full=True rebalanceia os potenciais e
+        varre o grafo inteiro.
+        """
+        if full:
+            self.rebalance()
+        edges = list(self._best) if full else list(self._dirty)
+        self._dirty.clear()
+        if not edges:
+            return []
+
+        threshold = -math.log1p(min_profit)
+        out, incoming, best = self._out, self._in, self._best
+        # Limite inferior de um hop intermediário qualquer (só entra se for negativo)
+        slack = min(0.0, min((w for adjacency in out for w in adjacency.values()), default=0.0))
+        found: Dict[Tuple[int, ...], None] = {}
+
+        for start, first in edges:
+            w0 = out[start].get(first)
+            if w0 is None:
+                continue
+            in_start = incoming[start]
+            min_in_start = self._min_incoming(start)
+
+            # 2 hops: start -> first -> start (o mesmo pool nos dois sentidos nunca dá lucro)
+            w = in_start.get(first)
+            if w is not None and w0 + w < threshold and best[(start, first)][1] != best[(first, start)][1]:
+                found[(start, first)] = None
+            if self.max_length < 3:
+                continue
+
+            extra = slack if self.max_length == 4 else 0.0
+            for w1, second in self._outgoing(first):
+                partial = w0 + w1
+                if partial + extra + min_in_start >= threshold:
+                    break
+                if second == start:
+                    continue
+                # 3 hops: start -> first -> second -> start
+                w = in_start.get(second)
+                if w is not None and partial + w < threshold:
+                    found[(start, first, second)] = None
+                if self.max_length < 4:
+                    continue
+
+                # 4 hops: start -> first -> second -> third -> start
+                for w2, third in self._outgoing(second):
+                    if partial + w2 + min_in_start >= threshold:
+                        break
+                    w = in_start.get(third)
+                    if w is not None and third != first and third != start and partial + w2 + w < threshold:
+                        found[(start, first, second, third)] = None
+
+        cycles = {}
+        for nodes in found:
+            # Mesma rotação canônica para o ciclo achado a partir de arestas diferentes
+            pivot = nodes.index(min(nodes))
+            canonical = nodes[pivot:] + nodes[:pivot]
+            if canonical not in cycles:
+                cycles[canonical] = self._cycle(canonical)
+        return sorted(cycles.values(), key=lambda c: c.profit, reverse=True)
+
+    def _cycle(self, nodes: Tuple[int, ...]) -> Cycle:
+        hops = [self._best[(nodes[i], nodes[(i + 1) % len(nodes)])] for i in range(len(nodes))]
+        return Cycle(
+            tokens=tuple(self._tokens[node] for node in nodes),
+            pools=tuple(pool for _, pool in hops),
+            rates=tuple(math.exp(-weight) for weight, _ in hops),
+            profit=math.expm1(-sum(weight for weight, _ in hops)),
+        )
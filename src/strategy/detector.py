@@ -0,0 +1,32 @@
+"""
+Detecção de oportunidades sobre uma tabela de preços
+
+O mesmo código roda no monitor ao vivo e no replay do histórico: recebe uma
+PriceTable e devolve os spreads entre pools (score vetorizado, líquido das
+fees conhecidas) e os ciclos multi-hop. Não faz RPC nem olha o relógio.
+"""
+
+from typing import Dict, List, Optional
+
+from src.pricing.price_table import Opportunity, PriceTable
+from src.strategy.cycles import Cycle, TokenGraph
+from src.strategy.scoring import score_opportunities
+
+
+class Detector:
+    def __init__(self, min_profit: float, top_k: Optional[int] = None,
+                 fees: Optional[Dict[str, float]] = None, max_cycle_length: int = 4):
+        self.min_profit = min_profit
+        self.top_k = top_k
+        self.fees: Dict[str, float] = fees or {}    # fee por rótulo de pool
+        self.graph = TokenGraph(max_cycle_length)
+
+    def spreads(self, table: PriceTable) -> List[Opportunity]:
+        return score_opportunities(table, self.min_profit, self.top_k, self.fees)
+
+    def cycles(self, table: PriceTable) -> List[Cycle]:
+        # Grafo atualizado só nas arestas cujo preço mudou; a busca parte delas.
+        # Ciclos de 2 hops já saem em spreads() como idas e voltas entre DEXs.
+        full = len(self.graph) == 0
+        self.graph.update_from_table(table, self.fees)
+        return [cycle for cycle in self.graph.find_cycles(self.min_profit, full=full) if len(cycle.tokens) >= 3]
@@ -0,0 +1,93 @@
+"""
+Score vetorizado de spreads entre pools do mesmo par
+
+Para N pools de um par (token_in -> token_out), preços, fees e liquidez
+ficam em arrays NumPy e a matriz N×N de spreads sai de uma vez:
+
+    bruto[i, j] = preço[j] / preço[i] - 1                   (compra em i, venda em j)
+    líquido[i, j] = (1 - fee[i]) · (1 - fee[j]) · preço[j] / preço[i] - 1
+
+A diagonal e os pares abaixo de `min_liquidity` são mascarados, o threshold
+é aplicado sobre o spread líquido e só os top-k são convertidos de volta
+para objetos Python.
+"""
+
+from typing import List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.pricing.price_table import Opportunity, PriceTable
+
+
+class SpreadScorer:
+    """Preços, fees e liquidez de todos os pools de um par, em arrays"""
+
+    __slots__ = ("labels", "prices", "fees", "liquidity")
+
+    def __init__(self, labels: Sequence[str], prices, fees=None, liquidity=None):
+        self.labels = list(labels)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self.fees = np.zeros(len(self.labels)) if fees is None else np.asarray(fees, dtype=np.float64)
+        self.liquidity = None if liquidity is None else np.asarray(liquidity, dtype=np.float64)
+
+    @classmethod
+    def from_quotes(cls, quotes: Mapping[str, float], fees: Optional[Mapping[str, float]] = None,
+                    liquidity: Optional[Mapping[str, float]] = None) -> "SpreadScorer":
+        labels = list(quotes)
+        return cls(
+            labels,
+            [quotes[label] for label in labels],
+            None if fees is None else [fees.get(label, 0.0) for label in labels],
+            None if liquidity is None else [liquidity.get(label, 0.0) for label in labels],
+        )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def spreads(self):
+        """Matrizes (bruto, líquido) N×N; linha = pool de compra, coluna = pool de venda"""
+        ratio = self.prices[np.newaxis, :] / self.prices[:, np.newaxis]
+        keep = 1.0 - self.fees
+        gross = ratio - 1.0
+        net = ratio * keep[:, np.newaxis] * keep[np.newaxis, :] - 1.0
+        return gross, net
+
+    def top(self, min_profit: float, k: Optional[int] = None, min_liquidity: float = 0.0):
+        """Índices (compra, venda) e spreads dos até k melhores pares com spread líquido > min_profit"""
+        gross, net = self.spreads()
+        mask = net > min_profit
+        np.fill_diagonal(mask, False)
+        if self.liquidity is not None and min_liquidity > 0:
+            liquid = self.liquidity >= min_liquidity
+            mask &= liquid[:, np.newaxis] & liquid[np.newaxis, :]
+
+        candidates = np.flatnonzero(mask)
+        if k is not None and len(candidates) > k:
+            # argpartition seleciona os k maiores sem ordenar a matriz inteira
+            flat_net = net.ravel()[candidates]
+            candidates = candidates[np.argpartition(flat_net, -k)[-k:]]
+        candidates = candidates[np.argsort(net.ravel()[candidates])[::-1]]
+
+        buy, sell = np.unravel_index(candidates, net.shape)
+        return buy, sell, gross[buy, sell], net[buy, sell]
+
+
+def score_opportunities(table: PriceTable, min_profit: float, top_k: Optional[int] = None,
+                        fees: Optional[Mapping[str, float]] = None,
+                        liquidity: Optional[Mapping[str, float]] = None,
+                        min_liquidity: float = 0.0) -> List[Opportunity]:
+    """Equivalente vetorizado de find_arbitrage_opportunities, com threshold sobre o spread líquido"""
+    opportunities = []
+    for (token_in, token_out), quotes in table.pairs():
+        if len(quotes) < 2:
+            continue
+        scorer = SpreadScorer.from_quotes(quotes, fees, liquidity)
+        buy, sell, gross, net = scorer.top(min_profit, top_k, min_liquidity)
+        prices = scorer.prices
+        for i, j, gross_profit, net_profit in zip(buy.tolist(), sell.tolist(), gross.tolist(), net.tolist()):
+            opportunities.append(Opportunity(
+                token_in, token_out, scorer.labels[i], scorer.labels[j], float(prices[i]), float(prices[j]),
+                net_profit, gross_profit
+            ))
+    opportunities.sort(key=lambda o: o.profit, reverse=True)
+    return opportunities[:top_k] if top_k is not None else opportunities
@@ -0,0 +1,251 @@
+"""
+Tamanho ótimo de entrada para arbitragem de duas pernas
+
+Para um par pool de compra (tokenA -> tokenB) / pool de venda (tokenB ->
+tokenA), encontra o amountIn que maximiza o lucro líquido:
+
+    lucro = saída da venda - amountIn - prêmio do flash loan (Aave) - gás
+
+- Dois pools de produto constante: forma fechada. A composição das duas
+  curvas é z = K·x / (A + B·x), então dP/dx = 0 dá
+  x* = (sqrt(K·A / (1 + p)) - A) / B.
+- Qualquer outra combinação (V3 com cruzamento de ticks, curva estável,
+  MockDEX): busca de seção áurea sobre as funções de cotação exatas do
+  quoter, depois de um bracketing geométrico. O lucro é côncavo em
+  amountIn para AMMs, então a busca converge para o máximo global.
+
+Todos os valores são inteiros na unidade mínima de tokenA; gas_cost já deve
+vir convertido para tokenA pelo chamador.
+
+TradeSizer liga isso aos candidatos do detector: carrega, no bloco do
+snapshot e só para os pools envolvidos, o estado exato (metadata() dos
+Solidly, slot0/ticks dos V3), escolhe a forma fechada ou a busca numérica
+e limita o tamanho à liquidez do flash loan.
+"""
+
+import logging
+import math
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src.pricing.pool_reader import SOLIDLY, UNISWAP_V3
+from src.pricing.price_table import Opportunity
+from src.pricing.quoter import (
+    SolidlyPoolState, load_solidly_pool_states, load_v3_pool_states, solidly_volatile_amount_out
+)
+from src.rpc.multicall import Call
+
+logger = logging.getLogger(__name__)
+
+PERCENTAGE_FACTOR = 10_000
+INVERSE_PHI = (math.sqrt(5) - 1) / 2
+OUT_OF_RANGE = float("-inf")
+
+# Saída exata de uma perna; None quando o tamanho sai do estado conhecido do pool
+Quote = Callable[[int], Optional[int]]
+CallMany = Callable[[Sequence[Call], object], List[Optional[tuple]]]
+
+
+class TradeSize(NamedTuple):
+    amount_in: int
+    amount_out: int
+    flash_fee: int
+    gas_cost: int
+    net_profit: int
+
+    @property
+    def gross_profit(self) -> int:
+        return self.amount_out - self.amount_in
+
+
+def flash_loan_premium(amount: int, premium_bps: int) -> int:
+    # Aave PercentageMath.percentMul: arredonda meio para cima
+    return (amount * premium_bps + PERCENTAGE_FACTOR // 2) // PERCENTAGE_FACTOR
+
+
+def evaluate(amount_in: int, quote_buy: Quote, quote_sell: Quote, premium_bps: int,
+             gas_cost: int) -> Optional[TradeSize]:
+    """Lucro de um tamanho; None se alguma perna não cota esse tamanho"""
+    amount_out = 0
+    if amount_in > 0:
+        amount_mid = quote_buy(amount_in)
+        amount_out = quote_sell(amount_mid) if amount_mid is not None else None
+        if amount_out is None:
+            return None
+    flash_fee = flash_loan_premium(amount_in, premium_bps)
+    return TradeSize(amount_in, amount_out, flash_fee, gas_cost, amount_out - amount_in - flash_fee - gas_cost)
+
+
+def optimal_constant_product(reserve_in_buy: int, reserve_out_buy: int, reserve_in_sell: int, reserve_out_sell: int,
+                             fee_buy_bps: int = 30, fee_sell_bps: int = 30, premium_bps: int = 5,
+                             gas_cost: int = 0, max_amount: Optional[int] = None) -> Optional[TradeSize]:
+    """
+    Forma fechada para dois pools de produto constante (Solidly volátil / V2).
+    reserve_in_buy/reserve_out_buy: reservas de tokenA/tokenB no pool de compra;
+    reserve_in_sell/reserve_out_sell: reservas de tokenB/tokenA no pool de venda.
+    """
+    if min(reserve_in_buy, reserve_out_buy, reserve_in_sell, reserve_out_sell) <= 0:
+        return None
+
+    g1 = (PERCENTAGE_FACTOR - fee_buy_bps) / PERCENTAGE_FACTOR
+    g2 = (PERCENTAGE_FACTOR - fee_sell_bps) / PERCENTAGE_FACTOR
+    cost = 1 + premium_bps / PERCENTAGE_FACTOR
+
+    k = g1 * g2 * reserve_out_buy * reserve_out_sell
+    a = reserve_in_buy * reserve_in_sell
+    b = g1 * (reserve_in_sell + g2 * reserve_out_buy)
+    if k <= a * cost:
+        return None
+
+    amount_in = int((math.sqrt(k * a / cost) - a) / b)
+    if max_amount is not None:
+        amount_in = min(amount_in, max_amount)
+    if amount_in <= 0:
+        return None
+
+    # Lucro final com a matemática inteira exata do contrato
+    trade = evaluate(
+        amount_in,
+        lambda x: solidly_volatile_amount_out(x, reserve_in_buy, reserve_out_buy, fee_buy_bps),
+        lambda y: solidly_volatile_amount_out(y, reserve_in_sell, reserve_out_sell, fee_sell_bps),
+        premium_bps, gas_cost
+    )
+    return trade if trade is not None and trade.net_profit > 0 else None
+
+
+def optimal_numeric(quote_buy: Quote, quote_sell: Quote, premium_bps: int = 5, gas_cost: int = 0,
+                    max_amount: Optional[int] = None, initial_amount: int = 10**6, upper_bound: int = 10**30,
+                    growth: int = 4, rel_tol: float = 1e-6, max_iterations: int = 200) -> Optional[TradeSize]:
+    """Busca de seção áurea sobre cotações exatas; serve para curvas V3, estáveis ou mistas"""
+
+    def profit(x: int) -> float:
+        # Fora do estado conhecido vale -inf: o lucro segue unimodal e a busca fica aquém dele
+        trade = evaluate(x, quote_buy, quote_sell, premium_bps, 0)
+        return trade.net_profit if trade is not None else OUT_OF_RANGE
+
+    # Bracketing em escala geométrica: para ao passar do pico. Entradas pequenas demais
+    # arredondam a saída para zero, então só um lucro positivo conta como pico.
+    cap = max_amount if max_amount is not None else upper_bound
+    samples, values = [], []
+    x = max(1, min(initial_amount, cap))
+    while True:
+        samples.append(x)
+        values.append(profit(x))
+        best = max(values[:-1], default=0)
+        if (best > 0 and values[-1] < best) or values[-1] == OUT_OF_RANGE:
+            break
+        if x >= cap or len(samples) >= max_iterations:
+            break
+        x = min(cap, x * growth)
+
+    peak = max(range(len(values)), key=values.__getitem__)
+    if values[peak] <= 0:
+        return None
+    low = samples[peak - 1] if peak > 0 else 0
+    high = samples[peak + 1] if peak + 1 < len(samples) else samples[peak]
+
+    # Seção áurea em inteiros dentro de [low, high]
+    for _ in range(max_iterations):
+        if high - low <= max(2, int(high * rel_tol)):
+            break
+        x1 = high - int((high - low) * INVERSE_PHI)
+        x2 = low + int((high - low) * INVERSE_PHI)
+        if x1 >= x2:
+            break
+        if profit(x1) < profit(x2):
+            low = x1
+        else:
+            high = x2
+
+    amount_in = max(range(low, high + 1, max(1, (high - low) // 4)), key=profit)
+    trade = evaluate(amount_in, quote_buy, quote_sell, premium_bps, gas_cost)
+    return trade if trade is not None and trade.net_profit > 0 else None
+
+
+class SizingPool(NamedTuple):
+    dex: str           # rótulo do pool na PriceTable
+    address: str
+    kind: str
+    token0: str
+    token1: str
+    fee_bps: int       # Solidly; nos V3 a fee é lida do próprio pool
+
+
+class TradeSizer:
+    def __init__(self, call_many: CallMany, pools: Iterable[SizingPool] = (), words_each_side: int = 2):
+        self.call_many = call_many
+        self.words_each_side = words_each_side
+        self.pools: Dict[Tuple[str, str, str], SizingPool] = {}
+        self.states: Dict[str, object] = {}
+        self.sized = 0
+        self.unprofitable = 0
+        self.set_pools(pools)
+
+    def set_pools(self, pools: Iterable[SizingPool]) -> None:
+        self.pools = {}
+        for pool in pools:
+            pool = pool._replace(token0=pool.token0.lower(), token1=pool.token1.lower())
+            self.pools[(pool.dex, *sorted((pool.token0, pool.token1)))] = pool
+
+    def _pool(self, dex: str, token_a: str, token_b: str) -> Optional[SizingPool]:
+        return self.pools.get((dex, *sorted((token_a.lower(), token_b.lower()))))
+
+    def legs(self, opportunity: Opportunity) -> Optional[Tuple[SizingPool, SizingPool]]:
+        buy = self._pool(opportunity.dex_buy, opportunity.token_in, opportunity.token_out)
+        sell = self._pool(opportunity.dex_sell, opportunity.token_in, opportunity.token_out)
+        if buy is None or sell is None:
+            return None
+        return buy, sell
+
+    def load(self, opportunities: Iterable[Opportunity], block_identifier="latest") -> None:
+        """Estado exato dos pools dos candidatos no bloco; pools não modelados ficam de fora"""
+        pools = {pool.address: pool for opportunity in opportunities for pool in self.legs(opportunity) or ()}
+        solidly = {address: pool.fee_bps for address, pool in pools.items() if pool.kind == SOLIDLY}
+        v3 = [address for address, pool in pools.items() if pool.kind == UNISWAP_V3]
+        self.states = {}
+        try:
+            if solidly:
+                self.states.update(load_solidly_pool_states(self.call_many, solidly, block_identifier))
+            if v3:
+                self.states.update(load_v3_pool_states(self.call_many, v3, block_identifier, self.words_each_side))
+        except Exception as e:
+            logger.error(f"Erro ao carregar estado dos pools para dimensionamento: {e}")
+
+    def models(self, opportunity: Opportunity) -> bool:
+        legs = self.legs(opportunity)
+        return legs is not None and all(pool.address in self.states for pool in legs)
+
+    def size(self, opportunity: Opportunity, premium_bps: int, gas_cost: int = 0,
+             max_amount: Optional[int] = None) -> Optional[TradeSize]:
+        """
+        Tamanho ótimo do empréstimo de token_out (comprado em dex_buy, vendido
+        em dex_sell); None se nenhum tamanho dá lucro líquido. Só para
+        candidatos em que models() é verdadeiro.
+        """
+        buy, sell = self.legs(opportunity)
+        buy_state, sell_state = self.states[buy.address], self.states[sell.address]
+        token_a = opportunity.token_out.lower()
+        # Compra: tokenA -> tokenB; venda: tokenB -> tokenA
+        buy_zero_for_one = token_a == buy.token0
+        sell_zero_for_one = token_a != sell.token0
+
+        if max_amount is not None and max_amount <= 0:
+            trade = None
+        elif all(isinstance(state, SolidlyPoolState) and not state.stable for state in (buy_state, sell_state)):
+            def reserves(state: SolidlyPoolState, zero_for_one: bool) -> Tuple[int, int]:
+                return (state.reserve0, state.reserve1) if zero_for_one else (state.reserve1, state.reserve0)
+            trade = optimal_constant_product(
+                *reserves(buy_state, buy_zero_for_one), *reserves(sell_state, sell_zero_for_one),
+                buy_state.fee_bps, sell_state.fee_bps, premium_bps, gas_cost, max_amount
+            )
+        else:
+            trade = optimal_numeric(
+                lambda x: buy_state.quote_exact_input(x, buy_zero_for_one),
+                lambda y: sell_state.quote_exact_input(y, sell_zero_for_one),
+                premium_bps, gas_cost, max_amount
+            )
+
+        if trade is None:
+            self.unprofitable += 1
+        else:
+            self.sized += 1
+        return trade
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Mesmo esquema dos scripts: src/ como pacote de namespace a partir da raiz do repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
@@ -0,0 +1,144 @@
+"""
+Busca incremental de ciclos (src/strategy/cycles.py) x busca completa
+
+Num grafo pequeno com pools aleatórios, cada atualização de taxa (mudança
+de preço, pool novo ou removido) é seguida de uma busca incremental e de uma
+full=True no mesmo grafo. A incremental tem de achar exatamente os ciclos
+lucrativos da completa que passam por uma aresta alterada, e os ciclos
+acumulados (os de antes sem aresta alterada + os novos) têm de ser os da
+completa. A completa, por sua vez, é conferida contra a enumeração de todas
+as permutações, com as taxas tiradas dos preços dos pools e não do grafo.
+"""
+
+import copy
+import itertools
+import math
+import random
+from typing import Dict, List, Set, Tuple
+
+import pytest
+
+from src.strategy.cycles import Cycle, TokenGraph
+
+TOKENS = [f"0x{index:040x}" for index in range(1, 8)]
+MIN_PROFIT = 0.001
+FEE_BPS = 30
+
+Key = Tuple[str, ...]
+
+
+def key(cycle: Cycle) -> Key:
+    return cycle.tokens
+
+
+Pools = Dict[str, Tuple[str, str, float, bool]]   # nome -> (token0, token1, preço, ativo)
+
+
+def brute_force(pools: Pools, index: Dict[str, int], max_length: int, min_profit: float) -> Set[Key]:
+    """
+    Todos os ciclos de 2 a max_length hops, com a melhor taxa de cada par
+    calculada direto dos preços dos pools (sem o estado do grafo) e sem poda
+    """
+    keep = 1 - FEE_BPS / 10_000
+    rates: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    for name, (token0, token1, price, active) in pools.items():
+        if not active:
+            continue
+        for pair, rate in (((token0, token1), price * keep), ((token1, token0), keep / price)):
+            if pair not in rates or rate > rates[pair][0]:
+                rates[pair] = (rate, name)
+
+    found = set()
+    for length in range(2, max_length + 1):
+        for nodes in itertools.permutations(sorted(index, key=index.get), length):
+            # Mesma rotação canônica da busca: começa pelo token indexado primeiro
+            if index[nodes[0]] != min(index[node] for node in nodes):
+                continue
+            hops = [rates.get((nodes[i], nodes[(i + 1) % length])) for i in range(length)]
+            if None in hops or (length == 2 and hops[0][1] == hops[1][1]):
+                continue
+            if -sum(math.log(rate) for rate, _ in hops) < -math.log1p(min_profit):
+                found.add(nodes)
+    return found
+
+
+def random_pools(rng: random.Random, count: int) -> Pools:
+    # Preços em torno de um valor de referência por token: spreads pequenos, de ambos os lados da fee
+    reference = [rng.lognormvariate(0, 2) for _ in TOKENS]
+    pools = {}
+    for index in range(count):
+        a, b = rng.sample(range(len(TOKENS)), 2)
+        pools[f"pool{index}"] = (TOKENS[a], TOKENS[b], reference[a] / reference[b] * rng.uniform(0.98, 1.02), True)
+    return pools
+
+
+def random_update(rng: random.Random, graph: TokenGraph, pools: Pools) -> None:
+    name = rng.choice(sorted(pools))
+    token0, token1, price, active = pools[name]
+    roll = rng.random()
+    if active and roll < 0.1:
+        # Pool removido (preço zero); volta com o último preço numa atualização seguinte
+        graph.update_pool(name, token0, token1, 0.0, FEE_BPS)
+        pools[name] = (token0, token1, price, False)
+        return
+    if roll < 0.2:
+        # Pool novo no mesmo par, cadastrado na ordem inversa dos tokens
+        name = f"pool{len(pools)}"
+        token0, token1, price = token1, token0, 1 / price
+    price *= rng.uniform(0.97, 1.03)
+    pools[name] = (token0, token1, price, True)
+    graph.update_pool(name, token0, token1, price, FEE_BPS)
+
+
+def populate(graph: TokenGraph, pools: Pools) -> None:
+    for name, (token0, token1, price, _) in pools.items():
+        graph.update_pool(name, token0, token1, price, FEE_BPS)
+
+
+@pytest.mark.parametrize("max_length", [2, 3, 4])
+@pytest.mark.parametrize("seed", range(8))
+def test_incremental_matches_full_search(seed, max_length):
+    rng = random.Random(seed)
+    graph = TokenGraph(max_length)
+    pools = random_pools(rng, 18)
+    populate(graph, pools)
+
+    tracked: Dict[Key, Cycle] = {key(cycle): cycle for cycle in graph.find_cycles(MIN_PROFIT, full=True)}
+    assert set(tracked) == brute_force(pools, graph._index, max_length, MIN_PROFIT)
+
+    for step in range(40):
+        before = dict(graph._best)
+        for _ in range(rng.randint(1, 3)):
+            random_update(rng, graph, pools)
+        # Toda aresta com melhor taxa alterada fica suja; as removidas não (não há mais ciclo por elas), e uma
+        # aresta mexida e devolvida ao mesmo valor no passo continua suja
+        edges = {edge for edge in set(before) | set(graph._best) if before.get(edge) != graph._best.get(edge)}
+        assert {edge for edge in edges if edge in graph._best} <= graph._dirty
+        changed = {(graph._tokens[u], graph._tokens[v]) for u, v in edges | graph._dirty}
+        incremental = {key(cycle): cycle for cycle in graph.find_cycles(MIN_PROFIT)}
+
+        # Em passos alternados a completa roda numa cópia: os potenciais da incremental não são rebalanceados
+        reference = graph if step % 2 else copy.deepcopy(graph)
+        full: Dict[Key, Cycle] = {key(cycle): cycle for cycle in reference.find_cycles(MIN_PROFIT, full=True)}
+        assert set(full) == brute_force(pools, graph._index, max_length, MIN_PROFIT), f"passo {step}"
+
+        def touches_change(tokens: Key) -> bool:
+            return any((tokens[i], tokens[(i + 1) % len(tokens)]) in changed for i in range(len(tokens)))
+
+        assert set(incremental) == {tokens for tokens in full if touches_change(tokens)}, f"passo {step}"
+        for tokens, cycle in incremental.items():
+            assert cycle.pools == full[tokens].pools
+            assert cycle.profit == pytest.approx(full[tokens].profit, rel=1e-9, abs=1e-12)
+
+        tracked = {tokens: cycle for tokens, cycle in tracked.items() if not touches_change(tokens)}
+        tracked.update(incremental)
+        assert set(tracked) == set(full), f"passo {step}"
+
+
+def test_search_without_changes_is_empty():
+    graph, pools = TokenGraph(4), random_pools(random.Random(99), 18)
+    populate(graph, pools)
+    graph.find_cycles(MIN_PROFIT)
+    assert graph.find_cycles(MIN_PROFIT) == []
+    cycles: List[Cycle] = graph.find_cycles(MIN_PROFIT, full=True)
+    assert {key(cycle) for cycle in cycles} == brute_force(pools, graph._index, 4, MIN_PROFIT)
@@ -0,0 +1,82 @@
+"""
+Calldata montado à mão (encode_params) x codificador de contrato do web3
+
+O executor e o simulador não passam pelo eth_abi: seletor fixo + 7 palavras.
+Aqui o resultado é comparado, byte a byte, com
+w3.eth.contract(abi=...).encode_abi para o ABI do FlashArbitrage, e fixado
+num vetor que test/unit/test_flash_arbitrage.js também confere do lado do
+contrato.
+"""
+
+import random
+
+import pytest
+from web3 import Web3
+
+from src.execution.executor import EXECUTE_TX_SIZE, encode_execute_arbitrage
+from src.execution.simulator import ArbitrageParams, encode_calculate_profit
+
+PARAMS_COMPONENTS = [
+    {"name": name, "type": kind} for name, kind in (
+        ("tokenA", "address"), ("tokenB", "address"), ("dexBuy", "address"), ("dexSell", "address"),
+        ("amountIn", "uint256"), ("minProfitBps", "uint256"), ("deadline", "uint256"),
+    )
+]
+FLASH_ARBITRAGE_ABI = [
+    {"type": "function", "name": "executeArbitrage", "stateMutability": "nonpayable", "outputs": [],
+     "inputs": [{"name": "params", "type": "tuple", "components": PARAMS_COMPONENTS}]},
+    {"type": "function", "name": "calculateProfit", "stateMutability": "view",
+     "outputs": [{"name": "", "type": "uint256"}],
+     "inputs": [{"name": "params", "type": "tuple", "components": PARAMS_COMPONENTS}]},
+]
+
+# WETH -> USDC, SwapRouter02 x Aerodrome Router na Base; o mesmo vetor está em test_flash_arbitrage.js
+PINNED_PARAMS = ArbitrageParams(
+    "0x4200000000000000000000000000000000000006", "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+    "0x2626664c2603336E57B271c5C0b26F421741e481", "0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43",
+    10**18, 5, 1760000000,
+)
+PINNED_CALLDATA = (
+    "0xb73e5fe0"
+    "0000000000000000000000004200000000000000000000000000000000000006"
+    "000000000000000000000000833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+    "0000000000000000000000002626664c2603336e57b271c5c0b26f421741e481"
+    "000000000000000000000000cf77a3ba9a5ca399b7c97c74d54e5b1beb874e43"
+    "0000000000000000000000000000000000000000000000000de0b6b3a7640000"
+    "0000000000000000000000000000000000000000000000000000000000000005"
+    "0000000000000000000000000000000000000000000000000000000068e77800"
+)
+
+
+def random_params(rng: random.Random) -> ArbitrageParams:
+    addresses = [Web3.to_checksum_address(f"0x{rng.getrandbits(160):040x}") for _ in range(4)]
+    # Endereços em minúsculas também chegam ao executor (eth_abi 6 devolve assim)
+    addresses[1] = addresses[1].lower()
+    return ArbitrageParams(*addresses, rng.getrandbits(rng.choice((64, 128, 256))), rng.randrange(10_000),
+                           rng.getrandbits(40))
+
+
+@pytest.fixture(scope="module")
+def contract():
+    return Web3().eth.contract(abi=FLASH_ARBITRAGE_ABI)
+
+
+def test_pinned_execute_arbitrage_calldata(contract):
+    assert encode_execute_arbitrage(PINNED_PARAMS).hex() == PINNED_CALLDATA[2:]
+    assert contract.encode_abi("executeArbitrage", args=[tuple(PINNED_PARAMS)]) == PINNED_CALLDATA
+
+
+@pytest.mark.parametrize("function, encode", [
+    ("executeArbitrage", encode_execute_arbitrage), ("calculateProfit", encode_calculate_profit),
+])
+def test_encode_params_matches_web3(contract, function, encode):
+    rng = random.Random(16)
+    for params in [PINNED_PARAMS._replace(amount_in=2**256 - 1, deadline=0)] + [random_params(rng) for _ in range(50)]:
+        calldata = encode(params)
+        assert len(calldata) == 4 + 7 * 32
+        checksummed = [Web3.to_checksum_address(address) for address in params[:4]] + list(params[4:])
+        assert "0x" + calldata.hex() == contract.encode_abi(function, args=[tuple(checksummed)])
+
+
+def test_execute_tx_size_counts_calldata():
+    assert EXECUTE_TX_SIZE - 60 == len(encode_execute_arbitrage(PINNED_PARAMS))
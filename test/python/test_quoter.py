@@ -0,0 +1,216 @@
+"""
+Testes do quoter em inteiros (src/pricing/quoter.py), sem nó nem RPC
+
+- TickMath, SqrtPriceMath e SwapMath: constantes de fronteira e vetores dos
+  testes do Uniswap v3-core (TickMath.spec, SqrtPriceMath.spec,
+  SwapMath.spec), com encodePriceSqrt reproduzido como lá (bignumber.js com
+  40 casas decimais, floor no fim)
+- Swap V3 com cruzamento de ticks, passo a passo sobre compute_swap_step, e
+  o corte na janela lida do tick bitmap
+- Aerodrome: forma x³y + y³x e o require(_k) do Pool.swap
+- Fixtures gravadas por scripts/validate_quoter.py --record num bloco fixo
+  (test/python/fixtures/quoter/*.json): saída do QuoterV2 / getAmountOut
+  igual, inteiro a inteiro, à do quoter sobre o estado gravado
+"""
+
+import glob
+import json
+import os
+from decimal import ROUND_FLOOR, ROUND_HALF_UP, Decimal, localcontext
+
+import pytest
+
+from src.pricing.quoter import (
+    MAX_SQRT_RATIO, MAX_TICK, MIN_SQRT_RATIO, MIN_TICK, SolidlyPoolState, V3PoolState, _stable_f, _stable_k,
+    compute_swap_step, get_amount0_delta, get_amount1_delta, get_next_sqrt_price_from_input,
+    get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio, mock_dex_amount_out, solidly_volatile_amount_out
+)
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "quoter", "*.json")))
+
+
+def encode_price_sqrt(reserve1: int, reserve0: int) -> int:
+    # v3-core test/shared/utilities.ts: bn.config({DECIMAL_PLACES: 40}), div, sqrt, * 2**96, floor
+    with localcontext() as context:
+        context.prec = 200
+        places = Decimal(1).scaleb(-40)
+        ratio = (Decimal(reserve1) / Decimal(reserve0)).quantize(places, rounding=ROUND_HALF_UP)
+        root = ratio.sqrt().quantize(places, rounding=ROUND_HALF_UP)
+        return int((root * Decimal(2**96)).to_integral_value(rounding=ROUND_FLOOR))
+
+
+# --- TickMath ---
+
+def test_tick_math_boundaries():
+    assert MIN_TICK == -887272 and MAX_TICK == 887272
+    assert MIN_SQRT_RATIO == 4295128739
+    assert MAX_SQRT_RATIO == 1461446703485210103287273052203988822378723970342
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MIN_TICK + 1) == 4295343490
+    assert get_sqrt_ratio_at_tick(0) == 2**96
+    assert get_sqrt_ratio_at_tick(MAX_TICK - 1) == 1461373636630004318706518188784493106690254656249
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+
+
+def test_tick_at_sqrt_ratio_boundaries():
+    assert get_tick_at_sqrt_ratio(MIN_SQRT_RATIO) == MIN_TICK
+    assert get_tick_at_sqrt_ratio(4295343490) == MIN_TICK + 1
+    assert get_tick_at_sqrt_ratio(1461373636630004318706518188784493106690254656249) == MAX_TICK - 1
+    assert get_tick_at_sqrt_ratio(MAX_SQRT_RATIO - 1) == MAX_TICK - 1
+
+
+@pytest.mark.parametrize("tick", [-887272, -600001, -60, -1, 0, 1, 59, 60, 200003, 887271])
+def test_tick_round_trip(tick):
+    sqrt_price = get_sqrt_ratio_at_tick(tick)
+    assert get_tick_at_sqrt_ratio(sqrt_price) == tick
+    if tick < MAX_TICK - 1:
+        assert get_tick_at_sqrt_ratio(get_sqrt_ratio_at_tick(tick + 1) - 1) == tick
+
+
+# --- SqrtPriceMath / SwapMath (vetores do v3-core) ---
+
+def test_next_sqrt_price_from_input():
+    price = encode_price_sqrt(1, 1)
+    assert get_next_sqrt_price_from_input(price, 10**18, 10**17, False) == 87150978765690771352898345369
+    assert get_next_sqrt_price_from_input(price, 10**18, 10**17, True) == 72025602285694852357767227579
+
+
+def test_amount_deltas():
+    low, high = encode_price_sqrt(1, 1), encode_price_sqrt(121, 100)
+    assert get_amount0_delta(low, high, 10**18, True) == 90909090909090910
+    assert get_amount0_delta(low, high, 10**18, False) == 90909090909090909
+    assert get_amount1_delta(low, high, 10**18, True) == 100000000000000000
+    assert get_amount1_delta(low, high, 10**18, False) == 99999999999999999
+
+
+def test_swap_step_capped_at_price_target():
+    target = encode_price_sqrt(101, 100)
+    sqrt_price, amount_in, amount_out, fee = compute_swap_step(encode_price_sqrt(1, 1), target, 2 * 10**18, 10**18, 600)
+    assert (amount_in, amount_out, fee) == (9975124224178055, 9925619580021728, 5988667735148)
+    assert sqrt_price == target
+
+
+def test_swap_step_fully_spent():
+    target = encode_price_sqrt(1000, 100)
+    sqrt_price, amount_in, amount_out, fee = compute_swap_step(encode_price_sqrt(1, 1), target, 2 * 10**18, 10**18, 600)
+    assert (amount_in, amount_out, fee) == (999400000000000000, 666399946655997866, 600000000000000)
+    assert amount_in + fee == 10**18
+    assert sqrt_price < target
+
+
+def test_swap_step_entire_input_taken_as_fee():
+    assert compute_swap_step(2413, 79887613182836312, 1985041575832132834610021537970, 10, 1872) == (2413, 0, 0, 10)
+
+
+# --- Swap V3 com cruzamento de ticks ---
+
+LIQUIDITY = 10**20
+NET = 5 * 10**19
+
+
+def crossing_pool(word_range=None) -> V3PoolState:
+    # Preço 1:1 no tick 0; metade da liquidez some em ±600 e o resto em ±1200
+    liquidity_net = {-1200: NET, -600: NET, 600: -NET, 1200: -NET}
+    pool = V3PoolState(2**96, 0, LIQUIDITY, 3000, 60, liquidity_net)
+    pool.word_range = word_range
+    return pool
+
+
+def test_quote_crosses_initialized_tick():
+    amount_in = 4 * 10**18
+    # Passo 1: do tick 0 até -600 com a liquidez cheia
+    sqrt_600 = get_sqrt_ratio_at_tick(-600)
+    sqrt_price, step_in, step_out, fee = compute_swap_step(2**96, sqrt_600, LIQUIDITY, amount_in, 3000)
+    assert sqrt_price == sqrt_600
+    # Passo 2: cruzando -600 a liquidez cai pelo liquidityNet, e o resto da entrada acaba antes de -1200
+    remaining = amount_in - step_in - fee
+    sqrt_price, step_in, step_out_2, fee = compute_swap_step(
+        sqrt_600, get_sqrt_ratio_at_tick(-1200), LIQUIDITY - NET, remaining, 3000
+    )
+    assert step_in + fee == remaining and sqrt_price > get_sqrt_ratio_at_tick(-1200)
+    assert crossing_pool().quote_exact_input(amount_in, True) == step_out + step_out_2
+
+
+def test_quote_one_for_zero_mirrors_zero_for_one():
+    pool = crossing_pool()
+    # Pool simétrico em torno de 1:1: os dois sentidos diferem só pelo arredondamento
+    for amount_in in (10**15, 4 * 10**18):
+        down, up = pool.quote_exact_input(amount_in, True), pool.quote_exact_input(amount_in, False)
+        assert abs(down - up) <= 2
+
+
+def test_quote_stops_at_loaded_window():
+    full, window = crossing_pool(), crossing_pool(word_range=(-1, 0))
+    for amount_in in (10**15, 4 * 10**18):
+        assert window.quote_exact_input(amount_in, True) == full.quote_exact_input(amount_in, True)
+    # Passar de -1200 exige ler a palavra -2, fora da janela: sem cotação em vez de liquidez velha
+    assert full.quote_exact_input(10**20, True) is not None
+    assert window.quote_exact_input(10**20, True) is None
+
+
+# --- Aerodrome / MockDEX ---
+
+def test_mock_dex_amount_out():
+    # MockDEX.getAmountsOut: amountIn * price / 1e18, com floor
+    assert mock_dex_amount_out(10**18, 11 * 10**17) == 11 * 10**17
+    assert mock_dex_amount_out(999, 11 * 10**17) == 1098
+    assert mock_dex_amount_out(1, 10**17) == 0
+
+
+def test_volatile_amount_out():
+    # Pool.getAmountOut volátil: amountIn -= amountIn * fee / 10000; out = amountIn * reserveB / (reserveA + amountIn)
+    assert solidly_volatile_amount_out(10**18, 1000 * 10**18, 2000 * 10**18, 30) == 1992013962079806432
+    pool = SolidlyPoolState(1000 * 10**18, 2000 * 10**18, False, 30, 18, 18)
+    assert pool.quote_exact_input(10**18, True) == 1992013962079806432
+
+
+def test_stable_curve_form():
+    x, y = 3 * 10**18, 5 * 10**18
+    assert _stable_f(x, y) == x * y * (x * x + y * y) // 10**54
+    assert _stable_k(x, y, 10**18, 10**18) == _stable_f(x, y)
+
+
+@pytest.mark.parametrize("decimals0, decimals1", [(18, 18), (6, 18), (18, 6), (6, 6)])
+@pytest.mark.parametrize("zero_for_one", [True, False])
+def test_stable_quote_satisfies_pool_k(decimals0, decimals1, zero_for_one):
+    unit0, unit1 = 10**decimals0, 10**decimals1
+    reserve0, reserve1 = 2_000_000 * unit0, 1_900_000 * unit1
+    pool = SolidlyPoolState(reserve0, reserve1, True, 5, decimals0, decimals1)
+    unit_in = unit0 if zero_for_one else unit1
+    for amount_in in (unit_in, 1_000 * unit_in, 500_000 * unit_in):
+        amount_out = pool.quote_exact_input(amount_in, zero_for_one)
+        net_in = amount_in - amount_in * 5 // 10_000
+        balance0 = reserve0 + net_in if zero_for_one else reserve0 - amount_out
+        balance1 = reserve1 - amount_out if zero_for_one else reserve1 + net_in
+        # require(_k(_balance0, _balance1) >= _k(_reserve0, _reserve1), "K") do Pool.swap
+        assert _stable_k(balance0, balance1, unit0, unit1) >= _stable_k(reserve0, reserve1, unit0, unit1)
+    # Perto do peg, 1 unidade rende quase 1 unidade menos a fee de 5 bps
+    one_out = pool.quote_exact_input(unit_in, zero_for_one)
+    unit_out = unit1 if zero_for_one else unit0
+    assert 0.999 * unit_out < one_out < 1.001 * unit_out
+
+
+# --- Fixtures gravadas num bloco fixo ---
+
+def load_fixture_pool(pool: dict):
+    state = pool["state"]
+    if pool["kind"] == "solidly":
+        return SolidlyPoolState(**state)
+    return V3PoolState(
+        state["sqrt_price_x96"], state["tick"], state["liquidity"], state["fee"], state["tick_spacing"],
+        {tick: net for tick, net in state["liquidity_net"]}, {word: bits for word, bits in state["bitmap"]},
+        tuple(state["word_range"])
+    )
+
+
+@pytest.mark.skipif(not FIXTURES, reason="sem fixtures: gravar com scripts/validate_quoter.py onchain --record")
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_recorded_fixtures(path):
+    with open(path) as f:
+        fixture = json.load(f)
+    for pool in fixture["pools"]:
+        state = load_fixture_pool(pool)
+        for case in pool["cases"]:
+            assert state.quote_exact_input(case["amount_in"], case["zero_for_one"]) == case["amount_out"], (
+                f"{pool['address']} bloco {fixture['block']}: {case}"
+            )
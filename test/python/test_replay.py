@@ -0,0 +1,52 @@
+"""
+Testes do replay do histórico (src/backtest/replay.py)
+"""
+
+import pytest
+
+from src.backtest.replay import WETH, BacktestConfig, run_backtest
+from src.pricing.price_table import PriceTable
+from src.storage.history import HistoryWriter
+
+USDC = "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913"
+
+
+@pytest.fixture
+def history(tmp_path):
+    # Um snapshot com um único spread de 2% em WETH/USDC entre duas DEXs
+    writer = HistoryWriter(str(tmp_path))
+    table = PriceTable(100)
+    table.add_pool("Uniswap V3", WETH, USDC, 3000.0)
+    table.add_pool("Aerodrome", WETH, USDC, 3060.0)
+    writer.record_snapshot(table, timestamp=1_700_000_000)
+    writer.flush()
+    writer.close()
+    return str(tmp_path)
+
+
+def replay(root: str, trade_sizes):
+    config = BacktestConfig(min_profit=0.005, gas_price_gwei=0.0, trade_sizes=trade_sizes, cycles=False)
+    result, _ = run_backtest(root, config, workers=1)
+    return result
+
+
+def test_spread_in_both_directions_is_one_episode(history):
+    result = replay(history, {WETH: 1.0})
+    assert result.opportunities == 2
+    assert result.episodes == 1
+    assert result.trades == 1
+    assert result.pnl_eth == pytest.approx(0.02 - 0.0005)
+
+
+def test_second_sized_token_does_not_add_a_trade(history):
+    # USDC com tamanho equivalente a 1 WETH: os dois sentidos são dimensionáveis, só o melhor conta
+    result = replay(history, {WETH: 1.0, USDC: 3000.0})
+    assert result.episodes == 1
+    assert result.trades == 1
+    assert result.unsized == 0
+    assert result.pnl_eth == pytest.approx(0.0195, rel=0.02)
+
+
+def test_unsized_only_when_no_direction_has_a_size(history):
+    assert replay(history, {}).unsized == 1
+    assert replay(history, {USDC: 3000.0}).unsized == 0
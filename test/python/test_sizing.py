@@ -0,0 +1,170 @@
+"""
+Dimensionamento (src/strategy/sizing.py) contra busca exaustiva
+
+- optimal_constant_product e optimal_numeric x varredura de
+  solidly_volatile_amount_out para alguns conjuntos de reservas/fees
+- TradeSizer: a orientação compra tokenA -> tokenB / venda tokenB -> tokenA
+  com os tokens dos pools em qualquer ordem; a direção invertida não dá lucro
+"""
+
+import math
+from typing import Sequence
+
+import pytest
+
+from src.pricing.price_table import Opportunity
+from src.pricing.quoter import METADATA, V3PoolState, get_sqrt_ratio_at_tick, solidly_volatile_amount_out
+from src.strategy.sizing import SizingPool, TradeSizer, evaluate, optimal_constant_product, optimal_numeric
+
+E18 = 10**18
+E6 = 10**6
+
+# (reserve_in_buy, reserve_out_buy, reserve_in_sell, reserve_out_sell, fee_buy_bps, fee_sell_bps, premium_bps, gas_cost)
+CONSTANT_PRODUCT_CASES = [
+    (1_000 * E18, 2_100 * E18, 2_000 * E18, 1_000 * E18, 30, 30, 5, 0),
+    (1_000 * E18, 2_100 * E18, 2_000 * E18, 1_000 * E18, 30, 30, 9, 10**15),
+    # WETH/USDC, pools de profundidade bem diferente e fees assimétricas
+    (800 * E18, 2_500_000 * E6, 31_000_000 * E6, 10_000 * E18, 5, 30, 5, 0),
+    (50 * E18, 160_000 * E6, 3_000_000 * E6, 1_000 * E18, 100, 1, 0, 0),
+    # USDC emprestado: 6 casas na entrada
+    (5_000_000 * E6, 1_700 * E18, 1_600 * E18, 5_000_000 * E6, 1, 5, 5, 0),
+]
+
+
+def quotes(reserve_in_buy, reserve_out_buy, reserve_in_sell, reserve_out_sell, fee_buy_bps, fee_sell_bps):
+    return (
+        lambda x: solidly_volatile_amount_out(x, reserve_in_buy, reserve_out_buy, fee_buy_bps),
+        lambda y: solidly_volatile_amount_out(y, reserve_in_sell, reserve_out_sell, fee_sell_bps),
+    )
+
+
+def brute_force(quote_buy, quote_sell, premium_bps: int, gas_cost: int, high: int, points: int = 2_000):
+    """Maior lucro líquido numa grade linear de [0, high], refinada em volta do melhor ponto"""
+
+    def profit(x: int) -> int:
+        return evaluate(x, quote_buy, quote_sell, premium_bps, gas_cost).net_profit
+
+    step = max(1, high // points)
+    best = max(range(0, high + 1, step), key=profit)
+    fine = max(1, 2 * step // points)
+    best = max(range(max(0, best - step), min(high, best + step) + 1, fine), key=profit)
+    return best, profit(best)
+
+
+def tolerance(reserve_in_sell: int, reserve_out_sell: int) -> int:
+    # A perna de compra arredonda tokenB para baixo: o ótimo contínuo pode perder até ~1 unidade de
+    # tokenB na saída, que vale reserve_out_sell / reserve_in_sell de tokenA (com folga de 2x)
+    return 2 * (reserve_out_sell // reserve_in_sell + 1)
+
+
+@pytest.mark.parametrize("case", CONSTANT_PRODUCT_CASES)
+def test_closed_form_matches_brute_force(case):
+    reserves, fees, (premium_bps, gas_cost) = case[:4], case[4:6], case[6:]
+    quote_buy, quote_sell = quotes(*reserves, *fees)
+    best_amount, best_profit = brute_force(quote_buy, quote_sell, premium_bps, gas_cost, reserves[0] // 2)
+    assert 0 < best_amount < reserves[0] // 2
+
+    trade = optimal_constant_product(*reserves, *fees, premium_bps, gas_cost)
+    assert trade is not None
+    assert trade.net_profit >= best_profit - tolerance(*reserves[2:])
+    assert abs(trade.amount_in - best_amount) <= best_amount // 100
+
+    numeric = optimal_numeric(quote_buy, quote_sell, premium_bps, gas_cost)
+    assert numeric is not None
+    assert numeric.net_profit >= best_profit - tolerance(*reserves[2:])
+
+
+@pytest.mark.parametrize("case", CONSTANT_PRODUCT_CASES)
+def test_closed_form_respects_max_amount(case):
+    reserves, fees, (premium_bps, gas_cost) = case[:4], case[4:6], case[6:]
+    unbounded = optimal_constant_product(*reserves, *fees, premium_bps, gas_cost)
+    cap = unbounded.amount_in // 3
+    trade = optimal_constant_product(*reserves, *fees, premium_bps, gas_cost, max_amount=cap)
+    # Abaixo do ótimo o lucro cresce com o tamanho: o teto é o melhor tamanho permitido
+    assert trade.amount_in == cap
+    quote_buy, quote_sell = quotes(*reserves, *fees)
+    _, best_profit = brute_force(quote_buy, quote_sell, premium_bps, gas_cost, cap)
+    assert trade.net_profit >= best_profit - tolerance(*reserves[2:])
+
+
+@pytest.mark.parametrize("case", CONSTANT_PRODUCT_CASES)
+def test_reversed_route_has_no_size(case):
+    # Comprar no pool de venda e vender no de compra: a grade inteira dá prejuízo
+    reserve_in_buy, reserve_out_buy, reserve_in_sell, reserve_out_sell, fee_buy_bps, fee_sell_bps = case[:6]
+    reversed_case = (reserve_out_sell, reserve_in_sell, reserve_out_buy, reserve_in_buy, fee_sell_bps, fee_buy_bps)
+    premium_bps, gas_cost = case[6:]
+    assert optimal_constant_product(*reversed_case, premium_bps, gas_cost) is None
+    assert optimal_numeric(*quotes(*reversed_case), premium_bps, gas_cost) is None
+    _, best_profit = brute_force(*quotes(*reversed_case), premium_bps, gas_cost, reversed_case[0] // 2)
+    assert best_profit <= 0
+
+
+# --- Orientação no TradeSizer ---
+
+TOKEN_A = "0x" + "aa" * 20   # emprestado: token_out da oportunidade
+TOKEN_B = "0x" + "bb" * 20
+POOL_X = "0x" + "11" * 20
+POOL_Y = "0x" + "22" * 20
+POOL_V3 = "0x" + "33" * 20
+
+# Reservas de tokenA/tokenB: Y paga mais tokenB por tokenA (compra), X paga mais tokenA por tokenB (venda)
+RESERVES = {POOL_X: (1_000 * E18, 2_000 * E18), POOL_Y: (1_000 * E18, 2_100 * E18)}
+
+
+def solidly_sizer(a_is_token0: Sequence) -> TradeSizer:
+    """Pools X e Y com tokenA como token0 ou token1, conforme a_is_token0[i]"""
+    metadata, pools = {}, []
+    for (address, dex), a_first in zip(((POOL_X, "X"), (POOL_Y, "Y")), a_is_token0):
+        reserve_a, reserve_b = RESERVES[address]
+        token0, token1 = (TOKEN_A, TOKEN_B) if a_first else (TOKEN_B, TOKEN_A)
+        reserve0, reserve1 = (reserve_a, reserve_b) if a_first else (reserve_b, reserve_a)
+        metadata[address] = (E18, E18, reserve0, reserve1, False, token0, token1)
+        pools.append(SizingPool(dex, address, "solidly", token0, token1, 30))
+
+    def call_many(calls, block_identifier):
+        assert all(call.calldata == METADATA for call in calls)
+        return [metadata[call.target] for call in calls]
+
+    return TradeSizer(call_many, pools)
+
+
+def opportunity(dex_buy: str, dex_sell: str) -> Opportunity:
+    return Opportunity(TOKEN_B, TOKEN_A, dex_buy, dex_sell, 0.0, 0.0, 0.02)
+
+
+@pytest.mark.parametrize("a_is_token0", [(True, True), (False, False), (True, False), (False, True)])
+def test_sizer_orients_constant_product_legs(a_is_token0):
+    sizer = solidly_sizer(a_is_token0)
+    right, flipped = opportunity("Y", "X"), opportunity("X", "Y")
+    sizer.load([right, flipped], 123)
+    assert sizer.models(right) and sizer.models(flipped)
+
+    (a_y, b_y), (a_x, b_x) = RESERVES[POOL_Y], RESERVES[POOL_X]
+    trade = sizer.size(right, 5)
+    assert trade == optimal_constant_product(a_y, b_y, b_x, a_x, 30, 30, 5)
+    _, best_profit = brute_force(*quotes(a_y, b_y, b_x, a_x, 30, 30), 5, 0, a_y // 2)
+    assert trade.net_profit >= best_profit - tolerance(b_x, a_x)
+    assert sizer.size(flipped, 5) is None
+
+
+@pytest.mark.parametrize("a_is_token0", [True, False])
+def test_sizer_orients_v3_leg(a_is_token0):
+    # Pool V3 no lugar de Y, com o mesmo preço de 2.1 tokenB por tokenA, e X volátil: busca numérica
+    sizer = solidly_sizer((True, True))
+    tick = round(math.log(2.1 if a_is_token0 else 1 / 2.1) / math.log(1.0001))
+    token0, token1 = (TOKEN_A, TOKEN_B) if a_is_token0 else (TOKEN_B, TOKEN_A)
+    sizer.set_pools([sizer.pools[("X", TOKEN_A, TOKEN_B)], SizingPool("V", POOL_V3, "uniswap_v3", token0, token1, 0)])
+    right, flipped = opportunity("V", "X"), opportunity("X", "V")
+    sizer.load([right], 123)
+    v3 = V3PoolState(get_sqrt_ratio_at_tick(tick), tick, 10**22, 500, 10, {})
+    sizer.states[POOL_V3] = v3
+
+    trade = sizer.size(right, 5)
+    assert trade is not None
+    a_x, b_x = RESERVES[POOL_X]
+    quote_buy = lambda x: v3.quote_exact_input(x, a_is_token0)  # noqa: E731
+    quote_sell = lambda y: solidly_volatile_amount_out(y, b_x, a_x, 30)  # noqa: E731
+    assert trade == evaluate(trade.amount_in, quote_buy, quote_sell, 5, 0)
+    _, best_profit = brute_force(quote_buy, quote_sell, 5, 0, a_x // 2)
+    assert trade.net_profit >= best_profit - tolerance(b_x, a_x)
+    assert sizer.size(flipped, 5) is None
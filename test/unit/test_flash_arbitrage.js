@@ -92,5 +92,147 @@ describe("FlashArbitrage", function () {
       await expect(flashArbitrage.executeArbitrage(arbitrageParams))
         .to.emit(flashArbitrage, "ArbitrageExecuted");
     });
+
+    it("Should repay the flash loan premium and send only the net profit", async function () {
+      // Mesmos valores que o modelo de custo Python lê: FLASHLOAN_PREMIUM_TOTAL e o saldo do pool (sem aToken)
+      await mockAAVEPool.updateFlashloanPremiums(9, 0);
+      expect(await mockAAVEPool.FLASHLOAN_PREMIUM_TOTAL()).to.equal(9n);
+      expect((await mockAAVEPool.getReserveData(tokenA.target)).aTokenAddress).to.equal(ethers.ZeroAddress);
+
+      await mockDEXBuy.setPrice(tokenA.target, tokenB.target, ethers.parseEther("1.1"));
+      await mockDEXSell.setPrice(tokenB.target, tokenA.target, ethers.parseEther("0.95"));
+
+      const amountIn = ethers.parseEther("100");
+      await tokenA.mint(mockAAVEPool.target, amountIn);
+      await tokenA.mint(mockDEXSell.target, ethers.parseEther("1000"));
+      await tokenB.mint(mockDEXBuy.target, ethers.parseEther("1000"));
+
+      await flashArbitrage.executeArbitrage({
+        tokenA: tokenA.target,
+        tokenB: tokenB.target,
+        dexBuy: mockDEXBuy.target,
+        dexSell: mockDEXSell.target,
+        amountIn: amountIn,
+        minProfitBps: 100,
+        deadline: (await ethers.provider.getBlock("latest")).timestamp + 60,
+      });
+
+      // 4.5 A de lucro bruto, 0.09 A de prêmio (9 bps de 100 A) de volta ao pool
+      const premium = ethers.parseEther("0.09");
+      expect(await tokenA.balanceOf(mockAAVEPool.target)).to.equal(amountIn + premium);
+      expect(await tokenA.balanceOf(owner.address)).to.equal(ethers.parseEther("4.5") - premium);
+    });
+
+    describe("Raw calldata from the Python executor", function () {
+      // Mesmo layout de encode_params (src/execution/simulator.py): seletor fixo + 7 palavras, sem offsets
+      const SIGNATURE = "executeArbitrage((address,address,address,address,uint256,uint256,uint256))";
+
+      function rawCalldata(p) {
+        const words = [p.tokenA, p.tokenB, p.dexBuy, p.dexSell, p.amountIn, p.minProfitBps, p.deadline];
+        return ethers.concat([ethers.id(SIGNATURE).slice(0, 10), ...words.map((word) => ethers.toBeHex(word, 32))]);
+      }
+
+      it("Should match the vector pinned in test/python/test_executor.py", async function () {
+        const pinned = {
+          tokenA: "0x4200000000000000000000000000000000000006",
+          tokenB: "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+          dexBuy: "0x2626664c2603336E57B271c5C0b26F421741e481",
+          dexSell: "0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43",
+          amountIn: ethers.parseEther("1"),
+          minProfitBps: 5,
+          deadline: 1760000000,
+        };
+        const expected =
+          "0xb73e5fe0" +
+          "0000000000000000000000004200000000000000000000000000000000000006" +
+          "000000000000000000000000833589fcd6edb6e08f4c7c32d4f71b54bda02913" +
+          "0000000000000000000000002626664c2603336e57b271c5c0b26f421741e481" +
+          "000000000000000000000000cf77a3ba9a5ca399b7c97c74d54e5b1beb874e43" +
+          "0000000000000000000000000000000000000000000000000de0b6b3a7640000" +
+          "0000000000000000000000000000000000000000000000000000000000000005" +
+          "0000000000000000000000000000000000000000000000000000000068e77800";
+        expect(flashArbitrage.interface.encodeFunctionData("executeArbitrage", [pinned])).to.equal(expected);
+        expect(rawCalldata(pinned)).to.equal(expected);
+      });
+
+      it("Should execute arbitrage sent as a raw transaction", async function () {
+        await mockDEXBuy.setPrice(tokenA.target, tokenB.target, ethers.parseEther("1.1"));
+        await mockDEXSell.setPrice(tokenB.target, tokenA.target, ethers.parseEther("0.95"));
+
+        const amountIn = ethers.parseEther("100");
+        await tokenA.mint(mockAAVEPool.target, amountIn);
+        await tokenA.mint(mockDEXSell.target, ethers.parseEther("1000"));
+        await tokenB.mint(mockDEXBuy.target, ethers.parseEther("1000"));
+
+        const data = rawCalldata({
+          tokenA: tokenA.target,
+          tokenB: tokenB.target,
+          dexBuy: mockDEXBuy.target,
+          dexSell: mockDEXSell.target,
+          amountIn: amountIn,
+          minProfitBps: 100,
+          deadline: (await ethers.provider.getBlock("latest")).timestamp + 60,
+        });
+
+        // Como o ArbitrageExecutor envia: tx com data crua, sem passar pela interface do contrato
+        await expect(owner.sendTransaction({ to: flashArbitrage.target, data: data }))
+          .to.emit(flashArbitrage, "ArbitrageExecuted");
+        expect(await tokenA.balanceOf(owner.address)).to.equal(ethers.parseEther("4.5"));
+      });
+    });
+  });
+
+  describe("Profit Simulation", function () {
+    // Mesmo caminho usado pelo simulador Python: calculateProfit via eth_call, em lote no Multicall3
+    async function params(amountIn) {
+      return {
+        tokenA: tokenA.target,
+        tokenB: tokenB.target,
+        dexBuy: mockDEXBuy.target,
+        dexSell: mockDEXSell.target,
+        amountIn: amountIn,
+        minProfitBps: 0,
+        deadline: (await ethers.provider.getBlock("latest")).timestamp + 60,
+      };
+    }
+
+    it("Should return the round-trip profit of both legs", async function () {
+      await mockDEXBuy.setPrice(tokenA.target, tokenB.target, ethers.parseEther("1.1"));
+      await mockDEXSell.setPrice(tokenB.target, tokenA.target, ethers.parseEther("0.95"));
+
+      // 100 A -> 110 B -> 104.5 A
+      expect(await flashArbitrage.calculateProfit(await params(ethers.parseEther("100"))))
+        .to.equal(ethers.parseEther("4.5"));
+    });
+
+    it("Should return zero for an unprofitable or reverting route", async function () {
+      await mockDEXBuy.setPrice(tokenA.target, tokenB.target, ethers.parseEther("1"));
+      await mockDEXSell.setPrice(tokenB.target, tokenA.target, ethers.parseEther("0.9"));
+      expect(await flashArbitrage.calculateProfit(await params(ethers.parseEther("100")))).to.equal(0n);
+
+      // Router sem getAmountsOut: o try/catch de calculateProfit devolve 0 em vez de reverter
+      const broken = { ...(await params(ethers.parseEther("100"))), dexSell: tokenA.target };
+      expect(await flashArbitrage.calculateProfit(broken)).to.equal(0n);
+    });
+
+    it("Should simulate a ladder of sizes in one aggregate3", async function () {
+      await mockDEXBuy.setPrice(tokenA.target, tokenB.target, ethers.parseEther("1.1"));
+      await mockDEXSell.setPrice(tokenB.target, tokenA.target, ethers.parseEther("0.95"));
+
+      const MockMulticall3Factory = await ethers.getContractFactory("MockMulticall3");
+      const multicall = await MockMulticall3Factory.deploy();
+      await multicall.waitForDeployment();
+
+      const sizes = ["1", "10", "100"].map((size) => ethers.parseEther(size));
+      const calls = await Promise.all(sizes.map(async (size) => ({
+        target: flashArbitrage.target,
+        allowFailure: true,
+        callData: flashArbitrage.interface.encodeFunctionData("calculateProfit", [await params(size)]),
+      })));
+
+      const results = await multicall.aggregate3.staticCall(calls);
+      const profits = results.map((result) => flashArbitrage.interface.decodeFunctionResult("calculateProfit", result.returnData)[0]);
+      expect(profits).to.deep.equal(sizes.map((size) => (size * 45n) / 1000n));
+    });
   });
 });
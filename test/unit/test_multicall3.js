@@ -0,0 +1,77 @@
+/**
+ * Testes Unitários para o MockMulticall3
+ *
+ * Verificam a semântica de allowFailure usada pelo monitor Python ao ler
+ * vários pools num único aggregate3.
+ */
+
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+
+describe("MockMulticall3", function () {
+  let multicall, mockDEX, tokenA, tokenB;
+
+  beforeEach(async function () {
+    const MockMulticall3Factory = await ethers.getContractFactory("MockMulticall3");
+    multicall = await MockMulticall3Factory.deploy();
+    await multicall.waitForDeployment();
+
+    const MockDEXFactory = await ethers.getContractFactory("MockDEX");
+    mockDEX = await MockDEXFactory.deploy();
+    await mockDEX.waitForDeployment();
+
+    const MockERC20Factory = await ethers.getContractFactory("MockERC20");
+    tokenA = await MockERC20Factory.deploy("Token A", "TKA");
+    await tokenA.waitForDeployment();
+    tokenB = await MockERC20Factory.deploy("Token B", "TKB");
+    await tokenB.waitForDeployment();
+
+    await mockDEX.setPrice(tokenA.target, tokenB.target, ethers.parseEther("2"));
+  });
+
+  it("Should isolate a failing call when allowFailure is set", async function () {
+    const amountIn = ethers.parseEther("1");
+    const calls = [
+      {
+        target: mockDEX.target,
+        allowFailure: true,
+        callData: mockDEX.interface.encodeFunctionData("getAmountsOut", [amountIn, [tokenA.target, tokenB.target]]),
+      },
+      {
+        // Caminho inválido: o MockDEX reverte
+        target: mockDEX.target,
+        allowFailure: true,
+        callData: mockDEX.interface.encodeFunctionData("getAmountsOut", [amountIn, [tokenA.target]]),
+      },
+      {
+        target: tokenA.target,
+        allowFailure: true,
+        callData: tokenA.interface.encodeFunctionData("decimals"),
+      },
+    ];
+
+    const results = await multicall.aggregate3.staticCall(calls);
+
+    expect(results[0].success).to.be.true;
+    const [amounts] = mockDEX.interface.decodeFunctionResult("getAmountsOut", results[0].returnData);
+    expect(amounts[1]).to.equal(ethers.parseEther("2"));
+
+    expect(results[1].success).to.be.false;
+
+    expect(results[2].success).to.be.true;
+    const [decimals] = tokenA.interface.decodeFunctionResult("decimals", results[2].returnData);
+    expect(decimals).to.equal(18n);
+  });
+
+  it("Should revert the batch when a strict call fails", async function () {
+    const calls = [
+      {
+        target: mockDEX.target,
+        allowFailure: false,
+        callData: mockDEX.interface.encodeFunctionData("getAmountsOut", [1n, [tokenA.target]]),
+      },
+    ];
+
+    await expect(multicall.aggregate3.staticCall(calls)).to.be.revertedWith("Multicall3: call failed");
+  });
+});